@@ -128,7 +128,7 @@ class PromptDrivenProjectCreationWorkflow(BaseWorkflow):
     def __init__(self, project_manager: ProjectManager, progress_service: ProgressService, model_config: Dict[str, Any] = None):
         self.project_manager = project_manager
         self.progress_service = progress_service
-        self.llm_service = LLMService(project_manager.project_path, project_manager.config)
+        self.llm_service = project_manager.services.llm_service
         
         self.model_config = model_config or {}
         
@@ -227,7 +227,7 @@ class PromptDrivenProjectCreationInterface(BaseInterface):
     def __init__(self, project_manager: ProjectManager, model_config: Dict[str, Any] = {}):
         super().__init__(project_manager, model_config)
         self.console = Console()
-        self.progress_service = ProgressService(project_manager.project_path, project_manager.config)
+        self.progress_service = project_manager.services.progress_service
         self.workflow = PromptDrivenProjectCreationWorkflow(project_manager, self.progress_service, model_config.get("prompt_driven_project_creation_workflow", {}))
         self.context = {}
 
@@ -357,18 +357,21 @@ class PromptDrivenProjectCreationInterface(BaseInterface):
 
     def get_file_contexts(self) -> List[Dict[str, str]]:
         file_contexts = []
+        resolver = self.project_manager.services.file_context_resolver
         while True:
-            file_path = self.handle_input("Enter a file path for context (or press Enter to finish)")
+            file_path = self.handle_input("Enter a file path, path:start-end, path::Symbol or glob for context (or press Enter to finish)")
             if file_path.strip() == "":
                 break
-            content = self.project_manager.read_file(file_path)
-            if content:
+            try:
+                items = resolver.load([file_path])
+            except ValueError as e:
+                self.console.print(f"[yellow]Warning: {str(e)}[/yellow]")
+                continue
+            for item in items:
                 file_contexts.append({
-                    "file_path": file_path,
-                    "content": content
+                    "file_path": item['label'],
+                    "content": item['content']
                 })
-            else:
-                self.console.print(f"[yellow]Warning: Could not read file {file_path}[/yellow]")
         return file_contexts
 
 def register_plugin():
@@ -2,7 +2,6 @@ from typing import Dict, Any
 from repoai import ProjectManager
 from repoai.components.components_base import BaseTask, BaseWorkflow, BaseInterface
 from repoai.services.llm_service import LLMService
-from repoai.services.markdown_service import MarkdownService
 from repoai.core.project_manager import ProjectManager
 
 # 1. Custom Task
@@ -39,8 +38,8 @@ class SimpleChatTask(BaseTask):
 class SimpleChatWorkflow(BaseWorkflow):
     def __init__(self, project_manager: ProjectManager, model_config: Dict[str, Any] = None):
         self.project_manager = project_manager
-        self.llm_service = LLMService(project_manager.project_path, project_manager.config)
-        self.markdown_service = MarkdownService(project_manager.project_path, project_manager.config.get('repoai_ignore_file'))
+        self.llm_service = project_manager.services.llm_service
+        self.markdown_service = project_manager.services.markdown_service
         self.model_config = model_config or {}
         self.chat_task = SimpleChatTask(self.llm_service, self.model_config.get('simple_chat_task', {}))
 
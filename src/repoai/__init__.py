@@ -1,5 +1,9 @@
 __version__ = "0.0.4"
 
+import os
+# Model metadata ships with the package (see utils/model_registry.py); keep LiteLLM from fetching its cost map on import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
 from .core.project_manager import ProjectManager
 from .core.config_manager import ConfigManager
 from typing import Optional
@@ -12,4 +16,4 @@ def initialize(config: Optional[ConfigManager] = None):
     setup_logger(config)
     return config
 
-__all__ = ['ProjectManager', 'ConfigManager', 'initialize']
\ No newline at end of file
+__all__ = ['ProjectManager', 'ConfigManager', 'initialize']
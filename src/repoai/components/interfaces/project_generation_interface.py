@@ -6,7 +6,6 @@ from rich.prompt import Prompt, Confirm
 from rich.markdown import Markdown
 from ..components_base import BaseInterface
 from ...core.project_manager import ProjectManager
-from ...services.progress_service import ProgressService
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,7 +15,7 @@ class ProjectGenerationInterface(BaseInterface):
     def __init__(self, project_manager: ProjectManager, model_config: Dict[str, Any] = {}):
         super().__init__(project_manager, model_config)
         self.console = Console()
-        self.progress_service = ProgressService(project_manager.project_path, project_manager.config)
+        self.progress_service = project_manager.services.progress_service
         self.workflow = self.project_manager.get_workflow("project_generation_workflow")(self.progress_service, model_config.get("project_generation_workflow", {}))
         self.context = {}
 
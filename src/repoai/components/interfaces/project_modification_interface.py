@@ -7,7 +7,6 @@ from rich.syntax import Syntax
 from rich.markdown import Markdown
 from ..components_base import BaseInterface
 from ...core.project_manager import ProjectManager
-from ...services.progress_service import ProgressService
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -16,7 +15,7 @@ class ProjectModificationInterface(BaseInterface):
     def __init__(self, project_manager: ProjectManager, model_config: Dict[str, Any] = {}):
         super().__init__(project_manager, model_config)
         self.console = Console()
-        self.progress_service = ProgressService(project_manager.project_path, project_manager.config)
+        self.progress_service = project_manager.services.progress_service
         self.workflow = self.project_manager.get_workflow("project_modification_workflow")(self.progress_service, model_config.get("project_modification_workflow", {}))
         self.context = {}
 
@@ -52,12 +51,20 @@ class ProjectModificationInterface(BaseInterface):
             file_paths = self.get_file_paths()
             image_paths = self.get_image_paths()
 
-            with self.console.status("[bold green]Processing..."):
+            previewed = []
+            with self.console.status("[bold green]Processing...") as status:
+                def preview_modification(mod: Dict[str, Any]):
+                    previewed.append(mod)
+                    self.display_modification(mod)
+                    status.update(f"[bold green]Processing... {len(previewed)} modification(s) proposed so far")
+
                 self.context = self.workflow.populate_context(self.context, user_input, self.context['project_report'], file_paths, image_paths)
-                self.context = self.workflow.execute(self.context)
+                self.display_file_contexts()
+                self.context = self.workflow.execute(self.context, on_modification=preview_modification)
             
             self.display_ai_response()
-            self.display_proposed_modifications()
+            self.display_proposed_modifications(show_content=not previewed)
+            self.display_impacted_files()
 
             continue_prompt = self.project_manager.get_interface_prompt(task_id="project_modification_task", prompt_key="continue")
             action = self.handle_input(
@@ -79,13 +86,30 @@ class ProjectModificationInterface(BaseInterface):
 
     def get_file_paths(self) -> List[str]:
         file_paths = []
+        resolver = self.project_manager.services.file_context_resolver
         while True:
-            file_path = self.handle_input("Enter a file path for context (or press Enter to finish)")
+            file_path = self.handle_input("Enter a file path, path:start-end, path::Symbol or glob for context (or press Enter to finish)")
             if file_path.strip() == "":
                 break
+            try:
+                resolved = resolver.resolve([file_path])
+            except ValueError as e:
+                self.console.print(f"[yellow]Warning: {str(e)}[/yellow]")
+                continue
+            if len(resolved) > 1:
+                self.console.print(f"  {len(resolved)} files match")
             file_paths.append(file_path)
         return file_paths
 
+    def display_file_contexts(self):
+        file_contexts = self.context.get('file_contexts', [])
+        if not file_contexts:
+            return
+        self.console.print("[bold]File contexts:[/bold]")
+        for file_context in file_contexts:
+            self.console.print(f"  - {file_context['file_path']}: {file_context.get('tokens', 0)} tokens")
+        self.console.print(f"[bold]File context tokens:[/bold] {sum(fc.get('tokens', 0) for fc in file_contexts)}")
+
     def get_image_paths(self) -> List[str]:
         image_paths = []
         while True:
@@ -102,25 +126,41 @@ class ProjectModificationInterface(BaseInterface):
         assistant_tokens = token_counter(model=self.model_config.get('project_modification_workflow', {}).get('project_modification_task', {}).get('model', ''), text=self.context['messages'][-1]['content'])
         self.console.print(f"[bold]Total tokens used:[/bold] {total_tokens} | [bold]Response tokens:[/bold] {assistant_tokens}")
 
-    def display_proposed_modifications(self):
+    def display_proposed_modifications(self, show_content: bool = True):
         if 'modifications' in self.context:
             self.console.print("Proposed modifications:")
             for mod in self.context['modifications']:
-                operation = mod['operation'].capitalize()
-                file_path = mod['file_path']
-                self.console.print(f"- {operation} file: {file_path}")
-                
-                if operation in ['Edit', 'Create'] and 'content' in mod:
-                    syntax = Syntax(mod['content'], "python", theme="monokai")
-                    self.console.print(Panel(syntax, title=f"Content for {file_path}", border_style="green"))
-                elif operation == 'Move' and 'content' in mod:
-                    self.console.print(f"  Destination path: {mod['content']}")
+                self.display_modification(mod, show_content)
+
+    def display_impacted_files(self):
+        impacted_files = self.workflow.get_impacted_files(self.context)
+        if impacted_files:
+            self.console.print("Files importing the modified files (not modified):", style="bold yellow")
+            for file_path in impacted_files[:10]:
+                self.console.print(f"  - {file_path}")
+            if len(impacted_files) > 10:
+                self.console.print(f"  ... and {len(impacted_files) - 10} more")
+
+    def display_modification(self, mod: Dict[str, Any], show_content: bool = True):
+        operation = mod['operation'].capitalize()
+        file_path = mod['file_path']
+        self.console.print(f"- {operation} file: {file_path}")
+
+        if not show_content:
+            return
+        if operation in ['Edit', 'Create'] and 'content' in mod:
+            syntax = Syntax(mod['content'], "python", theme="monokai")
+            self.console.print(Panel(syntax, title=f"Content for {file_path}", border_style="green"))
+        elif operation == 'Move' and 'content' in mod:
+            self.console.print(f"  Destination path: {mod['content']}")
 
     def apply_modifications(self):
         with self.console.status("[bold green]Applying changes..."):
             diffs = self.workflow.apply_modifications(self.context)
         self.console.print("Changes applied successfully!", style="bold green")
         self.display_diffs(diffs)
+        if self.context.get('sync_message'):
+            self.console.print("The changed files will be sent with your next request.", style="bold yellow")
 
     def display_diffs(self, diffs: List[Dict[str, Any]]) -> None:
         self.console.print("\n[bold]Detailed changes:[/bold]")
@@ -1,36 +1,115 @@
 import importlib
 import os
-from typing import Dict, Any, Type
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Dict, Any, Type, Callable, Iterator, List
 from .components_base import BaseTask, BaseWorkflow, BaseInterface
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+BASE_CLASSES = {'tasks': BaseTask, 'workflows': BaseWorkflow, 'interfaces': BaseInterface}
+
+
+class LazyComponents(MutableMapping):
+    """
+    Mapping of component names to classes whose modules are imported on first access.
+
+    Names are known up front, so listing components never imports anything.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Type[Any]]] = None):
+        self._loaders: Dict[str, Callable[[], Type[Any]]] = dict(loaders or {})
+        self._loaded: Dict[str, Type[Any]] = {}
+
+    def __getitem__(self, name: str) -> Type[Any]:
+        if name not in self._loaded:
+            self._loaded[name] = self._loaders[name]()
+        return self._loaded[name]
+
+    def __setitem__(self, name: str, component: Type[Any]):
+        self._loaders[name] = lambda: component
+        self._loaded[name] = component
+
+    def __delitem__(self, name: str):
+        del self._loaders[name]
+        self._loaded.pop(name, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self._loaders)})"
+
+    def add_loader(self, name: str, loader: Callable[[], Type[Any]]):
+        self._loaders[name] = loader
+        self._loaded.pop(name, None)
+
+    def update_lazy(self, other: 'LazyComponents'):
+        """Merge another LazyComponents without importing its components."""
+        for name in other:
+            self.add_loader(name, other._loader_for(name))
+
+    def _loader_for(self, name: str) -> Callable[[], Type[Any]]:
+        if name in self._loaded:
+            component = self._loaded[name]
+            return lambda: component
+        return self._loaders[name]
+
 
 class ModuleLoader:
 
     @staticmethod
     def load_tasks() -> Dict[str, Type[BaseTask]]:
-        return ModuleLoader._load_modules('tasks', BaseTask)
+        return ModuleLoader._load_modules('tasks')
 
     @staticmethod
     def load_workflows() -> Dict[str, Type[BaseWorkflow]]:
-        return ModuleLoader._load_modules('workflows', BaseWorkflow)
-    
+        return ModuleLoader._load_modules('workflows')
+
     @staticmethod
     def load_interfaces() -> Dict[str, Type[BaseInterface]]:
-        return ModuleLoader._load_modules('interfaces', BaseInterface)
+        return ModuleLoader._load_modules('interfaces')
 
     @staticmethod
-    def _load_modules(module_type: str, base_class: Type[Any]) -> Dict[str, Type[Any]]:
-        modules = {}
+    def lazy_components(module_type: str) -> LazyComponents:
+        """Built-in components of a type, each imported when it is first requested."""
+        return LazyComponents({
+            module_name: (lambda module_name=module_name: ModuleLoader.load_module(module_type, module_name))
+            for module_name in ModuleLoader.list_modules(module_type)
+        })
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def list_modules(module_type: str) -> List[str]:
         module_dir = os.path.join(os.path.dirname(__file__), '..', 'components', module_type)
-        for filename in os.listdir(module_dir):
-            if filename.endswith('.py') and not filename.startswith('__'):
-                module_name = filename[:-3]
-                module = importlib.import_module(f'..components.{module_type}.{module_name}', package='repoai.components')
-                for item_name in dir(module):
-                    item = getattr(module, item_name)
-                    if isinstance(item, type) and issubclass(item, base_class) and item != base_class:
-                        modules[module_name] = item
-        return modules
\ No newline at end of file
+        return sorted(filename[:-3] for filename in os.listdir(module_dir)
+                      if filename.endswith('.py') and not filename.startswith('__'))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def load_module(module_type: str, module_name: str) -> Type[Any]:
+        base_class = BASE_CLASSES[module_type]
+        module = importlib.import_module(f'..components.{module_type}.{module_name}', package='repoai.components')
+        component = None
+        for item_name in dir(module):
+            item = getattr(module, item_name)
+            if isinstance(item, type) and issubclass(item, base_class) and item != base_class:
+                component = item
+        if component is None:
+            raise KeyError(f"No {module_type[:-1]} class found in module '{module_name}'")
+        logger.debug(f"Loaded {module_type[:-1]}: {module_name}")
+        return component
+
+    @staticmethod
+    def _load_modules(module_type: str) -> Dict[str, Type[Any]]:
+        modules = {}
+        for module_name in ModuleLoader.list_modules(module_type):
+            try:
+                modules[module_name] = ModuleLoader.load_module(module_type, module_name)
+            except KeyError:
+                continue
+        return modules
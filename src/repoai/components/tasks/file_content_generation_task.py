@@ -1,3 +1,4 @@
+import hashlib
 from typing import List, Dict, Tuple, Any
 from repoai.components.components_base import BaseTask
 from repoai.services.llm_service import LLMService
@@ -7,8 +8,22 @@ from repoai.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+PENDING = 'pending'
+DONE = 'done'
+FAILED = 'failed'
+
 
 class FileContentGenerationTask(BaseTask):
+    """
+    Generates the content of every file in context['file_paths'].
+
+    Progress is tracked per file in context['generation_state'], a map from file path to
+    {'status': pending|done|failed, 'content_hash': ..., 'error': ...}. Progress is saved once
+    per file, when it is done or has failed, so a resumed run only regenerates files that are
+    not done, and paths added to or removed from the file list are picked up. Generation stops
+    after `max_consecutive_generation_failures` failures in a row (e.g. the provider is down),
+    leaving the remaining files pending.
+    """
     def __init__(self, llm_service: LLMService, progress_service: ProgressService, model_config: Dict[str, Any]={}):
         super().__init__()
         self.llm_service = llm_service
@@ -19,21 +34,18 @@ class FileContentGenerationTask(BaseTask):
         project_description = context['report']
         file_list = context['file_paths']
 
-        last_state = self.progress_service.get_last_state()
-        if last_state:
-            generated_files = context.get('generated_files', {})
-            generation_history = context.get('generation_history', [])
-            last_processed_file = context.get('current_file')
+        generated_files = context.get('generated_files', {})
+        generation_history = context.get('generation_history', [])
+        generation_state = self._reconcile_state(file_list, context.get('generation_state'), generated_files)
+        generation_history = [entry for entry in generation_history if entry['file_path'] in generated_files]
 
-            if last_processed_file in file_list:
-                start_index = file_list.index(last_processed_file) + 1
-            else:
-                start_index = 0
-            remaining_files = file_list[start_index:]
-        else:
-            generated_files = {}
-            generation_history = []
-            remaining_files = file_list
+        remaining_files = [file_path for file_path in file_list if generation_state[file_path]['status'] != DONE]
+        if len(remaining_files) < len(file_list):
+            logger.info(f"Resuming file generation: {len(file_list) - len(remaining_files)} of {len(file_list)} files already done.")
+
+        context['generated_files'] = generated_files
+        context['generation_history'] = generation_history
+        context['generation_state'] = generation_state
 
         if remaining_files:
             generated_files, generation_history = self._generate_file_contents(
@@ -42,12 +54,42 @@ class FileContentGenerationTask(BaseTask):
         context['generated_files'] = generated_files
         context['generation_history'] = generation_history
 
+        failed_files = [file_path for file_path in file_list if generation_state[file_path]['status'] == FAILED]
+        pending_files = [file_path for file_path in file_list if generation_state[file_path]['status'] == PENDING]
+        if failed_files:
+            pending_note = f" {len(pending_files)} file(s) were not attempted." if pending_files else ""
+            raise Exception(f"File content generation failed for {len(failed_files)} file(s): {', '.join(failed_files)}.{pending_note} Resume to retry them.")
+
+    @staticmethod
+    def _reconcile_state(file_list: List[str], generation_state: Dict[str, Dict[str, Any]], generated_files: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Align a persisted state map with the current file list and generated contents."""
+        generation_state = generation_state or {}
+        reconciled = {}
+        for file_path in file_list:
+            state = generation_state.get(file_path)
+            if state is None and file_path in generated_files:
+                # Progress saved before per-file states existed
+                state = {'status': DONE, 'content_hash': FileContentGenerationTask._content_hash(generated_files[file_path][1])}
+            if (state and state['status'] == DONE and file_path in generated_files
+                    and state.get('content_hash') == FileContentGenerationTask._content_hash(generated_files[file_path][1])):
+                reconciled[file_path] = state
+            else:
+                reconciled[file_path] = {'status': PENDING}
+        for file_path in list(generated_files.keys()):
+            if reconciled.get(file_path, {}).get('status') != DONE:
+                del generated_files[file_path]
+        return reconciled
+
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
     def _generate_file_contents(self, project_description: str,
                                 file_list: List[str],
                                 context: dict,
                                 generated_files: Dict[str, Any],
                                 generation_history: List[Dict[str, Any]]
-                                ) -> Tuple[Dict[str, Any], List[Any], List[Dict[str, Any]]]:
+                                ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         system_message = self.llm_service.config.get_llm_prompt(task_id='file_content_generation_task', prompt_type='system')
         messages = [
             {
@@ -55,13 +97,31 @@ class FileContentGenerationTask(BaseTask):
                 "content": system_message
             }
         ]
+        generation_state = context['generation_state']
+        max_failures = self.llm_service.config.get('max_consecutive_generation_failures', 3)
+        consecutive_failures = 0
 
         for file_path in file_list:
-            file_content, messages, language, code = self._generate_single_file_content(file_path, messages, project_description)
+            if max_failures and consecutive_failures >= max_failures:
+                logger.error(f"Stopping file generation after {consecutive_failures} consecutive failures; "
+                             f"{len(file_list) - file_list.index(file_path)} file(s) left pending. Resume to retry.")
+                break
+            try:
+                file_content, messages, language, code = self._generate_single_file_content(file_path, messages, project_description)
+            except Exception as e:
+                logger.error(f"Failed to generate file content for {file_path}: {str(e)}")
+                if messages[-1]['role'] == 'user':
+                    messages.pop()
+                generation_state[file_path] = {'status': FAILED, 'error': str(e)}
+                consecutive_failures += 1
+                self.progress_service.save_progress("file_content_generation", context)
+                continue
+
+            consecutive_failures = 0
             generation_history.append(dict(file_path=file_path, file_content=file_content, language=language, code=code))
             generated_files[file_path] = [language, code]
+            generation_state[file_path] = {'status': DONE, 'content_hash': self._content_hash(code)}
 
-            context['current_file'] = file_path
             context['generated_files'] = generated_files
             context['generation_history'] = generation_history
             self.progress_service.save_progress("file_content_generation", context)
@@ -69,19 +129,19 @@ class FileContentGenerationTask(BaseTask):
 
         return generated_files, generation_history
 
-    def _generate_single_file_content(self, file_path: str, messages: List[Dict[str, str]], project_description: str) -> Tuple[str, List[Dict[str, str]], str, str, List[int], bool, bool]:
+    def _generate_single_file_content(self, file_path: str, messages: List[Dict[str, str]], project_description: str) -> Tuple[str, List[Dict[str, str]], str, str]:
         user_prompt = self.llm_service.config.get_llm_prompt(task_id='file_content_generation_task', prompt_type='user', file_path=file_path, project_description=project_description)
         messages.append({"role": "user", "content": user_prompt})
 
-        response = self.llm_service.get_completion(messages=messages, **self.model_config)
-        content = response.content
+        content = self.llm_service.get_completion_with_continuation(messages, 'file_content_generation_task', **self.model_config)
         messages.append({"role": "assistant", "content": content})
 
+        language, code = None, None
         if content:
             language, code = extract_outer_code_block(content)
-            if not code:
-                code = content
-            if not language:
-                language = "markdown"
+        if not code:
+            code = content
+        if not language:
+            language = "markdown"
 
-        return content, messages, language, code
\ No newline at end of file
+        return content, messages, language, code
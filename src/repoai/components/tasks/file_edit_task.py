@@ -16,9 +16,15 @@ class FileEditTask(BaseTask):
         self.model_config = model_config
 
     def execute(self, context: Dict[str, Any]) -> None:
-        file_path = context['file_path']
-        current_content = context['current_content']
-        edit_message = context['edit_message']
+        if 'new_content' not in context:
+            context['new_content'] = self.generate_new_content(context['file_path'], context['current_content'], context['edit_message'])
+
+        logger.info(f"Edited content: {context['new_content'][:60]}...")
+
+        self.progress_service.save_progress("file_edit", context)
+
+    def generate_new_content(self, file_path: str, current_content: str, edit_message: str) -> str:
+        """Apply the edit message to the current content. Does not touch the progress, so it can run in the background."""
         if current_content.strip() != edit_message.strip():
             system_prompt = self.llm_service.config.get_llm_prompt(task_id='file_edit_task', prompt_type='system')
             user_prompt = self.llm_service.config.get_llm_prompt(
@@ -28,14 +34,8 @@ class FileEditTask(BaseTask):
                 {"role": "user", "content": user_prompt}
             ]
 
-            response = self.llm_service.get_completion(messages=messages, **self.model_config)
-            new_content = response.content.strip()
+            new_content = self.llm_service.get_completion_with_continuation(messages, 'file_edit_task', **self.model_config).strip()
 
             _, outer_content = extract_outer_code_block(new_content)
-            context['new_content'] = outer_content if outer_content else new_content
-        else:
-            context['new_content'] = current_content
-
-        logger.info(f"Edited content: {context['new_content'][:60]}...")
-
-        self.progress_service.save_progress("file_edit", context)
+            return outer_content if outer_content else new_content
+        return current_content
@@ -1,9 +1,12 @@
-import re
-from typing import Dict, Any, List
+import hashlib
+from typing import Dict, Any, List, Callable, Optional
 from ...components.components_base import BaseTask
 from ...services.llm_service import LLMService
 from ...services.progress_service import ProgressService
-from ...utils.common_utils import extract_outer_code_block, extract_code_blocks
+from ...utils.fenced_blocks import parse_fenced_blocks
+from ...utils.modification_parser import ModificationStreamParser
+from ...utils.markdown_generator import MarkdownGenerator
+from ...utils.history_manager import HistoryManager
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,11 +18,17 @@ class ProjectModificationTask(BaseTask):
         self.llm_service = llm_service
         self.progress_service = progress_service
         self.model_config = model_config
+        self.history_manager = HistoryManager(self._count_tokens, keep_turns=self.llm_service.config.get('history_keep_turns', 4))
 
-    def execute(self, context: Dict[str, Any]) -> None:
-        self._process_chat(context)
+    def execute(self, context: Dict[str, Any], on_modification: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        """
+        Args:
+            on_modification: If given and `stream_modifications` is enabled, the response is
+                streamed and this is called with each modification as soon as it is complete.
+        """
+        self._process_chat(context, on_modification)
 
-    def _process_chat(self, context: Dict[str, Any]):
+    def _process_chat(self, context: Dict[str, Any], on_modification: Optional[Callable[[Dict[str, Any]], None]] = None):
         messages = context.get('messages', [])
         user_input = context.get('user_input', '')
         file_contexts = context.get('file_contexts', [])
@@ -28,31 +37,30 @@ class ProjectModificationTask(BaseTask):
         if not messages:
             system_message = self.llm_service.config.get_llm_prompt(task_id='project_modification_task', prompt_type='system')
             messages = [{"role": "system", "content": system_message}]
+            context['sent_files'] = {}
+            context.pop('sync_message', None)  # The report of a new conversation is current
             project_report = context.get('project_report', '')
             text_message = f"\nContext:\n\n{project_report}\n\nRequest:\n\n{user_input}\n\n"
-            if file_contexts:
-                text_message += "Additional information for context:\n"
-                for file_context in file_contexts:
-                    text_message += f"File: {file_context['file_path']}\nContent:\n```\n{file_context['content']}\n```\n\n"
-            user_message_content = [{"type": "text", "text": text_message}]
-            if image_contexts:
-                for image_context in image_contexts:
-                    user_message_content.append({"type": "image_url", "image_url": image_context['image_url']})
-            messages.append({"role": "user", "content": user_message_content})
         else:
-            text_message = f"{user_input}\n\n"
-            if file_contexts:
-                text_message += "Additional information for context:\n"
-                for file_context in file_contexts:
-                    text_message += f"File: {file_context['file_path']}\nContent:\n```\n{file_context['content']}\n```\n\n"
-            user_message_content = [{"type": "text", "text": text_message}]
-            if image_contexts:
-                for image_context in image_contexts:
-                    user_message_content.append({"type": "image_url", "image_url": image_context['image_url']})
-            messages.append({"role": "user", "content": user_message_content})
-
-        response = self.llm_service.get_completion(messages=messages, **self.model_config)
-        assistant_message = {"role": "assistant", "content": response.content}
+            self._compact_history(context, messages)
+            project_report = context.get('project_report', '')
+            sync_message = context.pop('sync_message', None)
+            text_message = f"{sync_message}Request:\n\n{user_input}\n\n" if sync_message else f"{user_input}\n\n"
+        if file_contexts:
+            text_message += "Additional information for context:\n"
+            text_message += self._format_file_contexts(context, file_contexts, project_report, len(messages))
+        user_message_content = [{"type": "text", "text": text_message}]
+        if image_contexts:
+            for image_context in image_contexts:
+                user_message_content.append({"type": "image_url", "image_url": image_context['image_url']})
+        messages.append({"role": "user", "content": user_message_content})
+
+        if on_modification is not None and self.llm_service.config.get('stream_modifications', True):
+            content, modifications = self._stream_modifications(messages, on_modification)
+        else:
+            content = self.llm_service.get_completion(messages=messages, **self.model_config).content
+            modifications = self._extract_modifications(content)
+        assistant_message = {"role": "assistant", "content": content}
         messages.append(assistant_message)
 
         context['messages'] = messages
@@ -60,93 +68,91 @@ class ProjectModificationTask(BaseTask):
         context['file_contexts'] = []
         context['image_contexts'] = []
 
-        context['modifications'] = self._extract_modifications(response.content)
+        context['modifications'] = modifications
 
         self.progress_service.save_progress("project_modification", context)
 
-    def _extract_modifications(self, content: str) -> List[Dict[str, Any]]:
-        modifications = []
-        lines = content.split('\n')
-        current_modification = None
-        content_lines = []
-
-        operation_pattern = r'^<::(CREATE|EDIT|DELETE|MOVE)::>\s+(.+)$'
-
-        for line in lines:
-            stripped_line = line.strip()
-            
-            if current_modification is None:
-                match = re.match(operation_pattern, stripped_line)
-                if match:
-                    if content_lines and modifications:
-                        self._finalize_modification(modifications[-1], '\n'.join(content_lines))
-                        content_lines = []
-                    
-                    operation, file_path = match.groups()
-                    current_modification = {'operation': operation.lower(), 'file_path': file_path}
-
-                    if operation == 'MOVE':
-                        move_parts = file_path.split(' TO ')
-                        if len(move_parts) == 2:
-                            current_modification['file_path'] = move_parts[0]
-                            current_modification['new_path'] = move_parts[1]
-                        else:
-                            raise Exception(f"Invalid MOVE operation format: {line}")
-                    
-                    modifications.append(current_modification)
-                    
-                    if operation in ['DELETE', 'MOVE']:
-                        current_modification = None
-                else:
-                    content_lines.append(line)
-            else:
-                match = re.match(operation_pattern, stripped_line)
-                if match:
-                    self._finalize_modification(current_modification, '\n'.join(content_lines))
-                    content_lines = []
-                    current_modification = None
-                    
-                    operation, file_path = match.groups()
-                    current_modification = {'operation': operation.lower(), 'file_path': file_path}
-
-                    if operation == 'MOVE':
-                        move_parts = file_path.split(' TO ')
-                        if len(move_parts) == 2:
-                            current_modification['file_path'] = move_parts[0]
-                            current_modification['new_path'] = move_parts[1]
-                        else:
-                            raise Exception(f"Invalid MOVE operation format: {line}")
-                    
-                    modifications.append(current_modification)
-                    
-                    if operation in ['DELETE', 'MOVE']:
-                        current_modification = None
-                else:
-                    content_lines.append(line)
-
-        if current_modification and content_lines:
-            self._finalize_modification(current_modification, '\n'.join(content_lines))
+    def _count_tokens(self, text: str) -> int:
+        model = self.model_config.get('model') or self.llm_service.config.get('default_model')
+        return self.llm_service.token_counter.count_text_tokens(model, text)
+
+    def _compact_history(self, context: Dict[str, Any], messages: List[Dict[str, Any]]):
+        """
+        Summarize older turns when the conversation exceeds `history_max_tokens`, or if unset,
+        `history_compaction_threshold` of the model's input limit. Runs before the next request
+        is added, so its file contexts never reference summarized messages.
+        """
+        config = self.llm_service.config
+        max_tokens = config.get('history_max_tokens', 0)
+        if not max_tokens:
+            model = self.model_config.get('model') or config.get('default_model')
+            max_input_tokens = self.llm_service.model_registry.max_input_tokens(model)
+            if not max_input_tokens:
+                return
+            max_tokens = int(max_input_tokens * config.get('history_compaction_threshold', 0.8))
+        context['messages'] = messages
+        try:
+            self.history_manager.compact_if_needed(context, max_tokens)
+        except Exception as e:
+            logger.warning(f"Could not compact the conversation history: {str(e)}")
+
+    def _format_file_contexts(self, context: Dict[str, Any], file_contexts: List[Dict[str, Any]],
+                              project_report: Optional[str], message_index: int) -> str:
+        """
+        File contexts for the user message at `message_index`. Contents already in the conversation,
+        sent with an earlier request or shown in full in the project report, are replaced by a
+        reference. `context['sent_files']` maps each file context sent to its content hash and
+        the index of the message containing it. The report is not used for files changed since it
+        was generated (`context['stale_report_files']`, see ProjectModificationWorkflow.sync_context).
+        """
+        deduplicate = self.llm_service.config.get('deduplicate_file_contexts', True)
+        sent_files = context.setdefault('sent_files', {})
+        stale_report_files = set(context.get('stale_report_files', []))
+        text = ""
+        for file_context in file_contexts:
+            label, content = file_context['file_path'], file_context['content']
+            content_hash = hashlib.sha1(content.encode('utf-8', errors='replace')).hexdigest()
+            sent = sent_files.get(label)
+            if deduplicate and sent is not None and sent['hash'] == content_hash:
+                logger.debug(f"File context {label} unchanged since message {sent['message']}, sending a reference")
+                source = "the project report" if sent.get('in_report') else f"request {(sent['message'] + 1) // 2}"
+                text += f"File: {label}\nContent: unchanged, see {source}\n\n"
+                continue
+            sent_files[label] = {'hash': content_hash, 'message': message_index}
+            if (deduplicate and project_report and label not in stale_report_files
+                    and MarkdownGenerator.contains_file(project_report, label, content)):
+                sent_files[label]['in_report'] = True
+                text += f"File: {label}\nContent: unchanged, see the project report\n\n"
+                continue
+            text += f"File: {label}\nContent:\n```\n{content}\n```\n\n"
+        return text
 
-        return modifications
+    def _extract_modifications(self, content: str) -> List[Dict[str, Any]]:
+        return ModificationStreamParser(self._finalize_modification).parse(content)
+
+    def _stream_modifications(self, messages: List[Dict[str, Any]], on_modification: Callable[[Dict[str, Any]], None]):
+        parser = ModificationStreamParser(self._finalize_modification)
+        content_parts = []
+        for chunk in self.llm_service.get_completion_stream(messages=messages, **self.model_config):
+            content_parts.append(chunk)
+            for modification in parser.feed(chunk):
+                on_modification(modification)
+        for modification in parser.close():
+            on_modification(modification)
+        return ''.join(content_parts), parser.modifications
 
     def _finalize_modification(self, modification: Dict[str, Any], content: str):
         if modification['operation'] in ['create', 'edit']:
-            blocks = extract_code_blocks(content)
-            if len(blocks) > 1:
-                if "markdown" == blocks[0][0].lower():
-                    capture_first_block = False
-                else:
-                    capture_first_block = True
-            elif len(blocks) == 1:
-                capture_first_block = False
-            else:
-                capture_first_block = False
+            document = parse_fenced_blocks(content)
+            blocks = [] if document.unterminated else document.blocks
+            # Several top-level blocks: the first one is the file, unless it is a markdown file
+            capture_first_block = len(blocks) > 1 and blocks[0].language.lower() != "markdown"
 
             if capture_first_block:
-                modification['language'] = blocks[0][0].lower()
-                modification['content'] = blocks[0][1].strip()
+                modification['language'] = blocks[0].language.lower()
+                modification['content'] = document.block_content(blocks[0]).strip()
             else:
-                lang, extracted_content = extract_outer_code_block(content)
+                lang, extracted_content = document.outer_block()
                 if extracted_content:
                     modification['content'] = extracted_content.strip()
                 else:
@@ -1,7 +1,8 @@
-from typing import Dict, Any
+from typing import Dict, Any, List
 from ...components.components_base import BaseTask
 from ...services.llm_service import LLMService
 from ...utils.common_utils import extract_paths
+from ...utils.structure_parser import StructureParser
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,6 +13,7 @@ class StructureToPathsTask(BaseTask):
         super().__init__()
         self.llm_service = llm_service
         self.model_config = model_config
+        self.min_confidence = self.llm_service.config.get('structure_parse_min_confidence', 0.9)
 
     def execute(self, context: dict) -> None:
         raw_structure = context.get('structure', '')
@@ -19,6 +21,19 @@ class StructureToPathsTask(BaseTask):
         if not raw_structure:
             raise ValueError("No raw structure provided in the context")
 
+        files, folders, confidence = StructureParser.parse(raw_structure)
+        if confidence >= self.min_confidence:
+            logger.debug(f"Structure parsed locally with confidence {confidence:.2f}")
+            context['raw_paths'] = '\n'.join(folders + files)
+        else:
+            logger.debug(f"Local structure parsing confidence {confidence:.2f} below {self.min_confidence}. Falling back to LLM.")
+            context['raw_paths'] = self._paths_from_llm(raw_structure)
+            files, folders = self._split_paths(extract_paths(context['raw_paths']))
+
+        context['file_paths'] = files
+        context['folder_paths'] = folders
+
+    def _paths_from_llm(self, raw_structure: str) -> str:
         system_prompt = self.llm_service.config.get_llm_prompt(task_id='structure_to_paths_task', prompt_type='system')
         user_prompt = self.llm_service.config.get_llm_prompt(
             task_id='structure_to_paths_task', prompt_type='user', tree_structure=raw_structure)
@@ -29,10 +44,10 @@ class StructureToPathsTask(BaseTask):
         ]
 
         response = self.llm_service.get_completion(messages=messages, **self.model_config)
+        return response.content
 
-        context['raw_paths'] = response.content
-
-        paths = extract_paths(response.content)
+    @staticmethod
+    def _split_paths(paths: List[str]):
         files = []
         folders = []
         for path in paths:
@@ -40,5 +55,4 @@ class StructureToPathsTask(BaseTask):
                 folders.append(path)
             else:
                 files.append(path)
-        context['file_paths'] = files
-        context['folder_paths'] = folders
+        return files, folders
@@ -2,7 +2,6 @@ from typing import List, Dict, Any
 from pathlib import Path
 from ...components.components_base import BaseWorkflow
 from ...core.project_manager import ProjectManager
-from ...services.llm_service import LLMService
 from ...services.progress_service import ProgressService
 from ...utils.logger import get_logger
 
@@ -14,7 +13,7 @@ class ProjectGenerationWorkflow(BaseWorkflow):
         super().__init__()
         self.project_manager = project_manager
         self.progress_service = progress_service
-        self.llm_service = LLMService(project_manager.project_path, project_manager.config)
+        self.llm_service = project_manager.services.llm_service
         
         self.model_config = model_config or {}
         
@@ -1,10 +1,11 @@
-from typing import Dict, Any, List
+import hashlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Callable, Optional, Tuple
 from ...components.components_base import BaseWorkflow
 from ...core.project_manager import ProjectManager
-from ...services.markdown_service import MarkdownService
-from ...services.llm_service import LLMService
 from ...services.progress_service import ProgressService
 from ...utils.common_utils import image_to_base64
+from ...utils.file_chunker import excerpt_file
 from ...utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -14,8 +15,8 @@ class ProjectModificationWorkflow(BaseWorkflow):
     def __init__(self, project_manager: ProjectManager, progress_service: ProgressService, model_config: Dict[str, Any]):
         super().__init__()
         self.project_manager = project_manager
-        self.llm_service = LLMService(project_manager.project_path, project_manager.config)
-        self.markdown_service = MarkdownService(project_manager.project_path, project_manager.config.get('repoai_ignore_file'))
+        self.llm_service = project_manager.services.llm_service
+        self.markdown_service = project_manager.services.markdown_service
         self.progress_service = progress_service
         
         self.modification_task = self.project_manager.get_task("project_modification_task")(
@@ -28,31 +29,164 @@ class ProjectModificationWorkflow(BaseWorkflow):
             self.progress_service,
             model_config=model_config.get("file_edit_task", {})
         )
+        self._edit_executor: Optional[ThreadPoolExecutor] = None
+        self._precomputed_edits: Dict[Tuple[str, str, str], Future] = {}  # (path, current, edit message) -> new content
 
-    def execute(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        self.modification_task.execute(context)
+    def execute(self, context: Dict[str, Any], on_modification: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Args:
+            on_modification: Called with each proposed modification while the response is still
+                being generated, after its path has been verified.
+        """
+        def handle_modification(modification: Dict[str, Any]):
+            self.prepare_modification(modification)
+            if on_modification is not None:
+                on_modification(modification)
+
+        self.modification_task.execute(context, on_modification=handle_modification)
         self.progress_service.save_progress("project_modification", context)
         return context
+
+    def prepare_modification(self, modification: Dict[str, Any]):
+        """Start the work that does not need the user's approval: path verification and, if
+        `precompute_edits` is enabled, the file edit in a background thread."""
+        modification['verified_path'] = self.project_manager.verify_and_correct_file_path(modification['file_path'])
+        if modification['operation'] == 'edit' and self.project_manager.config.get('precompute_edits', False):
+            file_path = modification['verified_path']
+            if not self.project_manager.file_exists(file_path):
+                return
+            current_content = self.project_manager.read_file(file_path)
+            key = (file_path, current_content, modification['content'])
+            if key not in self._precomputed_edits:
+                if self._edit_executor is None:
+                    self._edit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="repoai-edit")
+                self._precomputed_edits[key] = self._edit_executor.submit(
+                    self.file_edit_task.generate_new_content, file_path, current_content, modification['content'])
+                logger.debug(f"Precomputing edit of {file_path}")
+
+    def _get_precomputed_edit(self, file_path: str, current_content: str, edit_message: str) -> Optional[str]:
+        future = self._precomputed_edits.pop((file_path, current_content, edit_message), None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"Precomputed edit of {file_path} failed, running it again: {str(e)}")
+            return None
+
+    def _discard_precomputed_edits(self):
+        for future in self._precomputed_edits.values():
+            future.cancel()
+        self._precomputed_edits = {}
+        if self._edit_executor is not None:
+            # A running edit finishes in the background; the next proposal starts a new executor
+            self._edit_executor.shutdown(wait=False)
+            self._edit_executor = None
     
     def populate_context(self, context: Dict[str, Any], user_input: str=None, project_report: str=None, file_paths: List[str]=None, image_paths: List[str]=None) -> Dict[str, Any]:
         if user_input:
             context['user_input'] = user_input
         if project_report:
             context['project_report'] = project_report
+        if file_paths or user_input:
+            # file_paths are context specs: paths, line ranges, symbols or globs (see ContextSpec)
+            file_paths = list(file_paths or [])
+            config = self.project_manager.config
+            selected_files = [item['path'] for item in self.project_manager.services.file_context_resolver.resolve(file_paths, strict=False)]
+            related_files = []
+            if selected_files and config.get('expand_file_contexts', True):
+                related_files += self._find_dependency_context(selected_files)
+            if user_input and config.get('auto_symbol_context', True):
+                related_files += self._find_symbol_context(user_input, selected_files + related_files)
+            if user_input and config.get('auto_search_context', False):
+                related_files += self._find_search_context(user_input, selected_files + related_files)
+            file_paths += related_files
         if file_paths:
-            context['file_contexts'] = self._process_file_contexts(file_paths)
+            context['file_contexts'] = self._process_file_contexts(file_paths, query=user_input or '')
         if image_paths:
             context['image_contexts'] = self._process_image_contexts(image_paths)
         return context
 
-    def _process_file_contexts(self, file_contexts: List[str]) -> List[Dict[str, str]]:
+    def _find_dependency_context(self, file_paths: List[str]) -> List[str]:
+        """Direct imports and importers of the given files that fit in `file_context_expansion_tokens`."""
+        dependency_graph = self.project_manager.services.dependency_graph
+        try:
+            dependency_graph.update()
+        except Exception as e:
+            logger.warning(f"Could not update the dependency graph: {str(e)}")
+            return []
+        token_budget = self.project_manager.config.get('file_context_expansion_tokens', 8000)
+        related_files = dependency_graph.related_files(file_paths, token_budget, self.project_manager.read_file, self.count_tokens)
+        if related_files:
+            logger.info(f"Adding related files: {', '.join(related_files)}")
+        return related_files
+
+    def count_tokens(self, text: str) -> int:
+        model = self.modification_task.model_config.get('model', self.project_manager.config.get('default_model'))
+        return self.llm_service.token_counter.count_text_tokens(model, text)
+
+    def get_impacted_files(self, context: Dict[str, Any]) -> List[str]:
+        """Files outside of the proposed modifications that import the edited, moved or deleted files."""
+        modifications = context.get('modifications', [])
+        changed_files = [mod.get('verified_path') or mod['file_path'] for mod in modifications if mod['operation'] != 'create']
+        if not changed_files:
+            return []
+        dependency_graph = self.project_manager.services.dependency_graph
+        try:
+            dependency_graph.update()
+        except Exception as e:
+            logger.warning(f"Could not update the dependency graph: {str(e)}")
+            return []
+        modified_files = {mod.get('verified_path') or mod['file_path'] for mod in modifications}
+        return [f for f in dependency_graph.impacted_files(changed_files) if f not in modified_files]
+
+    def _find_symbol_context(self, user_input: str, file_paths: List[str]) -> List[str]:
+        """Files defining or using the symbols mentioned in the request, from the symbol index."""
+        symbol_index = self.project_manager.services.symbol_index
+        try:
+            symbol_index.update()
+        except Exception as e:
+            logger.warning(f"Could not update the symbol index: {str(e)}")
+            return []
+        max_files = self.project_manager.config.get('symbol_context_max_files', 5)
+        related_files = symbol_index.files_for_request(user_input, max_files=max_files, exclude=file_paths)
+        if related_files:
+            logger.info(f"Adding files related to the request: {', '.join(related_files)}")
+        return related_files
+
+    def _find_search_context(self, user_input: str, file_paths: List[str]) -> List[str]:
+        """Files whose content best matches the request in the project search index."""
+        file_manager = self.project_manager.file_manager
+        try:
+            file_manager.build_search_index()
+        except Exception as e:
+            logger.warning(f"Could not update the search index: {str(e)}")
+            return []
+        max_files = self.project_manager.config.get('search_context_max_files', 5)
+        related_files = file_manager.search_index.search_files(user_input, limit=max_files, exclude=file_paths)
+        if related_files:
+            logger.info(f"Adding files matching the request: {', '.join(related_files)}")
+        return related_files
+
+    def _process_file_contexts(self, file_contexts: List[str], query: str = '') -> List[Dict[str, Any]]:
+        """
+        Load context specs with their token counts. Whole files larger than `context_file_max_tokens`
+        are reduced to their chunks most relevant to `query`.
+        """
+        max_file_tokens = self.project_manager.config.get('context_file_max_tokens', 4000)
         processed_contexts = []
-        for file_path in file_contexts:
-            content = self.project_manager.read_file(file_path)
+        for item in self.project_manager.services.file_context_resolver.load(file_contexts, strict=False):
+            content = item['content']
             if content:
+                if item['start_line'] is None and max_file_tokens:
+                    excerpt = excerpt_file(item['path'], content, query, max_file_tokens, self.count_tokens)
+                    if excerpt is not None:
+                        logger.debug(f"Using an excerpt of {item['path']} as context")
+                        content = excerpt
                 processed_contexts.append({
-                    "file_path": file_path,
-                    "content": content
+                    "file_path": item['label'],
+                    "content": content,
+                    "tokens": self.count_tokens(content)
                 })
         return processed_contexts
 
@@ -63,13 +197,13 @@ class ProjectModificationWorkflow(BaseWorkflow):
         return processed_contexts
 
     def apply_modifications(self, context: Dict[str, Any]) -> List[Dict[str, Any]]:
-        modifications = context.get('modifications', [])
+        modifications = self._order_modifications(context.get('modifications', []))
         operations = []
         diffs = []
 
         for mod in modifications:
             operation = mod['operation']
-            file_path = self.project_manager.verify_and_correct_file_path(mod['file_path'])
+            file_path = mod.get('verified_path') or self.project_manager.verify_and_correct_file_path(mod['file_path'])
 
             if operation == 'create':
                 operations.append({
@@ -84,6 +218,9 @@ class ProjectModificationWorkflow(BaseWorkflow):
                     'current_content': current_content,
                     'edit_message': mod['content']
                 }
+                precomputed_content = self._get_precomputed_edit(file_path, current_content, mod['content'])
+                if precomputed_content is not None:
+                    edit_context['new_content'] = precomputed_content
                 self.file_edit_task.execute(edit_context)
                 new_content = edit_context['new_content']
                 operations.append({
@@ -105,10 +242,31 @@ class ProjectModificationWorkflow(BaseWorkflow):
                 })
         
         self.project_manager.batch_operations(operations)
+        if context.get('messages'):
+            context.setdefault('applied_messages', []).append(len(context['messages']) - 1)
         self.progress_service.clear_progress()
+        self._discard_precomputed_edits()
+        if self.project_manager.config.get('sync_after_modifications', True):
+            self.sync_context(context)
 
         return diffs
 
+    def _order_modifications(self, modifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Edits in dependency order, so files are edited (and their diffs shown) before the files importing them."""
+        edit_count = sum(1 for mod in modifications if mod['operation'] == 'edit')
+        edits = {mod.get('verified_path') or mod['file_path']: mod for mod in modifications if mod['operation'] == 'edit'}
+        if len(edits) < 2 or len(edits) != edit_count:
+            return modifications
+        try:
+            dependency_graph = self.project_manager.services.dependency_graph
+            dependency_graph.update()
+            ordered_edits = iter([edits[f] for f in dependency_graph.generation_order(list(edits))])
+        except Exception as e:
+            logger.warning(f"Could not order the modifications by dependencies: {str(e)}")
+            return modifications
+        # Edits take the positions of the original edits, other operations keep their place
+        return [next(ordered_edits) if mod['operation'] == 'edit' else mod for mod in modifications]
+
     def _generate_edit_diff(self, file_path: str, current_content: str, suggested_content: str, new_content: str) -> Dict[str, Any]:
         import difflib
         return {
@@ -132,16 +290,85 @@ class ProjectModificationWorkflow(BaseWorkflow):
             }
         }
 
-    def generate_project_report(self) -> str:
+    def generate_project_report(self, full_content_files: Optional[List[str]] = None) -> str:
+        """Report in the configured `report_mode`; in 'hybrid' mode `full_content_files` (or the
+        configured `report_full_content_files`) are shown in full and the other files as outlines."""
+        config = self.project_manager.config
+        if full_content_files is None:
+            full_content_files = config.get('report_full_content_files', [])
         return self.markdown_service.generate_markdown_compilation(
-            f" "
+            f" ",
+            mode=config.get('report_mode', 'full'),
+            full_content_files=full_content_files,
+            max_file_tokens=config.get('report_max_file_tokens', 0)
         )
 
+    def sync_context(self, context: Dict[str, Any]) -> Dict[str, List]:
+        """
+        Compare the project with its state when the report was generated (or the last sync) and
+        queue a message with the contents of the changed files and the deleted and renamed ones
+        in `context['sync_message']`, sent before the next request. Files changed since the report
+        are accumulated in `context['stale_report_files']`. The conversation, and so
+        the cached prompt prefix, is kept instead of regenerating the report with `reset_chat`.
+        Returns the lists of `changed`, `added` and `deleted` files and `renamed` (old, new) pairs.
+        """
+        file_manager = self.project_manager.file_manager
+        previous = context.get('report_snapshot')
+        snapshot = file_manager.snapshot_files(previous)
+        context['report_snapshot'] = snapshot
+        changes = {'changed': [], 'added': [], 'deleted': [], 'renamed': []}
+        if previous is None:
+            return changes
+        changes['changed'] = [f for f in snapshot if f in previous and snapshot[f]['hash'] != previous[f]['hash']]
+        added = [f for f in snapshot if f not in previous]
+        deleted = [f for f in previous if f not in snapshot]
+        # A deleted file and an added one with the same content are a rename
+        deleted_by_hash = {}
+        for file_path in deleted:
+            deleted_by_hash.setdefault(previous[file_path]['hash'], []).append(file_path)
+        for file_path in added:
+            candidates = deleted_by_hash.get(snapshot[file_path]['hash'])
+            if candidates:
+                changes['renamed'].append((candidates.pop(0), file_path))
+            else:
+                changes['added'].append(file_path)
+        renamed_files = {old_path for old_path, _ in changes['renamed']}
+        changes['deleted'] = [f for f in deleted if f not in renamed_files]
+        if not any(changes.values()):
+            return changes
+
+        stale_report_files = context.setdefault('stale_report_files', [])
+        for file_path in changes['changed'] + changes['added'] + changes['deleted'] + [f for pair in changes['renamed'] for f in pair]:
+            if file_path not in stale_report_files:
+                stale_report_files.append(file_path)
+        sent_files = context.setdefault('sent_files', {})
+        message_index = len(context.get('messages', []))  # The next user message
+        text = "Project update: these files changed since the project report (and earlier updates) and replace their previous content:\n\n"
+        for label, files in (('Deleted', changes['deleted']), ('Renamed', [f"{old} -> {new}" for old, new in changes['renamed']])):
+            if files:
+                text += f"{label}:\n" + ''.join(f"- {f}\n" for f in files) + "\n"
+        for old_path, new_path in changes['renamed']:
+            if old_path in sent_files:
+                sent_files[new_path] = sent_files[old_path]
+        for file_path in changes['deleted'] + [old_path for old_path, _ in changes['renamed']]:
+            sent_files.pop(file_path, None)
+        for file_path in changes['changed'] + changes['added']:
+            content = file_manager.read_file(file_path) or ''
+            status = 'modified' if file_path in previous else 'created'
+            text += f"File: {file_path} ({status})\nContent:\n```\n{content}\n```\n\n"
+            sent_files[file_path] = {'hash': hashlib.sha1(content.encode('utf-8', errors='replace')).hexdigest(), 'message': message_index}
+        context['sync_message'] = context.get('sync_message', '') + text
+        logger.info(f"Project changes queued for the next request: {len(changes['changed'])} changed, {len(changes['added'])} added, "
+                    f"{len(changes['deleted'])} deleted, {len(changes['renamed'])} renamed")
+        return changes
+
     def reset_chat(self) -> Dict[str, Any]:
         new_context = {}
         new_context['messages'] = []
         new_context['project_report'] = self.generate_project_report()
+        new_context['report_snapshot'] = self.project_manager.file_manager.snapshot_files()
         self.progress_service.clear_progress()
+        self._discard_precomputed_edits()
         return new_context
 
     def resume_workflow(self, context: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,63 @@
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from .plugin_manager import PluginManager
+from ..components.module_loader import ModuleLoader, LazyComponents
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ComponentRegistry:
+    """
+    Process-wide registry of built-in and plugin components.
+
+    Plugin discovery runs once per plugin directory and process, and components are
+    imported lazily, so creating a ProjectManager does not import every task, workflow
+    and plugin again.
+    """
+    _instance: Optional['ComponentRegistry'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._plugin_managers: Dict[str, PluginManager] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'ComponentRegistry':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def get_plugin_manager(self, plugin_dir: str) -> PluginManager:
+        key = str(Path(plugin_dir).expanduser().resolve())
+        with self._lock:
+            plugin_manager = self._plugin_managers.get(key)
+            if plugin_manager is None:
+                plugin_manager = PluginManager(plugin_dir)
+                self._plugin_managers[key] = plugin_manager
+        plugin_manager.discover_plugins()
+        return plugin_manager
+
+    def get_components(self, component_type: str, plugin_dir: Optional[str] = None) -> LazyComponents:
+        """Built-in components of a type followed by those of the plugins in `plugin_dir`."""
+        components = ModuleLoader.lazy_components(component_type)
+        if plugin_dir is not None:
+            components.update_lazy(getattr(self.get_plugin_manager(plugin_dir), component_type))
+        return components
+
+    def get_tasks(self, plugin_dir: Optional[str] = None) -> LazyComponents:
+        return self.get_components('tasks', plugin_dir)
+
+    def get_workflows(self, plugin_dir: Optional[str] = None) -> LazyComponents:
+        return self.get_components('workflows', plugin_dir)
+
+    def get_interfaces(self, plugin_dir: Optional[str] = None) -> LazyComponents:
+        return self.get_components('interfaces', plugin_dir)
+
+    def refresh(self):
+        """Forget discovered plugins so the next request scans the plugin directories again."""
+        with self._lock:
+            self._plugin_managers.clear()
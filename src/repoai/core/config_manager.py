@@ -1,39 +1,119 @@
+import os
+import copy
+import threading
 import yaml
 from pathlib import Path
 import appdirs
 from jinja2 import Environment, FileSystemLoader
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from .prompt_manager import PromptManager
+from ..utils.template_cache import TemplateCache
 from ..defaults.default_config import DEFAULT_CONFIG
 
+
+class ConfigStore:
+    """
+    Process-wide cache of parsed YAML configuration files.
+
+    A file is parsed again only when its modification time or size changes, and
+    callers receive their own deep copy. Writes are atomic (temporary file +
+    os.replace) and refresh the cache. The shared Jinja environment and template
+    cache also live here so every ConfigManager in the process reuses them.
+    """
+    _instance: Optional['ConfigStore'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._files: Dict[str, Tuple[Tuple[int, int], Any]] = {}  # path -> (signature, parsed data)
+        self._lock = threading.Lock()
+        self.jinja_env = Environment(loader=FileSystemLoader(str(Path(__file__).parent.parent / 'templates')))
+        self.template_cache = TemplateCache(self.jinja_env)
+
+    @classmethod
+    def get_instance(cls) -> 'ConfigStore':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load_yaml(self, path: Path, default: Any = None) -> Any:
+        """Parsed content of a YAML file, or `default` when the file does not exist."""
+        key = str(Path(path).resolve())
+        signature = self._signature(Path(path))
+        if signature is None:
+            with self._lock:
+                self._files.pop(key, None)
+            return copy.deepcopy(default)
+        with self._lock:
+            cached = self._files.get(key)
+            if cached and cached[0] == signature:
+                return copy.deepcopy(cached[1])
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f)
+        with self._lock:
+            self._files[key] = (signature, data)
+        return copy.deepcopy(data)
+
+    def save_yaml(self, path: Path, data: Any):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w') as f:
+                yaml.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._files[str(path.resolve())] = (self._signature(path), copy.deepcopy(data))
+
+    def invalidate(self, path: Optional[Path] = None):
+        with self._lock:
+            if path is None:
+                self._files.clear()
+            else:
+                self._files.pop(str(Path(path).resolve()), None)
+
+
 class ConfigManager:
     CONFIG_FILE = 'repoai_config.yaml'
     REPOAI_DIR = ".repoai"
 
     def __init__(self):
+        self.store = ConfigStore.get_instance()
         self.global_config = {}
         self.project_config = {}
         self.config_dir = Path(appdirs.user_config_dir("repoai"))
         self.user_dir = Path(appdirs.user_data_dir("repoai"))
         self.load_global_config()
         self.prompt_manager = None
-        self.jinja_env = Environment(loader=FileSystemLoader(str(Path(__file__).parent.parent / 'templates')))
+        self.jinja_env = self.store.jinja_env
+        self.template_cache = self.store.template_cache
         self.project_path = None
     
     def load_global_config(self):
         config_file = self.config_dir / self.CONFIG_FILE
 
-        if config_file.exists():
-            with open(config_file, 'r') as f:
-                self.global_config = yaml.safe_load(f)
+        global_config = self.store.load_yaml(config_file)
+        if global_config is not None:
+            self.global_config = global_config
         else:
             self.set_default_global_config()
     
     def save_global_config(self):
-        self.config_dir.mkdir(parents=True, exist_ok=True)
         config_file = self.config_dir / self.CONFIG_FILE
-        with open(config_file, 'w') as f:
-            yaml.dump(self.global_config, f)
+        self.store.save_yaml(config_file, self.global_config)
 
     def get(self, key, default=None):
         return self.project_config.get(key, self.global_config.get(key, default))
@@ -48,11 +128,7 @@ class ConfigManager:
     def load_project_config(self, project_path: Path):
         self.project_path = project_path
         config_file_path = project_path / self.REPOAI_DIR / self.CONFIG_FILE
-        if config_file_path.exists():
-            with open(config_file_path, 'r') as f:
-                self.project_config = yaml.safe_load(f)
-        else:
-            self.project_config = {}
+        self.project_config = self.store.load_yaml(config_file_path) or {}
         self.prompt_manager = PromptManager(self)
 
     def update_project_config(self, config: Dict[str, Any]):
@@ -65,9 +141,7 @@ class ConfigManager:
         if not self.project_path:
             raise ValueError("Project path not set. Call load_project_config first or provide a project_path.")
         config_file_path = self.project_path / self.REPOAI_DIR / self.CONFIG_FILE
-        config_file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(config_file_path, 'w') as f:
-            yaml.dump(self.project_config, f)
+        self.store.save_yaml(config_file_path, self.project_config)
 
     def set_default_global_config(self):
         self.global_config = DEFAULT_CONFIG.copy()
@@ -77,8 +151,8 @@ class ConfigManager:
         self.save_global_config()
 
     def render_template(self, template_name: str, **kwargs):
-        template = self.jinja_env.get_template(f"{template_name}.j2")
-        return template.render(**kwargs)
+        source, _, _ = self.jinja_env.loader.get_source(self.jinja_env, f"{template_name}.j2")
+        return self.template_cache.render('template', template_name, source, **kwargs)
 
     def get_llm_prompt(self, task_id: str, prompt_type: str = 'system', **kwargs) -> str:
         if self.prompt_manager:
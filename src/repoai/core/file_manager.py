@@ -1,10 +1,12 @@
 import os
 import json
+import hashlib
 import yaml
 import shutil
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from ..utils.ignore_patterns import IgnorePatternHandler
+from ..utils.search_index import SearchIndex
 from ..utils.common_utils import is_text_file, yaml_multiline_string_presenter
 from ..utils.logger import get_logger
 
@@ -22,8 +24,29 @@ class FileManager:
         """
         self.project_path = project_path
         self.ignore_patterns = IgnorePatternHandler(self.project_path / ignore_file)
+        self._search_index = None
+        self._line_offsets: Dict[str, Tuple[Tuple[int, int], List[int]]] = {}  # file_path -> (mtime_ns, size), line start offsets
         logger.debug("File manager initialized")
 
+    @property
+    def search_index(self) -> SearchIndex:
+        if self._search_index is None:
+            self._search_index = SearchIndex(self)
+        return self._search_index
+
+    def build_search_index(self) -> Dict[str, int]:
+        """Create or refresh the search index of all files not ignored."""
+        return self.search_index.update()
+
+    def update_search_index(self, files: List[str]):
+        """Re-index written, moved or deleted files, if the project has a search index."""
+        if not files or not self.search_index.exists:
+            return
+        try:
+            self.search_index.update([f for f in files if not self.ignore_patterns.is_ignored(f)])
+        except Exception as e:
+            logger.warning(f"Could not update the search index: {str(e)}")
+
     def create_file(self, file_path: str, content: str):
         if self.file_exists(file_path):
             logger.warn(f"File {file_path} already exists. Use edit_file to modify existing files. No operation was performed.")
@@ -81,6 +104,35 @@ class FileManager:
         logger.warning(f"File {file_path} not found or couldn't be read.")
         return "File not found or couldn't be read."
 
+    def read_lines(self, file_path: str, start_line: int, end_line: int) -> str:
+        """
+        Lines `start_line` to `end_line` (1-based, inclusive) of a text file. The byte offsets of
+        the lines are indexed once per file version, so only the requested range is read.
+        """
+        full_path = self.project_path / file_path
+        stat = full_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._line_offsets.get(file_path)
+        if cached is None or cached[0] != signature:
+            offsets = [0]
+            with open(full_path, 'rb') as f:
+                position = 0
+                for line in f:
+                    position += len(line)
+                    offsets.append(position)
+            cached = (signature, offsets)
+            self._line_offsets[file_path] = cached
+        offsets = cached[1]
+        # offsets[i] is the start of line i + 1; the last entry is the end of the file
+        start_line = max(start_line, 1)
+        end_line = min(end_line, len(offsets) - 1)
+        if start_line > end_line:
+            return ''
+        with open(full_path, 'rb') as f:
+            f.seek(offsets[start_line - 1])
+            data = f.read(offsets[end_line] - offsets[start_line - 1])
+        return data.decode('utf-8', errors='replace').rstrip('\n').rstrip('\r')
+
     def read_json(self, file_path: str) -> Optional[Dict[str, Any]]:
         full_path = self.project_path / file_path
         if full_path.exists():
@@ -140,6 +192,27 @@ class FileManager:
     def directory_exists(self, directory_path: str) -> bool:
         return (self.project_path / directory_path).is_dir()
 
+    def snapshot_files(self, previous: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Content hash and (mtime_ns, size) signature of every file not ignored. Files whose
+        signature is unchanged in `previous` keep their hash without being read again.
+        """
+        previous = previous or {}
+        snapshot = {}
+        for file_path in self.list_files_not_ignored():
+            full_path = self.project_path / file_path
+            try:
+                stat = full_path.stat()
+            except OSError:
+                continue
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = previous.get(file_path)
+            if entry is None or entry['signature'] != signature:
+                with open(full_path, 'rb') as f:
+                    entry = {'signature': signature, 'hash': hashlib.sha1(f.read()).hexdigest()}
+            snapshot[file_path] = entry
+        return snapshot
+
     def generate_repo_content(self, files: Optional[List[str]] = None) -> Dict[str, Any]:
         if not files:
             files = self.list_files_not_ignored()
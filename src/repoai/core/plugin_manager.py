@@ -1,60 +1,165 @@
+import os
+import json
+import hashlib
+import threading
 import importlib
 import importlib.util
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+from ..components.module_loader import LazyComponents
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+COMPONENT_TYPES = ('tasks', 'workflows', 'interfaces')
+
 
 class PluginManager:
+    """
+    Discovers plugins through a manifest persisted in the plugin directory.
+
+    The manifest records, for every plugin file, its size, modification time, content
+    hash and the names of the components its `register_plugin()` returns. Plugins whose
+    file is unchanged are not executed during discovery; their module is imported the
+    first time one of their components is requested.
+    """
+    MANIFEST_FILE = '.plugin_manifest.json'
+    MANIFEST_VERSION = 1
+
     def __init__(self, plugin_dir: str):
         self.plugin_dir = Path(plugin_dir)
         self.plugins: Dict[str, Any] = {}
-        self.tasks: Dict[str, Any] = {}
-        self.workflows: Dict[str, Any] = {}
-        self.interfaces: Dict[str, Any] = {}
+        self.tasks = LazyComponents()
+        self.workflows = LazyComponents()
+        self.interfaces = LazyComponents()
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self._discovered = False
+        self._lock = threading.RLock()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.plugin_dir / self.MANIFEST_FILE
+
+    def discover_plugins(self, force: bool = False):
+        with self._lock:
+            if self._discovered and not force:
+                return
+            self._discover_plugins()
+            self._discovered = True
 
-    def discover_plugins(self):
+    def _discover_plugins(self):
         if not self.plugin_dir.exists():
             logger.debug(f"Creating plugin directory: {self.plugin_dir}")
             self.plugin_dir.mkdir(parents=True, exist_ok=True)
 
-        if not list(self.plugin_dir.glob('*.py')):
+        plugin_files = sorted(p for p in self.plugin_dir.glob('*.py') if not p.name.startswith('__'))
+        if not plugin_files:
             logger.debug(f"No plugins found in {self.plugin_dir}")
-            return
 
-        for file_path in self.plugin_dir.glob('*.py'):
-            if file_path.name.startswith('__'):
-                continue
+        previous = self._load_manifest()
+        manifest = {}
+        for file_path in plugin_files:
             plugin_name = file_path.stem
+            stat = file_path.stat()
+            entry = previous.get(plugin_name)
+            signature = [stat.st_mtime_ns, stat.st_size]
+            if entry is None or entry.get('signature') != signature:
+                file_hash = self._hash_file(file_path)
+                if entry is None or entry.get('hash') != file_hash:
+                    entry = self._index_plugin(plugin_name, file_path, file_hash)
+                entry['signature'] = signature
+            manifest[plugin_name] = entry
+            self._register_components(plugin_name, entry['components'])
 
+        self.manifest = manifest
+        if manifest != previous:
+            self._save_manifest(manifest)
+
+    def _index_plugin(self, plugin_name: str, file_path: Path, file_hash: str) -> Dict[str, Any]:
+        components = self._load_plugin(plugin_name, file_path)
+        logger.debug(f"Indexed plugin: {plugin_name}")
+        return {
+            'file': file_path.name,
+            'hash': file_hash,
+            'components': {
+                component_type: {name: cls.__name__ for name, cls in items.items()}
+                for component_type, items in (components or {}).items()
+                if component_type in COMPONENT_TYPES
+            },
+        }
+
+    def _register_components(self, plugin_name: str, components: Dict[str, Dict[str, str]]):
+        for component_type, names in components.items():
+            for name in names:
+                getattr(self, component_type).add_loader(
+                    f"{plugin_name}.{name}",
+                    lambda plugin_name=plugin_name, component_type=component_type, name=name:
+                        self._get_component(plugin_name, component_type, name)
+                )
+
+    def _get_component(self, plugin_name: str, component_type: str, name: str) -> Any:
+        components = self.get_plugin(plugin_name) or {}
+        try:
+            return components[component_type][name]
+        except KeyError:
+            raise KeyError(f"Plugin '{plugin_name}' no longer provides {component_type[:-1]} '{name}'")
+
+    def _load_plugin(self, plugin_name: str, file_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if plugin_name in self.plugins:
+                return self.plugins[plugin_name]
+            file_path = file_path or self.plugin_dir / f"{plugin_name}.py"
             spec = importlib.util.spec_from_file_location(plugin_name, file_path)
             plugin_module = importlib.util.module_from_spec(spec)
             spec.loader.exec_module(plugin_module)
+            plugin_components = None
             if hasattr(plugin_module, 'register_plugin'):
                 plugin_components = plugin_module.register_plugin()
-                self.plugins[plugin_name] = plugin_components
-                self._organize_plugin_components(plugin_name, plugin_components)
                 logger.debug(f"Loaded plugin: {plugin_name}")
+            self.plugins[plugin_name] = plugin_components
+            return plugin_components
+
+    @staticmethod
+    def _hash_file(file_path: Path) -> str:
+        return hashlib.sha1(file_path.read_bytes()).hexdigest()
 
-    def _organize_plugin_components(self, plugin_name: str, components: Dict[str, Any]):
-        for component_type, items in components.items():
-            if component_type in ['tasks', 'workflows', 'interfaces']:
-                getattr(self, component_type).update({f"{plugin_name}.{name}": cls for name, cls in items.items()})
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug(f"Ignoring unreadable plugin manifest {self.manifest_path}: {str(e)}")
+            return {}
+        if data.get('version') != self.MANIFEST_VERSION:
+            return {}
+        return data.get('plugins', {})
 
+    def _save_manifest(self, manifest: Dict[str, Dict[str, Any]]):
+        tmp_path = self.manifest_path.with_name(f"{self.MANIFEST_FILE}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.MANIFEST_VERSION, 'plugins': manifest}, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.debug(f"Could not save plugin manifest {self.manifest_path}: {str(e)}")
 
-    def get_tasks(self) -> Dict[str, Any]:
+    def get_tasks(self) -> LazyComponents:
         return self.tasks
 
-    def get_workflows(self) -> Dict[str, Any]:
+    def get_workflows(self) -> LazyComponents:
         return self.workflows
 
-    def get_interfaces(self) -> Dict[str, Any]:
+    def get_interfaces(self) -> LazyComponents:
         return self.interfaces
 
     def get_plugin(self, plugin_name: str) -> Any:
-        return self.plugins.get(plugin_name)
+        if plugin_name not in self.plugins and plugin_name not in self.manifest:
+            return None
+        return self._load_plugin(plugin_name)
 
     def get_all_plugins(self) -> Dict[str, Any]:
-        return self.plugins
\ No newline at end of file
+        for plugin_name in self.manifest:
+            self._load_plugin(plugin_name)
+        return {name: components for name, components in self.plugins.items() if components is not None}
@@ -1,13 +1,11 @@
 import os
 from functools import partial
 from pathlib import Path
-from typing import Any, List, Tuple, Dict, Callable, Union
-from ..services.git_service import GitService
+from typing import Any, List, Tuple, Dict, Callable, Union, Optional
 from ..utils.common_utils import validate_project_path
 from .config_manager import ConfigManager
-from ..components.module_loader import ModuleLoader
-from .file_manager import FileManager
-from .plugin_manager import PluginManager
+from .service_container import ServiceContainer
+from .component_registry import ComponentRegistry
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -25,7 +23,8 @@ class ProjectManager:
 
         self.config = ConfigManager()
         self.project_path = project_path
-        self.file_manager = FileManager(self.project_path, ignore_file=self.config.get('repoai_ignore_file'))
+        self.services = ServiceContainer(self)
+        self.file_manager = self.services.file_manager
 
         if not self.project_path.exists():
             if create_if_not_exists:
@@ -35,34 +34,32 @@ class ProjectManager:
         else:
             if error_if_exists:
                 raise ValueError(f"Project '{self.project_name}' already exists.")
-            else:
-                self.git_service = GitService(self.project_path)
 
         self.config.load_project_config(project_path)
         logger.info(f"Project '{self.project_name}' loaded.")
         
         self.pending_operations: List[Tuple[str, bool, str, Any]] = []
 
-        self.tasks = ModuleLoader.load_tasks()
-        self.workflows = ModuleLoader.load_workflows()
-
         plugin_dir = self.config.get('plugin_dir', os.path.join(self.config.user_dir, 'plugins'))
-        self.plugin_manager = PluginManager(plugin_dir)
-        self.plugin_manager.discover_plugins()
-
-        self.tasks.update(self.plugin_manager.get_tasks())
-        self.workflows.update(self.plugin_manager.get_workflows())
+        component_registry = ComponentRegistry.get_instance()
+        self.plugin_manager = component_registry.get_plugin_manager(plugin_dir)
+        self.tasks = component_registry.get_tasks(plugin_dir)
+        self.workflows = component_registry.get_workflows(plugin_dir)
 
         self.generate_repoaiignore()
 
     def _create_new_project(self):
         self.project_path.mkdir(parents=True, exist_ok=True)
-        self.git_service = GitService(self.project_path)
         self.file_manager.create_directory(self.config.REPOAI_DIR)
         self.config.save_project_config(self.project_path)
         self.generate_initial_files()
         self.git_service.commit_all("Initial commit")
 
+    @property
+    def git_service(self):
+        # Created on first use so commands that never touch git do not import GitPython
+        return self.services.git_service
+
     def get_task(self, task_name: str):
         return self.tasks.get(task_name)
 
@@ -93,26 +90,17 @@ class ProjectManager:
 
     def batch_operations(self, operations: List[Dict[str, Any]]):
         logger.debug(f"""Executing batch operations... {[f"{op['operation']}:{op['file_path']}" for op in operations]}""")
-        processed_files = set()
-        files_other_than_create_directory = set()
-        deleted_directories = set()
-
-        for op in operations:
+        if not operations:
+            return
+        commit_message = f"""Operation commit before '{operations[0]["operation"]}' '{operations[0]['file_path']}'"""
+        # Take a fresh status snapshot for this batch; it is reused for every staged file
+        self.git_service.invalidate_status()
 
+        for op in self._coalesce_operations(operations):
             operation = op['operation']
             file_path = op['file_path']
             content = op.get('content')
 
-            if operation in ['create_file', 'edit_file', 'delete_file', 'move_file']:
-                files_other_than_create_directory.add(file_path)
-            elif operation == 'delete_directory':
-                deleted_directories.add(file_path)
-
-            if file_path in processed_files:
-                self.execute_pending_operations(f"Automatic commit before {operation} {file_path}")
-                processed_files.clear()
-                files_other_than_create_directory.clear()
-
             if operation == 'create_file':
                 self.create_file_in_batch(file_path, content)
             elif operation == 'edit_file':
@@ -124,19 +112,62 @@ class ProjectManager:
             elif operation == 'create_directory':
                 self.create_directory_in_batch(file_path)
             elif operation == 'delete_directory':
-                files_in_dir = [f for f in files_other_than_create_directory if f.startswith(file_path)]
-                if files_in_dir:
-                    self.execute_pending_operations(f"Automatic commit before deleting directory {file_path}")
-                    processed_files.clear()
-                    files_other_than_create_directory.clear()
                 self.delete_directory_in_batch(file_path)
+
+        if self.pending_operations:
+            self.execute_pending_operations(commit_message)
+
+    def _coalesce_operations(self, operations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Reduce a batch to one operation per path so it can be committed at once.
+
+        Consecutive writes and deletes on the same path are merged into their final
+        effect. Moves and directory deletions are kept in order and end the merge
+        window for the paths they touch.
+        """
+        coalesced: List[Optional[Dict[str, Any]]] = []
+        latest: Dict[str, int] = {}  # file_path -> index in coalesced of its mergeable operation
+        existed: Dict[str, bool] = {}  # file_path -> whether the file was on disk before its first write
+
+        for op in operations:
+            operation = op['operation']
+            file_path = op['file_path']
+
+            if operation in ['create_file', 'edit_file', 'delete_file']:
+                if file_path not in existed:
+                    existed[file_path] = self.file_exists(file_path)
+                index = latest.get(file_path)
+                if index is None:
+                    latest[file_path] = len(coalesced)
+                    coalesced.append(dict(op))
+                elif operation == 'delete_file':
+                    coalesced[index] = {'operation': 'delete_file', 'file_path': file_path} if existed[file_path] else None
+                else:
+                    coalesced[index] = {
+                        'operation': 'edit_file' if existed[file_path] else 'create_file',
+                        'file_path': file_path,
+                        'content': op.get('content')
+                    }
+            elif operation == 'move_file':
+                for path in (file_path, op.get('content')):
+                    latest.pop(path, None)
+                    existed.pop(path, None)
+                coalesced.append(dict(op))
+            elif operation == 'delete_directory':
+                prefix = file_path.rstrip('/') + '/'
+                for path in [p for p in latest if p.startswith(prefix)]:
+                    coalesced[latest.pop(path)] = None
+                    existed.pop(path, None)
+                coalesced.append(dict(op))
+            elif operation == 'create_directory':
+                coalesced.append(dict(op))
             else:
                 raise ValueError(f"Invalid operation: {operation} for file: {file_path}")
 
-            processed_files.add(file_path)
-
-        if self.pending_operations:
-            self.execute_pending_operations(f"""Operation commit before '{operations[0]["operation"]}' '{operations[0]['file_path']}'""")
+        coalesced_operations = [op for op in coalesced if op is not None]
+        if len(coalesced_operations) != len(operations):
+            logger.debug(f"Coalesced {len(operations)} batch operations into {len(coalesced_operations)}")
+        return coalesced_operations
 
     def create_directory_in_batch(self, directory_path: str):
         self.file_manager.create_directory(directory_path)
@@ -176,8 +207,10 @@ class ProjectManager:
     def execute_pending_operations(self, commit_message: str):
         if self.pending_operations:
             self.git_service.commit_pending_operations(commit_message)
+        changed_files = []
         for operation, staged, file_path, content in self.pending_operations:
             logger.debug(f"Operation {operation} on File {file_path} staged {staged}")
+            changed_files.append(file_path)
             if operation == 'create_file':
                 self.file_manager.create_file(file_path, content)
             elif operation == 'edit_file':
@@ -186,11 +219,15 @@ class ProjectManager:
                 self.file_manager.delete_file(file_path)
             elif operation == 'move_file':
                 self.file_manager.move_file(file_path, content)
+                changed_files.append(content)
             elif operation == 'delete_directory':
+                changed_files.extend(self.file_manager.get_files_in_directory(file_path))
                 self.file_manager.delete_directory(file_path)
             else:
                 raise ValueError(f"Invalid operation: {operation}")
         self.pending_operations.clear()
+        self.file_manager.update_search_index(changed_files)
+        self.git_service.invalidate_status()
 
     def git_create_file(self, file_path: str, content: str):
         self.batch_operations([{'operation': 'create_file', 'file_path': file_path, 'content': content}])
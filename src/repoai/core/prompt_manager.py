@@ -1,8 +1,7 @@
 from ..defaults.default_llm_prompts import DEFAULT_LLM_PROMPTS
 from ..defaults.default_interface_prompts import DEFAULT_INTERFACE_PROMPTS
-from jinja2 import Environment, BaseLoader
+from jinja2 import TemplateSyntaxError
 from typing import Dict, Any
-import yaml
 from pathlib import Path
 
 class PromptManager:
@@ -11,14 +10,24 @@ class PromptManager:
         self.default_llm_prompts = DEFAULT_LLM_PROMPTS
         self.custom_llm_prompts = self._load_custom_llm_prompts()
         self.interface_prompts = DEFAULT_INTERFACE_PROMPTS
-        self.jinja_env = Environment(loader=BaseLoader())
+        self.template_cache = config_manager.template_cache
+        self.jinja_env = self.template_cache.jinja_env
+        self._validate_custom_llm_prompts()
 
     def _load_custom_llm_prompts(self) -> Dict[str, Any]:
         custom_prompts_path = Path(self.config_manager.project_path) / self.config_manager.REPOAI_DIR / 'custom_llm_prompts.yaml'
-        if custom_prompts_path.exists():
-            with open(custom_prompts_path, 'r') as f:
-                return yaml.safe_load(f)
-        return {}
+        return self.config_manager.store.load_yaml(custom_prompts_path) or {}
+
+    def _validate_custom_llm_prompts(self):
+        for task_id, prompts in self.custom_llm_prompts.items():
+            for prompt_type, prompt in prompts.items():
+                self._validate_llm_prompt(task_id, prompt, prompt_type)
+
+    def _validate_llm_prompt(self, task_id: str, prompt: str, prompt_type: str):
+        try:
+            self.template_cache.validate('llm', f"{task_id}.{prompt_type}", prompt)
+        except TemplateSyntaxError as e:
+            raise ValueError(f"Invalid {prompt_type} prompt template for task '{task_id}' (line {e.lineno}): {e.message}") from e
 
     def get_default_llm_prompts(self) -> Dict[str, Dict[str, str]]:
         return self.default_llm_prompts
@@ -31,19 +40,19 @@ class PromptManager:
         return prompt_template
     
     def render_prompt(self, raw_prompt: str, **kwargs) -> str:
-        template = self.jinja_env.from_string(raw_prompt)
-        return template.render(**kwargs)
+        return self.template_cache.render('raw', None, raw_prompt, **kwargs)
     
     def get_llm_prompt_rendered(self, task_id: str, prompt_type: str = 'system', **kwargs):
         prompt = self.get_llm_raw_prompt(task_id, prompt_type)
-        return self.render_prompt(prompt, **kwargs)
+        return self.template_cache.render('llm', f"{task_id}.{prompt_type}", prompt, **kwargs)
         
     def get_interface_prompt(self, task_id: str, prompt_key: str, **kwargs) -> str:
         prompt_template = self.interface_prompts.get(task_id, {}).get(prompt_key, '')
-        template = self.jinja_env.from_string(prompt_template)
-        return template.render(**kwargs)
+        return self.template_cache.render('interface', f"{task_id}.{prompt_key}", prompt_template, **kwargs)
 
     def set_custom_llm_prompt(self, task_id: str, prompt: str, prompt_type: str = 'system'):
+        self.template_cache.invalidate('llm', f"{task_id}.{prompt_type}")
+        self._validate_llm_prompt(task_id, prompt, prompt_type)
         if task_id not in self.custom_llm_prompts:
             self.custom_llm_prompts[task_id] = {}
         self.custom_llm_prompts[task_id][prompt_type] = prompt
@@ -62,13 +71,14 @@ class PromptManager:
         if task_id not in self.interface_prompts:
             self.interface_prompts[task_id] = {}
         self.interface_prompts[task_id][prompt_key] = prompt
+        self.template_cache.invalidate('interface', f"{task_id}.{prompt_key}")
 
     def _save_custom_llm_prompts(self):
         custom_prompts_path = Path(self.config_manager.project_path) / self.config_manager.REPOAI_DIR / 'custom_llm_prompts.yaml'
-        with open(custom_prompts_path, 'w') as f:
-            yaml.dump(self.custom_llm_prompts, f)
+        self.config_manager.store.save_yaml(custom_prompts_path, self.custom_llm_prompts)
 
     def reset_llm_prompt(self, task_id: str, prompt_type: str = 'system'):
+        self.template_cache.invalidate('llm', f"{task_id}.{prompt_type}")
         if task_id in self.custom_llm_prompts and prompt_type in self.custom_llm_prompts[task_id]:
             del self.custom_llm_prompts[task_id][prompt_type]
             if not self.custom_llm_prompts[task_id]:
@@ -78,19 +88,19 @@ class PromptManager:
     def reset_interface_prompt(self, task_id: str, prompt_key: str):
         if task_id in self.interface_prompts and prompt_key in self.interface_prompts[task_id]:
             del self.interface_prompts[task_id][prompt_key]
+            self.template_cache.invalidate('interface', f"{task_id}.{prompt_key}")
 
     def list_llm_prompts(self) -> Dict[str, Dict[str, Any]]:
         all_prompts = {}
         for task_id in set(list(self.default_llm_prompts.keys()) + list(self.custom_llm_prompts.keys())):
+            default_prompts = self.default_llm_prompts.get(task_id, {})
+            custom_prompts = self.custom_llm_prompts.get(task_id, {})
             all_prompts[task_id] = {
-                'system': {
-                    'default': self.default_llm_prompts.get(task_id, {}).get('system', ''),
-                    'custom': self.custom_llm_prompts.get(task_id, {}).get('system', '')
-                },
-                'user': {
-                    'default': self.default_llm_prompts.get(task_id, {}).get('user', ''),
-                    'custom': self.custom_llm_prompts.get(task_id, {}).get('user', '')
+                prompt_type: {
+                    'default': default_prompts.get(prompt_type, ''),
+                    'custom': custom_prompts.get(prompt_type, '')
                 }
+                for prompt_type in ['system', 'user'] + [t for t in {**default_prompts, **custom_prompts} if t not in ('system', 'user')]
             }
         return all_prompts
 
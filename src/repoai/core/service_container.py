@@ -0,0 +1,153 @@
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from .project_manager import ProjectManager
+
+logger = get_logger(__name__)
+
+
+class ServiceContainer:
+    """
+    Per-project registry of shared services, available as `project_manager.services`.
+
+    Every service is created on first use and then reused, so tasks, workflows,
+    interfaces and plugins of one project share the same file manager, ignore
+    matcher, git service, LLM service and token counter, together with their caches.
+    Plugins can add their own shared services with `register`.
+    """
+
+    def __init__(self, project_manager: 'ProjectManager'):
+        self.project_manager = project_manager
+        self._services: Dict[str, Any] = {}
+        self._factories: Dict[str, Callable[['ServiceContainer'], Any]] = {
+            'file_manager': ServiceContainer._create_file_manager,
+            'git_service': ServiceContainer._create_git_service,
+            'token_counter': ServiceContainer._create_token_counter,
+            'llm_service': ServiceContainer._create_llm_service,
+            'markdown_service': ServiceContainer._create_markdown_service,
+            'progress_service': ServiceContainer._create_progress_service,
+            'symbol_index': ServiceContainer._create_symbol_index,
+            'dependency_graph': ServiceContainer._create_dependency_graph,
+            'file_context_resolver': ServiceContainer._create_file_context_resolver,
+        }
+        self._lock = threading.RLock()
+
+    @property
+    def project_path(self):
+        return self.project_manager.project_path
+
+    @property
+    def config(self):
+        return self.project_manager.config
+
+    def register(self, name: str, factory: Callable[['ServiceContainer'], Any], replace: bool = False):
+        """Register a factory that receives the container and returns the shared service."""
+        with self._lock:
+            if name in self._factories and not replace:
+                raise ValueError(f"Service '{name}' is already registered")
+            self._factories[name] = factory
+            self._services.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        service = self._services.get(name)
+        if service is None:
+            with self._lock:
+                service = self._services.get(name)
+                if service is None:
+                    if name not in self._factories:
+                        raise KeyError(f"Unknown service: {name}")
+                    service = self._factories[name](self)
+                    self._services[name] = service
+                    logger.debug(f"Service created: {name}")
+        return service
+
+    def has(self, name: str) -> bool:
+        return name in self._factories
+
+    def reset(self, name: Optional[str] = None):
+        """Drop one or all service instances; they are created again on next use."""
+        with self._lock:
+            if name is None:
+                self._services.clear()
+            else:
+                self._services.pop(name, None)
+
+    @property
+    def file_manager(self):
+        return self.get('file_manager')
+
+    @property
+    def ignore_patterns(self):
+        return self.file_manager.ignore_patterns
+
+    @property
+    def git_service(self):
+        return self.get('git_service')
+
+    @property
+    def token_counter(self):
+        return self.get('token_counter')
+
+    @property
+    def llm_service(self):
+        return self.get('llm_service')
+
+    @property
+    def markdown_service(self):
+        return self.get('markdown_service')
+
+    @property
+    def progress_service(self):
+        return self.get('progress_service')
+
+    @property
+    def symbol_index(self):
+        return self.get('symbol_index')
+
+    @property
+    def dependency_graph(self):
+        return self.get('dependency_graph')
+
+    @property
+    def file_context_resolver(self):
+        return self.get('file_context_resolver')
+
+    # Services are imported inside their factory so unused ones never load their dependencies
+
+    def _create_file_manager(self):
+        from .file_manager import FileManager
+        return FileManager(self.project_path, ignore_file=self.config.get('repoai_ignore_file'))
+
+    def _create_git_service(self):
+        from ..services.git_service import GitService
+        return GitService(self.project_path)
+
+    def _create_token_counter(self):
+        from ..utils.token_counter import TokenCounter
+        return TokenCounter(self.project_path, self.config)
+
+    def _create_llm_service(self):
+        from ..services.llm_service import LLMService
+        return LLMService(self.project_path, self.config, token_counter=self.token_counter)
+
+    def _create_markdown_service(self):
+        from ..services.markdown_service import MarkdownService
+        return MarkdownService(self.project_path, self.config.get('repoai_ignore_file'), file_manager=self.file_manager)
+
+    def _create_progress_service(self):
+        from ..services.progress_service import ProgressService
+        return ProgressService(self.project_path, self.config, file_manager=self.file_manager)
+
+    def _create_symbol_index(self):
+        from ..utils.symbol_index import SymbolIndex
+        return SymbolIndex(self.file_manager)
+
+    def _create_dependency_graph(self):
+        from ..utils.dependency_graph import DependencyGraph
+        return DependencyGraph(self.symbol_index)
+
+    def _create_file_context_resolver(self):
+        from ..utils.context_spec import FileContextResolver
+        return FileContextResolver(self.file_manager, self.symbol_index)
@@ -11,4 +11,28 @@ DEFAULT_CONFIG = {
     "repoai_ignore_file": ".repoai/.repoaiignore",
     "prompt_cache_threshold": 20000,
     "plugin_dir": "plugins",
+    "structure_parse_min_confidence": 0.9,
+    "progress_compaction_interval": 50,
+    "checkpoint_keep_last": 10,
+    "checkpoint_max_age_days": 30,
+    "checkpoint_step_boundaries_only": False,
+    "stream_modifications": True,
+    "precompute_edits": False,
+    "max_continuation_rounds": 3,
+    "max_consecutive_generation_failures": 3,
+    "expand_file_contexts": True,
+    "file_context_expansion_tokens": 8000,
+    "auto_symbol_context": True,
+    "symbol_context_max_files": 5,
+    "auto_search_context": False,
+    "search_context_max_files": 5,
+    "report_mode": "full",
+    "report_full_content_files": [],
+    "report_max_file_tokens": 0,
+    "context_file_max_tokens": 4000,
+    "deduplicate_file_contexts": True,
+    "sync_after_modifications": True,
+    "history_keep_turns": 4,
+    "history_max_tokens": 0,
+    "history_compaction_threshold": 0.8,
 }
\ No newline at end of file
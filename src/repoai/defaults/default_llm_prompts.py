@@ -1,3 +1,12 @@
+CONTINUATION_PROMPT = """
+Your previous response was cut off before the end of the file.
+{% if last_line %}The last complete line was:
+```
+{{ last_line }}
+```
+{% endif %}Continue the file from the line that follows it. Do not repeat content you have already written.
+Put the continuation in a new code block{% if language %} tagged `{{ language }}`{% endif %} and close it when the file is complete."""
+
 DEFAULT_LLM_PROMPTS = {
     "project_description_chat_task": {
         "system": """
@@ -88,7 +97,8 @@ Project description:
 {{ project_description }}
 ```
 
-Provide the file content in a single code block, ensuring it adheres to the project requirements and maintains consistency with other files."""
+Provide the file content in a single code block, ensuring it adheres to the project requirements and maintains consistency with other files.""",
+        "continuation": CONTINUATION_PROMPT
     },
     "file_edit_task": {
         "system": """
@@ -111,7 +121,8 @@ Edit request:
 
 Please provide the full updated content of the file that reflects the requested changes.
 Your response should only contain the updated file content, without any additional explanations or formatting.
-Provide the updated file content in triple backticks. Ensure the resulting file content is valid and remove comments if necessary."""
+Provide the updated file content in triple backticks. Ensure the resulting file content is valid and remove comments if necessary.""",
+        "continuation": CONTINUATION_PROMPT
     },
     "structure_to_paths_task": {
         "system": """
@@ -3,10 +3,8 @@ import yaml
 import json
 from pathlib import Path
 from repoai import initialize, ProjectManager
-from repoai.core.plugin_manager import PluginManager
-from repoai.services.markdown_service import MarkdownService
-from repoai.components.interfaces.project_generation_interface import ProjectGenerationInterface
-from repoai.components.interfaces.project_modification_interface import ProjectModificationInterface
+from repoai.core.component_registry import ComponentRegistry
+from repoai.utils.model_registry import ModelRegistry
 from repoai.utils.logger import get_logger
 
 config = initialize()
@@ -15,11 +13,16 @@ logger = get_logger(__name__)
 
 def main():
     parser = argparse.ArgumentParser(description="RepoAI - AI-assisted repository content creation")
-    parser.add_argument('action', choices=['init', 'report', 'plugin', 'create', 'edit'], help="Action to perform")
+    parser.add_argument('action', choices=['init', 'report', 'plugin', 'create', 'edit', 'gc', 'models', 'search'], help="Action to perform")
     parser.add_argument('--project_path', '-p', type=Path, help="Path to the project directory (for all actions except 'plugin')")
     parser.add_argument('--output', help="Output directory for the report (for 'report' action) default: current directory")
     parser.add_argument('--interface', help="Name of the interface to run (for 'plugin' action)")
     parser.add_argument('--model_config', help="Path to model config JSON file to use (for 'plugin', 'create', and 'edit' actions)")
+    parser.add_argument('--refresh', action='store_true', help="Download the latest model metadata (for 'models' action)")
+    parser.add_argument('--mode', choices=['full', 'outline', 'hybrid'], help="Report mode (for 'report' action) default: the 'report_mode' setting")
+    parser.add_argument('--full_files', nargs='*', help="Files shown in full in a 'hybrid' report (for 'report' action)")
+    parser.add_argument('--query', '-q', help="Search query (for 'search' action)")
+    parser.add_argument('--limit', type=int, default=10, help="Maximum number of results (for 'search' action)")
     args = parser.parse_args()
 
     if args.action in ['create', 'edit']:
@@ -30,6 +33,12 @@ def main():
         handle_report_action(args)
     elif args.action == 'plugin':
         handle_plugin_action(args)
+    elif args.action == 'gc':
+        handle_gc_action(args)
+    elif args.action == 'models':
+        handle_models_action(args)
+    elif args.action == 'search':
+        handle_search_action(args)
 
 def load_model_config(model_config_path):
     model_config_path = Path(model_config_path)
@@ -48,6 +57,9 @@ def load_model_config(model_config_path):
 
 def handle_project_actions(args):
     assert args.project_path is not None, "Project path must be specified\nUsage: repoai <action> --project_path <path_to_project>"
+    # Interfaces pull in rich and litellm; import them only for the commands that need them
+    from repoai.components.interfaces.project_generation_interface import ProjectGenerationInterface
+    from repoai.components.interfaces.project_modification_interface import ProjectModificationInterface
 
     project_manager = ProjectManager(args.project_path, create_if_not_exists=True, error_if_exists=False)
     
@@ -82,8 +94,10 @@ def handle_report_action(args):
     assert args.project_path is not None, "Project path must be specified\nUsage: repoai <action> --project_path <path_to_project>"
 
     project_manager = ProjectManager(args.project_path, create_if_not_exists=False, error_if_exists=False)
-    markdown_service = MarkdownService(project_manager.project_path, project_manager.config.get('repoai_ignore_file'))
-    report_content = markdown_service.generate_markdown_compilation("")
+    markdown_service = project_manager.services.markdown_service
+    mode = args.mode or project_manager.config.get('report_mode', 'full')
+    full_content_files = args.full_files if args.full_files is not None else project_manager.config.get('report_full_content_files', [])
+    report_content = markdown_service.generate_markdown_compilation("", mode=mode, full_content_files=full_content_files)
     output_dir = Path(args.output) if args.output else Path.cwd()
     output_file = output_dir / f"{project_manager.project_name}_report.md"
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -92,14 +106,46 @@ def handle_report_action(args):
     logger.info(f"Project report for '{project_manager.project_name}' generated successfully.")
     logger.info(f"Report saved to: {output_file}")
 
+def handle_gc_action(args):
+    assert args.project_path is not None, "Project path must be specified\nUsage: repoai <action> --project_path <path_to_project>"
+
+    project_manager = ProjectManager(args.project_path, create_if_not_exists=False, error_if_exists=False)
+    progress_service = project_manager.services.progress_service
+    result = progress_service.collect_garbage()
+    logger.info(f"Checkpoints for '{project_manager.project_name}': kept {result['kept']}, removed {result['removed']}, compressed {result['compressed']}.")
+
+def handle_models_action(args):
+    model_registry = ModelRegistry.get_instance()
+    if args.refresh:
+        snapshot = model_registry.refresh()
+        logger.info("Model metadata refreshed.")
+    else:
+        snapshot = model_registry.get_snapshot_info()
+    logger.info(f"Model metadata: {snapshot['models']} models, generated {snapshot.get('generated', 'unknown')}")
+    logger.info(f"Source: {snapshot.get('source', 'unknown')}")
+    logger.info(f"Loaded from: {snapshot['path']}")
+
+def handle_search_action(args):
+    assert args.project_path is not None, "Project path must be specified\nUsage: repoai <action> --project_path <path_to_project>"
+    assert args.query, "A query must be specified\nUsage: repoai search --project_path <path_to_project> --query <text>"
+
+    project_manager = ProjectManager(args.project_path, create_if_not_exists=False, error_if_exists=False)
+    file_manager = project_manager.file_manager
+    stats = file_manager.build_search_index()
+    logger.debug(f"Search index: {stats}")
+    results = file_manager.search_index.search(args.query, limit=args.limit)
+    if not results:
+        logger.info(f"No results for '{args.query}'.")
+    for result in results:
+        logger.info(f"{result['score']:7.2f}  {result['file_path']}:{result['start_line']}-{result['end_line']}")
+
 def handle_plugin_action(args):
     if args.model_config:
         model_config = load_model_config(args.model_config)
     else:
         model_config = {}
     
-    plugin_manager = PluginManager(config.get('plugin_dir'))
-    plugin_manager.discover_plugins()
+    plugin_manager = ComponentRegistry.get_instance().get_plugin_manager(config.get('plugin_dir'))
 
     if not args.interface:
         logger.info("Available plugin interfaces:")
@@ -1,16 +1,22 @@
+from collections import OrderedDict
 from git import Repo, InvalidGitRepositoryError
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Set
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+BLOB_CACHE_MAX_BYTES = 16 * 1024 * 1024  # Least recently used blobs are dropped beyond this size
+
 
 class GitService:
     def __init__(self, project_path: Path):
         self.project_path = project_path
         self.repo = self._initialize_repo()
         self.pending_to_stage: List[Tuple[str, str]] = []  # List of (file_path, operation)
+        self._status_snapshot: Optional[Set[str]] = None  # Paths with changes, valid until our next write
+        self._blob_cache: 'OrderedDict[str, Tuple[int, str]]' = OrderedDict()  # blob hexsha -> (size, decoded content)
+        self._blob_cache_bytes = 0
         logger.debug("Git service initialized")
 
     def _initialize_repo(self) -> Repo:
@@ -32,21 +38,72 @@ class GitService:
         return False
 
     def _has_changes(self, file_path: str) -> bool:
-        if file_path in self.get_untracked_and_changed_files():
-            return True
-        return False
+        return file_path in self._get_status_snapshot()
+
+    def _get_status_snapshot(self) -> Set[str]:
+        if self._status_snapshot is None:
+            self._status_snapshot = self._read_status()
+        return self._status_snapshot
+
+    def _read_status(self) -> Set[str]:
+        output = self.repo.git.status('--porcelain', '-z', '--untracked-files=all')
+        entries = output.split('\0')
+        paths = set()
+        i = 0
+        while i < len(entries):
+            entry = entries[i]
+            i += 1
+            if len(entry) < 4:
+                continue
+            status, path = entry[:2], entry[3:]
+            paths.add(path)
+            if 'R' in status or 'C' in status:
+                # Renames and copies are followed by their source path
+                if i < len(entries) and entries[i]:
+                    paths.add(entries[i])
+                i += 1
+        logger.debug(f"Git status snapshot taken: {len(paths)} changed or untracked paths")
+        return paths
+
+    def invalidate_status(self):
+        self._status_snapshot = None
 
     def commit_pending_operations(self, message: str):
-        for file_path, operation in self.pending_to_stage:
-            if operation in ['edit_file', 'delete_file', 'move_file']:
-                self.repo.git.add(file_path)
-
+        paths = [file_path for file_path, operation in self.pending_to_stage if operation in ['edit_file', 'delete_file', 'move_file']]
         if self.pending_to_stage:
-            self.repo.git.commit('-m', message)
+            self.commit_paths(paths, message)
             self.pending_to_stage.clear()
         else:
             logger.debug("No operations to commit.")
 
+    def commit_paths(self, paths: List[str], message: str) -> bool:
+        """
+        Stage the given paths in a single index update and write one tree and commit.
+
+        Only paths present in the status snapshot are staged. Returns False when
+        none of them had changes to commit.
+        """
+        changed = self._get_status_snapshot()
+        to_stage = sorted({path for path in paths if path in changed})
+        if not to_stage:
+            logger.debug("No changes to commit.")
+            return False
+
+        index = self.repo.index
+        existing = [path for path in to_stage if (self.project_path / path).exists()]
+        removed = [path for path in to_stage if not (self.project_path / path).exists()]
+        if existing:
+            index.add(existing)
+        if removed:
+            tracked = {path for path, _ in index.entries.keys()}
+            removed = [path for path in removed if path in tracked]
+            if removed:
+                index.remove(removed)
+        index.commit(message)
+        self.invalidate_status()
+        logger.debug(f"Committed {len(to_stage)} paths in a single commit: {message}")
+        return True
+
     def commit_all(self, message: str):
         # Check if there are any changes to commit
         if not self.repo.is_dirty(untracked_files=True):
@@ -55,6 +112,7 @@ class GitService:
 
         self.repo.git.add(A=True)
         res = self.repo.git.commit('-m', f"{message}")
+        self.invalidate_status()
         logger.debug(f"Committed changes: {res}")
         return res
 
@@ -74,37 +132,75 @@ class GitService:
         ]
     
     def get_file_versions(self, file_path: str) -> Dict[str, Optional[str]]:
-        if file_path.startswith('/') or file_path.startswith('./'):
-            return {"current": "", "previous": "", "message": "File path should be relative to project root and not contain './' or '/' at the beginning of the path"}
-        abs_file_path = self.project_path / file_path
-        if not abs_file_path.exists():
-            return {"current": "", "previous": "", "message": "File not found"}
-        result = {
-            'current': "",
-            'previous': "",
-            'message': ""
-        }
-        with open(abs_file_path, 'r', encoding='utf-8') as f:
-            result['current'] = f.read()
+        return self.get_files_versions([file_path])[file_path]
+
+    def get_files_versions(self, file_paths: List[str]) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Current and previous (last committed) versions for many files in one call.
+
+        Blobs are read through git's persistent 'cat-file --batch' process and
+        cached by blob SHA (up to BLOB_CACHE_MAX_BYTES), so no subprocess is spawned per file.
+        """
+        results = {}
+        previous_versions = self.get_previous_versions([path for path in file_paths if not path.startswith(('/', './'))])
+        for file_path in file_paths:
+            if file_path.startswith('/') or file_path.startswith('./'):
+                results[file_path] = {"current": "", "previous": "", "message": "File path should be relative to project root and not contain './' or '/' at the beginning of the path"}
+                continue
+            abs_file_path = self.project_path / file_path
+            if not abs_file_path.exists():
+                results[file_path] = {"current": "", "previous": "", "message": "File not found"}
+                continue
+            result = {
+                'current': "",
+                'previous': "",
+                'message': ""
+            }
+            with open(abs_file_path, 'r', encoding='utf-8') as f:
+                result['current'] = f.read()
 
-        try:
-            commits = list(self.repo.iter_commits(paths=file_path, max_count=1))
-            if len(commits) > 0:
-                previous_commit = commits[0]
-                result['previous'] = self.repo.git.show(f'{previous_commit.hexsha}:{file_path}')
+            previous = previous_versions.get(file_path)
+            if previous is not None:
+                result['previous'] = previous
                 result['message'] = "Previous version found"
-                logger.debug(f"Previous version of file {file_path} found: {previous_commit.hexsha}")
-                return result
+                logger.debug(f"Previous version of file {file_path} found")
             else:
-                result['previous'] = ""
                 result['message'] = "No previous version found or the file is not tracked with git"
                 logger.debug(f"No previous version found for file: {file_path}")
-                return result
+            results[file_path] = result
+        return results
+
+    def get_previous_versions(self, file_paths: List[str]) -> Dict[str, Optional[str]]:
+        """Last committed content of each path, or None when the path is not in HEAD."""
+        previous_versions: Dict[str, Optional[str]] = {file_path: None for file_path in file_paths}
+        try:
+            tree = self.repo.head.commit.tree
+        except ValueError:
+            logger.debug("Repository has no commits yet. No previous versions available.")
+            return previous_versions
+
+        for file_path in file_paths:
+            try:
+                item = tree / file_path
+            except KeyError:
+                continue
+            if item.type == 'blob':
+                previous_versions[file_path] = self._read_blob(item.hexsha)
+        return previous_versions
+
+    def _read_blob(self, hexsha: str) -> str:
+        if hexsha in self._blob_cache:
+            self._blob_cache.move_to_end(hexsha)
+            return self._blob_cache[hexsha][1]
+        data = self.repo.odb.stream(bytes.fromhex(hexsha)).read()
+        content = data.decode('utf-8', errors='replace')
+        if len(data) <= BLOB_CACHE_MAX_BYTES:
+            self._blob_cache[hexsha] = (len(data), content)
+            self._blob_cache_bytes += len(data)
+            while self._blob_cache_bytes > BLOB_CACHE_MAX_BYTES:
+                _, (size, _) = self._blob_cache.popitem(last=False)
+                self._blob_cache_bytes -= size
+        return content
 
-        except Exception as e:
-            logger.error(f"Error retrieving previous version of file {file_path}: {str(e)}")
-    
     def get_untracked_and_changed_files(self):
-        changed = [item.a_path for item in self.repo.index.diff(None)]
-        untracked = self.repo.untracked_files
-        return changed + untracked
+        return sorted(self._read_status())
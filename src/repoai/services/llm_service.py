@@ -1,27 +1,30 @@
-from typing import Dict, List, Any, Union, AsyncGenerator
+from typing import Dict, List, Any, Union, AsyncGenerator, Iterator, Optional
 from pathlib import Path
-from litellm import completion, supports_vision, acompletion
-from litellm.utils import get_llm_provider
 from ..core.config_manager import ConfigManager
 from ..utils.response_wrapper import ResponseRepoAI
 from ..utils.token_counter import TokenCounter
+from ..utils.model_registry import ModelRegistry
 from ..utils.common_utils import image_to_base64
+from ..utils.fenced_blocks import FencedDocument, parse_fenced_blocks
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 class LLMService:
-    def __init__(self, project_path: str, config: ConfigManager):
+    def __init__(self, project_path: str, config: ConfigManager, token_counter: Optional[TokenCounter] = None):
         self.project_path = project_path
         self.config = config
-        self.token_counter = TokenCounter(self.project_path, self.config)
+        self.token_counter = token_counter or TokenCounter(self.project_path, self.config)
+        self.model_registry = ModelRegistry.get_instance()
         self.cache_threshold = self.config.get('prompt_cache_threshold', 5000)
 
     def get_completion(self, messages: List[Dict[str, Any]], **kwargs) -> ResponseRepoAI:
+        from litellm import completion
+
         kwargs, provider = self.input_validation(**kwargs)
         model = kwargs["model"]
 
-        if supports_vision(model):
+        if self.supports_vision(model):
             messages = self._process_vision_inputs(messages)
 
         if provider == "anthropic":
@@ -43,11 +46,83 @@ class LLMService:
 
         return llm_response
 
+    def get_completion_with_continuation(self, messages: List[Dict[str, Any]], task_id: str, **kwargs) -> str:
+        """
+        Like get_completion, but when the response is cut off (finish_reason "length" or an
+        unterminated code block) the model is asked to continue, at most
+        `max_continuation_rounds` times, and the parts are stitched into one response.
+
+        The continuation requests keep `messages` as their unchanged prefix, so prompt
+        caching applies to them. The continuation prompt is the `continuation` prompt of `task_id`.
+        """
+        max_rounds = kwargs.pop('max_continuation_rounds', self.config.get('max_continuation_rounds', 3))
+        response = self.get_completion(messages=list(messages), **kwargs)
+        document = FencedDocument(response.content)
+        conversation = list(messages)
+
+        for round_number in range(1, max_rounds + 1):
+            truncated = response.finish_reason == 'length'
+            if not document.unterminated and not (truncated and not document.fence_indices):
+                break
+            conversation.append({"role": "assistant", "content": response.content})
+            if truncated:
+                document.drop_partial_line()
+            language = document.open_blocks[-1].language if document.open_blocks else ''
+            continuation_prompt = self.config.get_llm_prompt(task_id=task_id, prompt_type='continuation',
+                                                             last_line=document.last_line(), language=language)
+            conversation.append({"role": "user", "content": continuation_prompt})
+            logger.info(f"Response was cut off, requesting continuation {round_number} of at most {max_rounds}")
+
+            response = self.get_completion(messages=list(conversation), **kwargs)
+            if document.fence_indices:
+                document.extend(response.content, skip_reopening_fence=document.unterminated, trim_overlap=True)
+            else:
+                # Plain text was cut off; take the continuation out of its code block
+                _, continuation = parse_fenced_blocks(response.content).outer_block()
+                document.extend(continuation if continuation is not None else response.content, trim_overlap=True)
+        else:
+            if document.unterminated or response.finish_reason == 'length':
+                logger.warning(f"Response still incomplete after {max_rounds} continuation round(s)")
+
+        return document.text
+
+    def get_completion_stream(self, messages: List[Dict[str, Any]], **kwargs) -> Iterator[str]:
+        """Yield the response content as it is generated. Token usage is recorded once the stream ends."""
+        from litellm import completion
+
+        kwargs, provider = self.input_validation(**kwargs)
+        model = kwargs["model"]
+
+        if self.supports_vision(model):
+            messages = self._process_vision_inputs(messages)
+
+        if provider == "anthropic":
+            kwargs = self._handle_anthropic_specific_features(kwargs, messages)
+        elif provider == "gemini":
+            kwargs = self._handle_gemini_specific_features(kwargs, messages)
+        else:
+            kwargs['messages'] = messages
+
+        kwargs['stream'] = True
+        input_tokens = self.token_counter.count_tokens(model, messages)
+
+        content_parts = []
+        for chunk in completion(**kwargs):
+            text = chunk["choices"][0]["delta"].get("content") or ""
+            if text:
+                content_parts.append(text)
+                yield text
+
+        output_tokens = self.token_counter.count_tokens(model, [{"role": "assistant", "content": ''.join(content_parts)}])
+        self.token_counter.update_token_usage(model, provider, input_tokens, output_tokens)
+
     async def get_acompletion(self, messages: List[Dict[str, Any]], **kwargs) -> AsyncGenerator[str, None]:
+        from litellm import acompletion
+
         kwargs, provider = self.input_validation(**kwargs)
         model = kwargs["model"]
 
-        if supports_vision(model):
+        if self.supports_vision(model):
             messages = self._process_vision_inputs(messages)
 
         if provider == "anthropic":
@@ -92,8 +167,9 @@ class LLMService:
 
         if 'max_tokens' in kwargs:
             max_tokens = kwargs['max_tokens']
-            if max_tokens > 8192:
-                kwargs['max_tokens'] = 8192
+            model_max_tokens = self.model_registry.max_output_tokens(kwargs['model']) or 8192
+            if max_tokens > model_max_tokens:
+                kwargs['max_tokens'] = model_max_tokens
                 logger.debug(f"Changed max_tokens from {max_tokens} to {kwargs['max_tokens']} due to model limits")
 
         kwargs['messages'] = messages
@@ -146,11 +222,11 @@ class LLMService:
             if from_config:
                 api_base = self.config.get('api_base', None)
                 kwargs["api_base"] = api_base
-        _, provider, _, _ = get_llm_provider(model=kwargs["model"])
+        provider = self.model_registry.get_provider(kwargs["model"])
         return kwargs, provider
 
     def supports_vision(self, model: str) -> bool:
-        return supports_vision(model)
+        return self.model_registry.supports_vision(model)
 
     def get_global_token_usage(self) -> Dict[str, Dict[str, Any]]:
         return self.token_counter.get_global_token_usage()
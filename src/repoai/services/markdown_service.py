@@ -1,6 +1,7 @@
 from pathlib import Path
 from typing import Dict, Any, Optional
 from ..utils.markdown_generator import MarkdownGenerator
+from ..utils.file_chunker import excerpt_file
 from ..core.file_manager import FileManager
 from ..utils.logger import get_logger
 
@@ -8,13 +9,28 @@ logger = get_logger(__name__)
 
 
 class MarkdownService:
-    def __init__(self, project_path: Path, ignore_file: str):
+    def __init__(self, project_path: Path, ignore_file: str, file_manager: Optional[FileManager] = None):
         self.project_name = project_path.stem
         self.project_path = project_path
-        self.file_manager = FileManager(project_path, ignore_file=ignore_file)
+        self.file_manager = file_manager or FileManager(project_path, ignore_file=ignore_file)
         logger.debug("Markdown service initialized")
 
-    def generate_markdown_compilation(self, project_description: str, files: Optional[list[str]] = None, include_line_numbers: bool = False) -> str:
-        logger.debug(f"Generating markdown compilation for project: {self.project_name}")
+    def generate_markdown_compilation(self, project_description: str, files: Optional[list[str]] = None, include_line_numbers: bool = False,
+                                      mode: str = 'full', full_content_files: Optional[list[str]] = None,
+                                      max_file_tokens: int = 0, query: str = '') -> str:
+        """
+        Args:
+            max_file_tokens: If set, files shown in full that are larger than this are reduced to
+                their chunks most relevant to `query` (the first chunks without a query).
+        """
+        logger.debug(f"Generating markdown compilation for project: {self.project_name} ({mode})")
         repo_content = self.file_manager.generate_repo_content(files)
-        return MarkdownGenerator.generate_project_compilation(project_description, repo_content, include_line_numbers)
+        if max_file_tokens:
+            repo_content['excerpts'] = {}
+            for file_path, content in repo_content['content'].items():
+                if mode == 'full' or file_path in (full_content_files or []):
+                    excerpt = excerpt_file(file_path, content, query, max_file_tokens, include_line_numbers=include_line_numbers)
+                    if excerpt is not None:
+                        repo_content['excerpts'][file_path] = excerpt
+        return MarkdownGenerator.generate_project_compilation(project_description, repo_content, include_line_numbers,
+                                                              mode=mode, full_content_files=full_content_files)
@@ -1,9 +1,15 @@
 # File: src/repoai/services/progress_service.py
 
+import os
+import re
+import gzip
 import json
+import hashlib
+import threading
 import yaml
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from ..core.config_manager import ConfigManager
 from ..core.file_manager import FileManager
 from ..utils.common_utils import get_formated_datetime
@@ -12,38 +18,192 @@ from ..utils.logger import get_logger
 logger = get_logger(__name__)
 
 class ProgressService:
-    def __init__(self, project_path: str, config: ConfigManager):
+    """
+    Persists workflow progress as a YAML snapshot plus an append-only JSON-lines journal.
+
+    Each save_progress call appends one record holding only the context keys that
+    changed since the previous call: new dict entries are merged and list items
+    appended to lists are extended. The journal is compacted into the snapshot
+    every `progress_compaction_interval` records, which also leaves a gzip-compressed
+    timestamped checkpoint. Records are numbered and the snapshot stores the number of the
+    last record it includes, so a journal left behind by a crash during compaction is not
+    replayed twice. Checkpoints are pruned according to the retention
+    settings (`checkpoint_keep_last`, `checkpoint_max_age_days` and
+    `checkpoint_step_boundaries_only`) by collect_garbage, which runs in the
+    background after each compaction.
+    """
+
+    def __init__(self, project_path: str, config: ConfigManager, file_manager: Optional[FileManager] = None):
         self.project_name = project_path.stem
         self.project_path = project_path
         self.config = config
-        self.file_manager = FileManager(self.project_path, ignore_file=self.config.get('repoai_ignore_file'))
+        self.file_manager = file_manager or FileManager(self.project_path, ignore_file=self.config.get('repoai_ignore_file'))
         self.base_path = Path(self.config.REPOAI_DIR)
         self.base_file_name = f"{self.project_name}_workflow_progress.yml"
+        self.journal_file_name = f"{self.project_name}_workflow_progress.journal"
+        self.compaction_interval = self.config.get('progress_compaction_interval', 50)
+        self.checkpoint_pattern = re.compile(r'^(\d{8}_\d{6})_(.+)_' + re.escape(self.base_file_name) + r'(\.gz)?$')
+        self._gc_lock = threading.Lock()
+        self._key_hashes: Optional[Dict[str, Any]] = None  # Fingerprints of the last persisted context
+        self._journal_records = 0
+        self._journal_size = 0
+        self._journal_seq = 0  # Number of the last journal record written
         logger.debug("Progress service initialized")
 
+    @property
+    def snapshot_path(self) -> Path:
+        return self.project_path / self.base_path / self.base_file_name
+
+    @property
+    def journal_path(self) -> Path:
+        return self.project_path / self.base_path / self.journal_file_name
+
     def save_progress(self, step_name: str, context: Dict[str, Any]):
         formated_time = get_formated_datetime()
-        progress_data = self.load_progress()
-        progress_data['last_step'] = step_name
-        progress_data['context'] = context
-        progress_data['datetime'] = formated_time
-        
-        self.file_manager.save_yaml(str(self.base_path / self.base_file_name), progress_data)
-        self.file_manager.save_yaml(str(self.base_path / f"{formated_time}_{step_name}_{self.base_file_name}"), progress_data)
+        if self._key_hashes is None or not self._journal_in_sync():
+            self._sync_from_disk()
+
+        fingerprints = {key: self._fingerprint(value) for key, value in context.items()}
+        record = self._diff(context, fingerprints)
+        record['step'] = step_name
+        record['datetime'] = formated_time
+        record['seq'] = self._journal_seq + 1
+
+        self._append_journal(record)
+        self._key_hashes = fingerprints
+
+        if self._journal_records >= self.compaction_interval:
+            self.compact(step_name, context, formated_time)
         logger.debug(f"Progress saved for step: {step_name}")
 
+    def compact(self, step_name: str, context: Dict[str, Any], formated_time: Optional[str] = None):
+        formated_time = formated_time or get_formated_datetime()
+        progress_data = {'last_step': step_name, 'context': context, 'datetime': formated_time, 'journal_seq': self._journal_seq}
+        # Replace the snapshot atomically and only then drop the journal it includes
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_name(f".{self.base_file_name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            yaml.dump(progress_data, f, default_flow_style=False, allow_unicode=True)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self._write_checkpoint(f"{formated_time}_{step_name}_{self.base_file_name}.gz", progress_data)
+        self.file_manager.delete_file(str(self.base_path / self.journal_file_name))
+        self._journal_records = 0
+        self._journal_size = 0
+        logger.debug(f"Progress journal compacted at step: {step_name}")
+        self.collect_garbage_in_background()
+
+    def list_checkpoints(self) -> List[Dict[str, Any]]:
+        """Timestamped checkpoints of this project, oldest first."""
+        checkpoint_dir = self.project_path / self.base_path
+        if not checkpoint_dir.exists():
+            return []
+        checkpoints = []
+        for path in checkpoint_dir.iterdir():
+            match = self.checkpoint_pattern.match(path.name)
+            if match:
+                checkpoints.append({
+                    'path': path,
+                    'datetime': datetime.strptime(match.group(1), "%Y%m%d_%H%M%S"),
+                    'step': match.group(2),
+                    'compressed': bool(match.group(3)),
+                })
+        return sorted(checkpoints, key=lambda checkpoint: (checkpoint['datetime'], checkpoint['path'].name))
+
+    def collect_garbage(self, keep_last: Optional[int] = None, max_age_days: Optional[float] = None,
+                        step_boundaries_only: Optional[bool] = None) -> Dict[str, int]:
+        """
+        Apply the checkpoint retention policy and compress the checkpoints that are kept.
+
+        Arguments left as None are read from the configuration. A checkpoint is kept only
+        if it passes every enabled rule.
+        """
+        keep_last = self.config.get('checkpoint_keep_last', 10) if keep_last is None else keep_last
+        max_age_days = self.config.get('checkpoint_max_age_days', 30) if max_age_days is None else max_age_days
+        if step_boundaries_only is None:
+            step_boundaries_only = self.config.get('checkpoint_step_boundaries_only', False)
+
+        with self._gc_lock:
+            checkpoints = self.list_checkpoints()
+            keep = checkpoints
+            if step_boundaries_only:
+                # Keep the last checkpoint of every run of consecutive checkpoints of the same step
+                keep = [c for i, c in enumerate(keep) if i + 1 == len(keep) or keep[i + 1]['step'] != c['step']]
+            if max_age_days:
+                oldest = datetime.now() - timedelta(days=max_age_days)
+                keep = [c for c in keep if c['datetime'] >= oldest]
+            if keep_last:
+                keep = keep[-keep_last:]
+
+            kept_paths = {c['path'] for c in keep}
+            removed = 0
+            compressed = 0
+            for checkpoint in checkpoints:
+                if checkpoint['path'] not in kept_paths:
+                    checkpoint['path'].unlink(missing_ok=True)
+                    removed += 1
+                elif not checkpoint['compressed']:
+                    self._compress_checkpoint(checkpoint['path'])
+                    compressed += 1
+
+        logger.debug(f"Checkpoint garbage collection: kept {len(keep)}, removed {removed}, compressed {compressed}")
+        return {'kept': len(keep), 'removed': removed, 'compressed': compressed}
+
+    def collect_garbage_in_background(self) -> threading.Thread:
+        thread = threading.Thread(target=self._collect_garbage_safely, daemon=True)
+        thread.start()
+        return thread
+
+    def _collect_garbage_safely(self):
+        try:
+            self.collect_garbage()
+        except Exception as e:
+            logger.debug(f"Background checkpoint garbage collection failed: {str(e)}", exc_info=True)
+
+    def _write_checkpoint(self, file_name: str, progress_data: Dict[str, Any]):
+        full_path = self.project_path / self.base_path / file_name
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(full_path, 'wt', encoding='utf-8') as f:
+            yaml.dump(progress_data, f, default_flow_style=False, allow_unicode=True)
+
+    @staticmethod
+    def _compress_checkpoint(path: Path):
+        with open(path, 'rb') as source, gzip.open(path.with_name(path.name + '.gz'), 'wb') as target:
+            target.writelines(source)
+        path.unlink()
+
+    @staticmethod
+    def load_checkpoint(path: Path) -> Dict[str, Any]:
+        opener = gzip.open if path.name.endswith('.gz') else open
+        with opener(path, 'rt', encoding='utf-8') as f:
+            return yaml.safe_load(f) or {}
+
     def load_progress(self) -> Dict[str, Any]:
-        if self.file_manager.file_exists(str(self.base_path / self.base_file_name)):
-            content = self.file_manager.read_file(str(self.base_path / self.base_file_name))
-            return yaml.safe_load(content)
-        return {}
+        progress_data = self._load_snapshot()
+        records = self._pending_records(progress_data)
+        if not records:
+            return progress_data
+        context = progress_data.get('context') or {}
+        for record in records:
+            self._apply(context, record)
+            progress_data['last_step'] = record['step']
+            progress_data['datetime'] = record['datetime']
+        progress_data['context'] = context
+        return progress_data
 
     def get_last_state(self) -> Dict[str, Any]:
         return self.load_progress()
 
     def clear_progress(self):
         self.file_manager.delete_file(str(self.base_path / self.base_file_name))
+        self.file_manager.delete_file(str(self.base_path / self.journal_file_name))
+        self._key_hashes = {}
+        self._journal_records = 0
+        self._journal_size = 0
+        self._journal_seq = 0
         logger.debug(f"Progress cleared for project: {self.project_path}")
+        self.collect_garbage_in_background()
 
     def get_last_step(self) -> str:
         progress = self.load_progress()
@@ -51,4 +211,104 @@ class ProgressService:
 
     def resume_from_last_step(self) -> Dict[str, Any]:
         progress = self.load_progress()
-        return progress.get('context', {})
\ No newline at end of file
+        return progress.get('context', {})
+
+    def _load_snapshot(self) -> Dict[str, Any]:
+        if self.file_manager.file_exists(str(self.base_path / self.base_file_name)):
+            content = self.file_manager.read_file(str(self.base_path / self.base_file_name))
+            return yaml.safe_load(content) or {}
+        return {}
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        if not self.journal_path.exists():
+            return []
+        records = []
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A crash in the middle of an append leaves a partial last line
+                    logger.warning(f"Ignoring corrupted progress journal record in {self.journal_path}")
+                    break
+        return records
+
+    def _pending_records(self, progress_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Journal records not included in the snapshot yet (records without a number predate numbering)."""
+        snapshot_seq = progress_data.get('journal_seq', 0)
+        return [record for record in self._read_journal() if record.get('seq', snapshot_seq + 1) > snapshot_seq]
+
+    def _append_journal(self, record: Dict[str, Any]):
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, default=str, ensure_ascii=False) + '\n'
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            self._journal_size = f.tell()
+        self._journal_records += 1
+        self._journal_seq = record.get('seq', self._journal_seq)
+
+    def _journal_in_sync(self) -> bool:
+        size = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+        return size == self._journal_size
+
+    def _sync_from_disk(self):
+        """Rebuild fingerprints from persisted progress, e.g. after another instance wrote to it."""
+        progress_data = self.load_progress()
+        context = progress_data.get('context') or {}
+        self._key_hashes = {key: self._fingerprint(value) for key, value in context.items()}
+        snapshot_seq = self._load_snapshot().get('journal_seq', 0)
+        records = self._pending_records({'journal_seq': snapshot_seq})
+        self._journal_records = len(records)
+        self._journal_seq = max([snapshot_seq] + [record.get('seq', 0) for record in records])
+        self._journal_size = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+
+    @staticmethod
+    def _hash(value: Any) -> str:
+        return hashlib.sha1(json.dumps(value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _fingerprint(cls, value: Any) -> Dict[str, Any]:
+        if isinstance(value, dict):
+            return {'type': 'dict', 'items': {str(k): cls._hash(v) for k, v in value.items()}}
+        if isinstance(value, list):
+            return {'type': 'list', 'items': [cls._hash(v) for v in value]}
+        return {'type': 'value', 'hash': cls._hash(value)}
+
+    def _diff(self, context: Dict[str, Any], fingerprints: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        record: Dict[str, Any] = {}
+        for key, value in context.items():
+            new = fingerprints[key]
+            old = self._key_hashes.get(key)
+            if old == new:
+                continue
+            if old and old['type'] == new['type'] == 'dict':
+                merged = {k: v for k, v in value.items() if old['items'].get(str(k)) != new['items'][str(k)]}
+                removed = [k for k in old['items'] if k not in new['items']]
+                if merged:
+                    record.setdefault('merge', {})[key] = merged
+                if removed:
+                    record.setdefault('drop', {})[key] = removed
+            elif old and old['type'] == new['type'] == 'list' and new['items'][:len(old['items'])] == old['items']:
+                record.setdefault('extend', {})[key] = value[len(old['items']):]
+            else:
+                record.setdefault('set', {})[key] = value
+        removed_keys = [key for key in self._key_hashes if key not in context]
+        if removed_keys:
+            record['unset'] = removed_keys
+        return record
+
+    @staticmethod
+    def _apply(context: Dict[str, Any], record: Dict[str, Any]):
+        for key, value in record.get('set', {}).items():
+            context[key] = value
+        for key, value in record.get('merge', {}).items():
+            context.setdefault(key, {}).update(value)
+        for key, removed in record.get('drop', {}).items():
+            for subkey in removed:
+                context.get(key, {}).pop(subkey, None)
+        for key, items in record.get('extend', {}).items():
+            context.setdefault(key, []).extend(items)
+        for key in record.get('unset', []):
+            context.pop(key, None)
@@ -0,0 +1,153 @@
+import re
+import ast
+import bisect
+from pathlib import Path
+from typing import List, Optional, Tuple
+from .symbol_index import LANGUAGES, DEFINITION_PATTERNS
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_VALUE_LENGTH = 60
+MAX_SIGNATURE_LENGTH = 160
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+\S')
+DOC_COMMENT_PATTERN = re.compile(r'^\s*(?:///?|#|\*|/\*\*?)\s?(.*?)\s*(?:\*/)?$')
+
+OutlineLine = Tuple[int, str]  # (1-based line in the source file, outline text)
+
+
+def generate_outline(file_path: str, content: str) -> Optional[List[OutlineLine]]:
+    """
+    Signatures of a source file: classes, functions, methods and top-level constants,
+    each with the first line of its docstring. Returns None for files without an
+    outline format (plain text, data files...), which are rendered in full or omitted.
+    """
+    suffix = Path(file_path).suffix.lower()
+    if suffix in ('.md', '.markdown', '.rst'):
+        return _markdown_outline(content)
+    language = LANGUAGES.get(suffix)
+    if language is None:
+        return None
+    if language == 'python':
+        try:
+            return _python_outline(content)
+        except (SyntaxError, ValueError):
+            logger.debug(f"Could not parse {file_path} with ast, using the generic outline")
+    return _generic_outline(language, content)
+
+
+def _first_docstring_line(node: ast.AST) -> Optional[str]:
+    docstring = ast.get_docstring(node)
+    if not docstring:
+        return None
+    return docstring.strip().split('\n')[0].strip()
+
+
+def _shorten(text: str, length: int) -> str:
+    text = ' '.join(text.split())
+    return text if len(text) <= length else text[:length - 3].rstrip() + '...'
+
+
+def _python_outline(content: str) -> List[OutlineLine]:
+    tree = ast.parse(content)
+    outline: List[OutlineLine] = []
+    docstring = _first_docstring_line(tree)
+    if docstring:
+        outline.append((1, f'"""{docstring}"""'))
+    _python_body(tree.body, 0, outline, top_level=True)
+    return outline
+
+
+def _python_body(body: List[ast.stmt], depth: int, outline: List[OutlineLine], top_level: bool = False):
+    indent = '    ' * depth
+    for node in body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            for decorator in node.decorator_list:
+                outline.append((decorator.lineno, f"{indent}@{_shorten(ast.unparse(decorator), MAX_VALUE_LENGTH)}"))
+            docstring = _first_docstring_line(node)
+            if isinstance(node, ast.ClassDef):
+                bases = [ast.unparse(base) for base in node.bases] + [ast.unparse(keyword) for keyword in node.keywords]
+                header = f"class {node.name}({', '.join(bases)}):" if bases else f"class {node.name}:"
+                outline.append((node.lineno, indent + _shorten(header, MAX_SIGNATURE_LENGTH)))
+                if docstring:
+                    outline.append((node.body[0].lineno, f'{indent}    """{docstring}"""'))
+                size = len(outline)
+                _python_body(node.body, depth + 1, outline)
+                if len(outline) == size and not docstring:
+                    outline.append((node.lineno, f"{indent}    ..."))
+            else:
+                prefix = 'async def' if isinstance(node, ast.AsyncFunctionDef) else 'def'
+                returns = f" -> {ast.unparse(node.returns)}" if node.returns else ''
+                header = _shorten(f"{prefix} {node.name}({ast.unparse(node.args)}){returns}:", MAX_SIGNATURE_LENGTH)
+                if docstring:
+                    outline.append((node.lineno, indent + header))
+                    outline.append((node.body[0].lineno, f'{indent}    """{docstring}"""'))
+                else:
+                    outline.append((node.lineno, f"{indent}{header} ..."))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = [ast.unparse(target) for target in targets if isinstance(target, (ast.Name, ast.Tuple))]
+            if not names:
+                continue
+            # Every class attribute, but only the constants (and dunders such as __all__) of a module
+            if top_level and not any(name.isupper() or name.startswith('__') for name in names):
+                continue
+            annotation = f": {ast.unparse(node.annotation)}" if isinstance(node, ast.AnnAssign) else ''
+            value = ''
+            if node.value is not None:
+                value = ast.unparse(node.value)
+                value = ' = ' + (value if len(value) <= MAX_VALUE_LENGTH else '...')
+            outline.append((node.lineno, f"{indent}{' = '.join(names)}{annotation}{value}"))
+
+
+def _generic_outline(language: str, content: str) -> List[OutlineLine]:
+    lines = content.split('\n')
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    definition_lines = set()
+    for _, pattern in DEFINITION_PATTERNS.get(language, []):
+        for match in pattern.finditer(content):
+            definition_lines.add(bisect.bisect_right(offsets, match.start(1)) - 1)
+    outline: List[OutlineLine] = []
+    for index in sorted(definition_lines):
+        signature = lines[index].rstrip().rstrip('{').rstrip()
+        doc = _doc_comment_before(lines, index)
+        if doc:
+            outline.append((index, f"{_leading_space(lines[index])}// {doc}"))
+        outline.append((index + 1, _leading_space(lines[index]) + _shorten(signature, MAX_SIGNATURE_LENGTH)))
+    return outline
+
+
+def _markdown_outline(content: str) -> List[OutlineLine]:
+    outline: List[OutlineLine] = []
+    in_fence = False
+    for number, line in enumerate(content.split('\n'), 1):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        elif not in_fence and HEADING_PATTERN.match(line):
+            outline.append((number, line.rstrip()))
+    return outline
+
+
+def _leading_space(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _doc_comment_before(lines: List[str], index: int) -> Optional[str]:
+    """First line of the comment block right above a definition, skipping attributes/annotations."""
+    index -= 1
+    while index >= 0 and lines[index].strip().startswith(('@', '#[', '[')):
+        index -= 1
+    first = None
+    while index >= 0:
+        stripped = lines[index].strip()
+        # '#include', '#define'... are preprocessor lines, not comments
+        if not stripped.startswith(('//', '/*', '*', '#')) or re.match(r'#[a-z]', stripped):
+            break
+        match = DOC_COMMENT_PATTERN.match(stripped)
+        text = match.group(1).strip() if match else ''
+        if text and not text.startswith('@'):
+            first = text
+        index -= 1
+    return _shorten(first, MAX_SIGNATURE_LENGTH) if first else None
@@ -2,14 +2,12 @@ import os
 import re
 import fnmatch
 import string
-import chardet
 import base64
-from PIL import Image
 import io
-import imghdr
 from datetime import datetime
 from pathlib import Path
 from typing import List, Union, Tuple, Dict, Any
+from ..utils.fenced_blocks import FencedDocument, parse_fenced_blocks
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -77,6 +75,7 @@ def is_utf8(data: bytes) -> bool:
         return False
 
 def check_chardet_confidence(data: bytes, threshold: float = 0.8) -> bool:
+    import chardet
     result = chardet.detect(data)
     return result['encoding'] is not None and result['confidence'] > threshold
 
@@ -151,12 +150,9 @@ def lines_lstrip_backticks_with_indices(content: str) -> tuple[List[str], list[i
     return processed_lines, backtick_indices
 
 def join_split_code(content1: str, content2: str, placeholder: str = "<::PLACEHOLDER::>") -> List[str]:
-    processed_content1, _ = lines_lstrip_backticks_with_indices(content1)
-    processed_content2, backtick_indices2 = lines_lstrip_backticks_with_indices(content2)
-    first_opening_index = backtick_indices2[0]
-    content2_part2 = processed_content2[first_opening_index+1:]
-    joined_content = processed_content1 + [placeholder] + content2_part2
-    return joined_content
+    document = FencedDocument(content1)
+    document.extend(content2, skip_reopening_fence=True, placeholder=placeholder)
+    return document.lines
 
 def count_triple_backticks_at_line_start(content: str) -> int:
     pattern = re.compile(r'(?m)^```')
@@ -164,57 +160,34 @@ def count_triple_backticks_at_line_start(content: str) -> int:
     return len(matches)
 
 def incomplete_code(content: str):
-    return count_triple_backticks_at_line_start(content) % 2 == 1
+    return parse_fenced_blocks(content).unterminated
 
 def join_generated_code(contents: List[str], placeholder: str = "<::PLACEHOLDER::>") -> str:
-    joined_content, _ = lines_lstrip_backticks_with_indices(contents[0])
+    # Parts are tokenized once each; the nesting state carries over instead of rescanning the joined text
+    document = FencedDocument(contents[0])
     for content in contents[1:]:
-        if incomplete_code("\n".join(joined_content)):
-            joined_content = join_split_code("\n".join(joined_content), content, placeholder=placeholder)
-        else:
-            content_list, _ = lines_lstrip_backticks_with_indices(content)
-            joined_content.extend(content_list)
-    join_code = "\n".join(joined_content)
-    return join_code
+        document.extend(content, skip_reopening_fence=document.unterminated, placeholder=placeholder if document.unterminated else None)
+    return document.text
 
 def extract_code_blocks(content: str) -> list[Tuple[str, str]]:
-    if incomplete_code(content):
+    """Language and content of the top-level fenced blocks; empty if a block is unterminated."""
+    document = parse_fenced_blocks(content)
+    if document.unterminated:
         return []
-    content_lines, _ = lines_lstrip_backticks_with_indices(content)
-    preprocessed_content = "\n".join(content_lines)
-
-    pattern = re.compile(r'```(\w*)\n(.*?)```', re.DOTALL)
-    matches = re.findall(pattern, preprocessed_content)
-    # list of tuples to list of lists
-    return [list(match) for match in matches]
+    blocks = []
+    for block in document.blocks:
+        block_content = document.block_content(block)
+        blocks.append([block.language, block_content + '\n' if block.end > block.start + 1 else block_content])
+    return blocks
 
 def extract_outer_code_block(content: str):
-    # Preprocess the content
-    content_lines, _ = lines_lstrip_backticks_with_indices(content)
-    preprocessed_content = "\n".join(content_lines)
-
-    if incomplete_code(preprocessed_content):
-        return None, None
-
-    start = preprocessed_content.find('```')
-    end = preprocessed_content.rfind('```')
-    
-    if start == -1 or end == -1 or start == end:
-        return None, None
-    
-    # Extract the outer block
-    outer_block = preprocessed_content[start:end+3]
-    outer_lines = outer_block.split('\n')
-    
-    # Get the language of the outer block (if specified)
-    outer_lang = outer_lines[0][3:].strip()
-    
-    # Get the content of the outer block
-    outer_content = '\n'.join(outer_lines[1:-1])
-    
-    return outer_lang, outer_content
+    return parse_fenced_blocks(content).outer_block()
 
 def image_to_base64(image_input):
+    # Pillow and imghdr are only needed for image contexts; keep them off the import path
+    import imghdr
+    from PIL import Image
+
     # Function to get MIME type
     def get_mime_type(format):
         mime_types = {
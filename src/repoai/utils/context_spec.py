@@ -0,0 +1,176 @@
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from .file_chunker import chunk_file
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from ..core.file_manager import FileManager
+    from .symbol_index import SymbolIndex
+
+logger = get_logger(__name__)
+
+LINE_RANGE_PATTERN = re.compile(r'^(.+?):(\d+)(?:-(\d+))?$')
+GLOB_CHARACTERS = set('*?[')
+
+
+class ContextSpec:
+    """
+    A file context specification:
+    - `path`: the whole file
+    - `path:120-240` or `path:120`: a line range (1-based, inclusive)
+    - `path::Name` or `path::Class.method`: the definition of a symbol
+    - `src/**/*.py`: every file not ignored matching a glob (`**` matches any directories)
+    """
+
+    def __init__(self, spec: str):
+        self.spec = spec.strip()
+        self.path = self.spec
+        self.start_line: Optional[int] = None
+        self.end_line: Optional[int] = None
+        self.symbol: Optional[str] = None
+        if '::' in self.spec:
+            self.path, self.symbol = self.spec.rsplit('::', 1)
+        else:
+            match = LINE_RANGE_PATTERN.match(self.spec)
+            if match:
+                self.path = match.group(1)
+                self.start_line = int(match.group(2))
+                self.end_line = int(match.group(3) or match.group(2))
+                if self.end_line < self.start_line:
+                    raise ValueError(f"Invalid line range in context spec: {spec}")
+        self.path = self.path.strip()
+        if self.path.startswith('./'):
+            self.path = self.path[2:]
+
+    @property
+    def is_glob(self) -> bool:
+        return any(c in GLOB_CHARACTERS for c in self.path)
+
+    def __repr__(self) -> str:
+        return f"ContextSpec({self.spec!r})"
+
+
+def glob_to_regex(pattern: str) -> re.Pattern:
+    """Regex for a glob over '/'-separated relative paths; `**/` matches zero or more directories."""
+    regex = ''
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith('**/', index):
+            regex += '(?:.*/)?'
+            index += 3
+        elif pattern.startswith('**', index):
+            regex += '.*'
+            index += 2
+        elif pattern[index] == '*':
+            regex += '[^/]*'
+            index += 1
+        elif pattern[index] == '?':
+            regex += '[^/]'
+            index += 1
+        elif pattern[index] == '[':
+            end = pattern.find(']', index + 1)
+            if end == -1:
+                regex += re.escape(pattern[index])
+                index += 1
+            else:
+                regex += '[' + pattern[index + 1:end].replace('!', '^', 1) + ']'
+                index = end + 1
+        else:
+            regex += re.escape(pattern[index])
+            index += 1
+    return re.compile(regex + '$')
+
+
+class FileContextResolver:
+    """
+    Resolves context specs to file ranges and loads them.
+
+    Globs are matched against a path index of the files not ignored, listed once per
+    `resolve` call. Symbols are located with the symbol index. Ranges are read with
+    `FileManager.read_lines`, which seeks to the byte offsets of the lines.
+    """
+
+    def __init__(self, file_manager: 'FileManager', symbol_index: 'SymbolIndex'):
+        self.file_manager = file_manager
+        self.symbol_index = symbol_index
+        self._lock = threading.Lock()
+
+    def resolve(self, specs: List[str], strict: bool = True) -> List[Dict[str, Any]]:
+        """
+        Returns dicts with `path`, `start_line`/`end_line` (None for whole files) and `label`,
+        in spec order and without duplicates. Specs matching nothing raise ValueError, or are
+        skipped with a warning if not `strict`.
+        """
+        path_index: List[List[str]] = []  # Listed on the first glob, shared by the following ones
+        resolved = []
+        seen = set()
+        for spec_text in specs:
+            try:
+                items = self._resolve_spec(ContextSpec(spec_text), path_index)
+            except ValueError as e:
+                if strict:
+                    raise
+                logger.warning(f"Skipping file context '{spec_text}': {str(e)}")
+                continue
+            for item in items:
+                key = (item['path'], item['start_line'], item['end_line'])
+                if key not in seen:
+                    seen.add(key)
+                    resolved.append(item)
+        return resolved
+
+    def _resolve_spec(self, spec: ContextSpec, path_index: List[List[str]]) -> List[Dict[str, Any]]:
+        if spec.path != spec.spec and self.file_manager.file_exists(spec.spec):
+            spec.path, spec.start_line, spec.end_line, spec.symbol = spec.spec, None, None, None  # A file name containing ':'
+        if spec.is_glob:
+            if not path_index:
+                path_index.append(sorted(self.file_manager.list_files_not_ignored()))
+            pattern = glob_to_regex(spec.path)
+            items = [self._item(path) for path in path_index[0] if pattern.match(path)]
+            if not items:
+                raise ValueError(f"No files match '{spec.spec}'")
+            return items
+        if not self.file_manager.file_exists(spec.path) or self.file_manager.directory_exists(spec.path):
+            raise ValueError(f"File not found: '{spec.path}'")
+        if spec.symbol:
+            return [self._symbol_item(spec)]
+        if spec.start_line is not None:
+            return [self._item(spec.path, spec.start_line, spec.end_line)]
+        return [self._item(spec.path)]
+
+    def load(self, specs: List[str], strict: bool = True) -> List[Dict[str, Any]]:
+        """Resolved specs with their `content`."""
+        items = self.resolve(specs, strict)
+        for item in items:
+            if item['start_line'] is None:
+                item['content'] = self.file_manager.read_file(item['path'])
+            else:
+                item['content'] = self.file_manager.read_lines(item['path'], item['start_line'], item['end_line'])
+        return items
+
+    def _symbol_item(self, spec: ContextSpec) -> Dict[str, Any]:
+        with self._lock:
+            self.symbol_index.update([spec.path])
+            entry = self.symbol_index.get_file_symbols(spec.path)
+        definitions = [d for d in (entry or {}).get('definitions', [])
+                       if d['qualified_name'] == spec.symbol or d['name'] == spec.symbol]
+        if not definitions:
+            raise ValueError(f"Symbol '{spec.symbol}' not found in '{spec.path}'")
+        # Prefer an exact qualified match, e.g. `Class.method` over another `method`
+        definition = next((d for d in definitions if d['qualified_name'] == spec.symbol), definitions[0])
+        start_line, end_line = definition['line'], definition['end_line']
+        if entry['language'] != 'python':
+            # Regex-based definitions only know their first line; extend it to the enclosing chunk
+            content = self.file_manager.read_file(spec.path)
+            chunk = next((c for c in chunk_file(spec.path, content) if c.start_line <= start_line <= c.end_line), None)
+            if chunk is not None:
+                end_line = chunk.end_line
+        item = self._item(spec.path, start_line, end_line)
+        item['label'] = f"{spec.path}::{spec.symbol} (lines {start_line}-{end_line})"
+        return item
+
+    @staticmethod
+    def _item(path: str, start_line: Optional[int] = None, end_line: Optional[int] = None) -> Dict[str, Any]:
+        label = path if start_line is None else f"{path} (lines {start_line}-{end_line})"
+        return {'path': path, 'start_line': start_line, 'end_line': end_line, 'label': label}
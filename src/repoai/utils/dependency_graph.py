@@ -0,0 +1,175 @@
+import posixpath
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from .symbol_index import SymbolIndex
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+JS_LANGUAGES = ('javascript', 'typescript')
+JS_RESOLUTION_SUFFIXES = ['', '.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.d.ts',
+                          '/index.ts', '/index.tsx', '/index.js', '/index.jsx']
+
+
+class DependencyGraph:
+    """
+    Import graph between project files, derived from the imports in the symbol index.
+
+    Python imports are resolved against the source roots of the project (the parent
+    directories of its top-level packages), JS/TS imports against the importing file
+    for relative specifiers; imports of external packages are ignored. The graph is
+    rebuilt only when the symbol index changed.
+    """
+
+    def __init__(self, symbol_index: SymbolIndex):
+        self.symbol_index = symbol_index
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._revision: Optional[int] = None
+        self._lock = threading.RLock()
+
+    def update(self, files: Optional[List[str]] = None):
+        """Update the symbol index (all files, or only `files`) and rebuild the graph if it changed."""
+        with self._lock:
+            self.symbol_index.update(files)
+            if self._revision != self.symbol_index.revision:
+                self._build()
+
+    def _build(self):
+        files = self.symbol_index.files
+        python_modules = self._python_module_map(files)
+        module_names = {file_path: name for name, file_path in python_modules.items()}
+        self._dependencies = {}
+        self._dependents = {}
+        for file_path, entry in files.items():
+            dependencies = set()
+            for module in entry['imports']:
+                if entry['language'] == 'python':
+                    target = self._resolve_python(file_path, module, python_modules, module_names)
+                elif entry['language'] in JS_LANGUAGES:
+                    target = self._resolve_js(file_path, module, files)
+                else:
+                    target = None
+                if target and target != file_path:
+                    dependencies.add(target)
+            self._dependencies[file_path] = dependencies
+            for target in dependencies:
+                self._dependents.setdefault(target, set()).add(file_path)
+        self._revision = self.symbol_index.revision
+        logger.debug(f"Dependency graph built: {len(files)} files, {sum(len(d) for d in self._dependencies.values())} edges")
+
+    @staticmethod
+    def _python_module_map(files: Dict[str, Dict]) -> Dict[str, str]:
+        """Dotted module name -> file, for every Python file under each source root."""
+        python_files = [f for f, entry in files.items() if entry['language'] == 'python']
+        packages = {posixpath.dirname(f) for f in python_files if posixpath.basename(f) == '__init__.py'}
+        modules = {}
+        for file_path in python_files:
+            directory = posixpath.dirname(file_path)
+            # The source root is the parent of the outermost package containing the file
+            while directory in packages:
+                directory = posixpath.dirname(directory)
+            relative = posixpath.relpath(file_path, directory) if directory else file_path
+            name = relative[:-len('.py')] if relative.endswith('.py') else relative[:-len('.pyi')]
+            if name.endswith('__init__'):
+                name = name[:-len('__init__')].rstrip('/')
+            if name:
+                modules.setdefault(name.replace('/', '.'), file_path)
+        return modules
+
+    @staticmethod
+    def _resolve_python(file_path: str, module: str, python_modules: Dict[str, str], module_names: Dict[str, str]) -> Optional[str]:
+        if module.startswith('.'):
+            base_name = module_names.get(file_path)
+            if base_name is None:
+                return None
+            package = base_name.split('.')
+            if posixpath.basename(file_path) not in ('__init__.py', '__init__.pyi'):
+                package = package[:-1]
+            level = len(module) - len(module.lstrip('.'))
+            if level - 1 > len(package):
+                return None
+            package = package[:len(package) - (level - 1)]
+            remainder = module[level:]
+            module = '.'.join(package + ([remainder] if remainder else []))
+        return python_modules.get(module)
+
+    @staticmethod
+    def _resolve_js(file_path: str, module: str, files: Dict[str, Dict]) -> Optional[str]:
+        if not module.startswith('.'):
+            return None
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(file_path), module))
+        for suffix in JS_RESOLUTION_SUFFIXES:
+            if base + suffix in files:
+                return base + suffix
+        return None
+
+    def dependencies(self, file_path: str) -> Set[str]:
+        with self._lock:
+            return set(self._dependencies.get(file_path, ()))
+
+    def dependents(self, file_path: str) -> Set[str]:
+        with self._lock:
+            return set(self._dependents.get(file_path, ()))
+
+    def impacted_files(self, files: Iterable[str]) -> List[str]:
+        """Files that directly or transitively import any of `files`, nearest first."""
+        with self._lock:
+            files = list(files)
+            seen = set(files)
+            impacted = []
+            queue = deque(files)
+            while queue:
+                for dependent in sorted(self._dependents.get(queue.popleft(), ())):
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        impacted.append(dependent)
+                        queue.append(dependent)
+            return impacted
+
+    def related_files(self, files: Iterable[str], token_budget: int, read_file: Callable[[str], str],
+                      count_tokens: Callable[[str], int]) -> List[str]:
+        """
+        Direct dependencies and then direct dependents of `files`, excluding `files`,
+        for as long as their content fits in `token_budget` tokens.
+        """
+        with self._lock:
+            files = list(files)
+            candidates = []
+            for collection in (self._dependencies, self._dependents):
+                for file_path in files:
+                    for related in sorted(collection.get(file_path, ())):
+                        if related not in files and related not in candidates:
+                            candidates.append(related)
+        related_files = []
+        for file_path in candidates:
+            tokens = count_tokens(read_file(file_path) or '')
+            if tokens > token_budget:
+                continue
+            token_budget -= tokens
+            related_files.append(file_path)
+        return related_files
+
+    def generation_order(self, files: Iterable[str]) -> List[str]:
+        """`files` ordered so that every file comes after the files it imports. Import cycles
+        are broken by keeping the given order."""
+        with self._lock:
+            files = list(files)
+            file_set = set(files)
+            ordered = []
+            state: Dict[str, int] = {}  # 1: visiting, 2: done
+
+            def visit(file_path: str):
+                if state.get(file_path):
+                    return
+                state[file_path] = 1
+                for dependency in sorted(self._dependencies.get(file_path, ())):
+                    if dependency in file_set:
+                        visit(dependency)
+                state[file_path] = 2
+                ordered.append(file_path)
+
+            for file_path in files:
+                visit(file_path)
+            return ordered
@@ -0,0 +1,164 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+FENCE = '```'
+MAX_OVERLAP_LINES = 200  # Longest repetition looked for when stitching continuations
+MIN_OVERLAP_LINES = 2  # A repetition is trimmed if it has this many non-trivial lines...
+MIN_OVERLAP_CHARS = 40  # ...or this many non-blank characters in non-trivial lines
+TRIVIAL_LINE_PATTERN = re.compile(r'^(?:[\s()\[\]{}<>;,.:]*|</?[\w.-]*>|(?:end|else|fi|done|esac|pass|break|continue|return)\w*;?)$')
+
+
+def _is_substantial_overlap(lines: List[str]) -> bool:
+    """Whether repeated lines are long enough to be a model repeating itself rather than code that
+    legitimately repeats, like consecutive closing brackets or `end` keywords."""
+    meaningful = [line.strip() for line in lines if not TRIVIAL_LINE_PATTERN.match(line.strip())]
+    return len(meaningful) >= MIN_OVERLAP_LINES or sum(len(''.join(line.split())) for line in meaningful) >= MIN_OVERLAP_CHARS
+
+
+class FencedBlock:
+    """A ``` fenced block: its language tag, the line indices of its fences and nested blocks."""
+
+    __slots__ = ('language', 'start', 'end', 'children', 'parent')
+
+    def __init__(self, language: str, start: int, parent: Optional['FencedBlock'] = None):
+        self.language = language
+        self.start = start  # Line index of the opening fence
+        self.end: Optional[int] = None  # Line index of the closing fence, None while unterminated
+        self.children: List['FencedBlock'] = []
+        self.parent = parent
+
+    @property
+    def terminated(self) -> bool:
+        return self.end is not None
+
+    def __repr__(self) -> str:
+        return f"FencedBlock(language={self.language!r}, start={self.start}, end={self.end}, children={len(self.children)})"
+
+
+class FencedDocument:
+    """
+    Fenced-block structure of a text, built in a single pass over its lines.
+
+    Fence lines are lines whose first non-blank characters are ```; they are stored
+    stripped in `lines`. Outside of a block every fence opens one. Inside a block a
+    fence with a language tag opens a nested block and a bare fence closes the
+    innermost open block, which is how models write code blocks inside markdown.
+    """
+
+    def __init__(self, content: str):
+        self.lines = content.split('\n')
+        self.fence_indices: List[int] = []
+        self.blocks: List[FencedBlock] = []  # Top-level blocks in order
+        self.open_blocks: List[FencedBlock] = []  # Stack of unterminated blocks, innermost last
+        self.scan(0)
+
+    def scan(self, start: int):
+        """Tokenize self.lines[start:], continuing from the current block nesting."""
+        lines = self.lines
+        for index in range(start, len(lines)):
+            line = lines[index]
+            if FENCE not in line:
+                continue
+            stripped = line.strip()
+            if not stripped.startswith(FENCE):
+                continue
+            lines[index] = stripped
+            self.fence_indices.append(index)
+            language = stripped.lstrip('`').strip()
+            if self.open_blocks and not language:
+                self.open_blocks.pop().end = index
+            else:
+                parent = self.open_blocks[-1] if self.open_blocks else None
+                block = FencedBlock(language, index, parent)
+                (parent.children if parent else self.blocks).append(block)
+                self.open_blocks.append(block)
+
+    def extend(self, content: str, skip_reopening_fence: bool = False, placeholder: Optional[str] = None,
+               trim_overlap: bool = False):
+        """
+        Append a continuation of the text, tokenizing only the new lines.
+
+        When the text so far is unterminated and `skip_reopening_fence` is set, the
+        lines of `content` up to and including its first fence line, which re-opens
+        the interrupted block, are dropped and replaced by `placeholder` if given.
+        With `trim_overlap`, lines at the start of the continuation repeating the end
+        of the text are dropped, if the repetition is substantial (see _is_substantial_overlap).
+        """
+        new_lines = content.split('\n')
+        if skip_reopening_fence:
+            fences = [i for i, line in enumerate(new_lines) if line.lstrip().startswith(FENCE)]
+            # A single bare fence closes the interrupted block rather than re-opening it
+            if fences and not (len(fences) == 1 and new_lines[fences[0]].strip() == FENCE):
+                new_lines = new_lines[fences[0] + 1:]
+        if trim_overlap:
+            new_lines = self._trim_overlap(new_lines)
+        if skip_reopening_fence and placeholder is not None:
+            new_lines.insert(0, placeholder)
+        start = len(self.lines)
+        self.lines.extend(new_lines)
+        self.scan(start)
+
+    def _trim_overlap(self, new_lines: List[str]) -> List[str]:
+        """`new_lines` without the longest prefix (after blank lines) equal to the end of the text,
+        ignoring trailing whitespace. The text's trailing blank lines are removed when it is found."""
+        end = len(self.lines)
+        while end > 0 and not self.lines[end - 1].strip():
+            end -= 1
+        start = 0
+        while start < len(new_lines) and not new_lines[start].strip():
+            start += 1
+        if end == 0 or start == len(new_lines):
+            return new_lines
+        tail = [line.rstrip() for line in self.lines[max(0, end - MAX_OVERLAP_LINES):end]]
+        head = [line.rstrip() for line in new_lines[start:start + MAX_OVERLAP_LINES]]
+        for size in range(min(len(tail), len(head)), 0, -1):
+            if tail[-size:] == head[:size]:
+                # The longest repetition decides; a short or structural one ('}', 'end'...) is likely real content
+                if not _is_substantial_overlap(head[:size]):
+                    return new_lines
+                del self.lines[end:]
+                return new_lines[start + size:]
+        return new_lines
+
+    def drop_partial_line(self) -> str:
+        """Remove and return the last line, which a cut-off response may have left incomplete.
+        Fence lines are kept, since dropping them would change the block structure."""
+        if not self.lines or (self.fence_indices and self.fence_indices[-1] == len(self.lines) - 1):
+            return ''
+        return self.lines.pop()
+
+    def last_line(self) -> str:
+        """Last non-blank line outside of fence lines."""
+        fences = set(self.fence_indices)
+        for index in range(len(self.lines) - 1, -1, -1):
+            if index not in fences and self.lines[index].strip():
+                return self.lines[index]
+        return ''
+
+    @property
+    def unterminated(self) -> bool:
+        return bool(self.open_blocks)
+
+    @property
+    def text(self) -> str:
+        """The text with fence lines stripped."""
+        return '\n'.join(self.lines)
+
+    def block_content(self, block: FencedBlock) -> str:
+        end = block.end if block.end is not None else len(self.lines)
+        return '\n'.join(self.lines[block.start + 1:end])
+
+    def outer_block(self) -> Tuple[Optional[str], Optional[str]]:
+        """Language and content between the first and the last fence line."""
+        if self.unterminated or len(self.fence_indices) < 2:
+            return None, None
+        first, last = self.fence_indices[0], self.fence_indices[-1]
+        return self.lines[first].lstrip('`').strip(), '\n'.join(self.lines[first + 1:last])
+
+
+@lru_cache(maxsize=16)
+def parse_fenced_blocks(content: str) -> FencedDocument:
+    """Cached FencedDocument of `content`, so helpers applied to the same response share one pass.
+    The returned document must not be modified; build a new FencedDocument to extend it."""
+    return FencedDocument(content)
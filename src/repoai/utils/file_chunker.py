@@ -0,0 +1,235 @@
+import re
+import ast
+import math
+import bisect
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from .symbol_index import LANGUAGES, DEFINITION_PATTERNS
+from .search_index import tokenize
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAX_CHUNK_LINES = 80
+RANKING_CACHE_SIZE = 256
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+\S')
+
+
+_ranking_cache: 'OrderedDict[Tuple[Optional[str], str], Tuple[int, ...]]' = OrderedDict()
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / 4)
+
+
+class Chunk:
+    """Lines `start_line`-`end_line` (1-based, inclusive) of a file forming one syntactic unit."""
+
+    __slots__ = ('start_line', 'end_line', 'kind', 'name', 'text', 'tokens')
+
+    def __init__(self, start_line: int, end_line: int, kind: str, name: str, text: str, tokens: int):
+        self.start_line = start_line
+        self.end_line = end_line
+        self.kind = kind
+        self.name = name
+        self.text = text
+        self.tokens = tokens
+
+    def __repr__(self) -> str:
+        return f"Chunk({self.kind} {self.name!r}, lines {self.start_line}-{self.end_line}, {self.tokens} tokens)"
+
+
+def chunk_file(file_path: str, content: str, count_tokens: Callable[[str], int] = estimate_tokens,
+               max_chunk_lines: int = MAX_CHUNK_LINES) -> List[Chunk]:
+    """
+    Split a file at syntactic boundaries: top-level functions, classes and statements
+    for Python (large classes are split into methods), headings for Markdown, top-level
+    definitions for other known languages and blocks of `max_chunk_lines` otherwise.
+    Comments right above a unit belong to it. Results are cached by content hash.
+    """
+    return list(_chunk_file(file_path, _content_hash(content), content, count_tokens, max_chunk_lines))
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode('utf-8', errors='replace')).hexdigest()
+
+
+@lru_cache(maxsize=256)
+def _chunk_file(file_path: str, content_hash: str, content: str, count_tokens: Callable[[str], int],
+                max_chunk_lines: int) -> Tuple[Chunk, ...]:
+    lines = content.split('\n')
+    suffix = Path(file_path).suffix.lower()
+    boundaries = None
+    if suffix in ('.md', '.markdown'):
+        boundaries = _markdown_boundaries(lines)
+    elif LANGUAGES.get(suffix) == 'python':
+        try:
+            boundaries = _python_boundaries(content, max_chunk_lines)
+        except (SyntaxError, ValueError):
+            logger.debug(f"Could not parse {file_path} with ast, chunking it by definitions")
+    if boundaries is None and suffix in LANGUAGES:
+        boundaries = _definition_boundaries(LANGUAGES[suffix], content, lines)
+    if not boundaries:
+        boundaries = [(start, 'block', '') for start in range(1, len(lines) + 1, max_chunk_lines)]
+
+    chunks = []
+    boundaries = sorted({start: (start, kind, name) for start, kind, name in boundaries if 1 <= start <= len(lines)}.values())
+    if not boundaries or boundaries[0][0] != 1:
+        boundaries.insert(0, (1, 'header', ''))
+    for index, (start, kind, name) in enumerate(boundaries):
+        end = boundaries[index + 1][0] - 1 if index + 1 < len(boundaries) else len(lines)
+        # Units over twice the maximum size are split in blocks that keep the unit's kind and name
+        step = max_chunk_lines if end - start + 1 > 2 * max_chunk_lines else end - start + 1
+        for block_start in range(start, end + 1, step):
+            block_end = min(end, block_start + step - 1)
+            text = '\n'.join(lines[block_start - 1:block_end])
+            chunks.append(Chunk(block_start, block_end, kind, name, text, count_tokens(text)))
+    return tuple(chunks)
+
+
+def _with_leading_comments(lines: List[str], start: int) -> int:
+    """Move a unit's first line up over the comments, doc comments and annotations right above it."""
+    while start > 1 and lines[start - 2].strip().startswith(('//', '/*', '*', '#', '@')):
+        start -= 1
+    return start
+
+
+def _python_boundaries(content: str, max_chunk_lines: int) -> List[Tuple[int, str, str]]:
+    tree = ast.parse(content)
+    lines = content.split('\n')
+    boundaries = []
+    previous_kind = None
+    for node in tree.body:
+        start = _with_leading_comments(lines, min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])]))
+        end = getattr(node, 'end_lineno', node.lineno)
+        if isinstance(node, ast.ClassDef):
+            boundaries.append((start, 'class', node.name))
+            if end - start + 1 > max_chunk_lines:
+                for child in node.body:
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        child_start = _with_leading_comments(lines, min([child.lineno] + [d.lineno for d in child.decorator_list]))
+                        boundaries.append((child_start, 'method', f"{node.name}.{child.name}"))
+            previous_kind = 'class'
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            boundaries.append((start, 'function', node.name))
+            previous_kind = 'function'
+        elif previous_kind != 'statements':
+            # Consecutive top-level statements (imports, constants, main block) form one chunk
+            boundaries.append((start, 'statements', ''))
+            previous_kind = 'statements'
+    return boundaries
+
+
+def _markdown_boundaries(lines: List[str]) -> List[Tuple[int, str, str]]:
+    boundaries = []
+    in_fence = False
+    for number, line in enumerate(lines, 1):
+        if line.lstrip().startswith('```'):
+            in_fence = not in_fence
+        elif not in_fence and HEADING_PATTERN.match(line):
+            boundaries.append((number, 'section', line.lstrip('#').strip()))
+    return boundaries
+
+
+def _definition_boundaries(language: str, content: str, lines: List[str]) -> List[Tuple[int, str, str]]:
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+    boundaries = []
+    for kind, pattern in DEFINITION_PATTERNS.get(language, []):
+        for match in pattern.finditer(content):
+            line_number = bisect.bisect_right(offsets, match.start(1))
+            line = lines[line_number - 1]
+            # Only top-level definitions split a file; members stay in their type's chunk
+            if line[:1].isspace():
+                continue
+            boundaries.append((_with_leading_comments(lines, line_number), kind, match.group(1)))
+    return boundaries
+
+
+def rank_chunks(chunks: List[Chunk], query: str, content_hash: Optional[str] = None) -> List[int]:
+    """
+    Indices of `chunks` from most to least relevant to `query` (BM25 over the chunk terms).
+    Rankings are cached by `content_hash` and query when the hash of the chunked content is given.
+    """
+    key = (content_hash, query)
+    if content_hash is not None and key in _ranking_cache:
+        _ranking_cache.move_to_end(key)
+        return list(_ranking_cache[key])
+    ranking = _rank_chunks(chunks, query)
+    if content_hash is not None:
+        _ranking_cache[key] = ranking
+        if len(_ranking_cache) > RANKING_CACHE_SIZE:
+            _ranking_cache.popitem(last=False)
+    return list(ranking)
+
+
+def _rank_chunks(chunks: List[Chunk], query: str) -> Tuple[int, ...]:
+    query_terms = set(tokenize(query))
+    if not chunks or not query_terms:
+        return tuple(range(len(chunks)))
+    chunk_terms = [tokenize(chunk.name + '\n' + chunk.text) for chunk in chunks]
+    average_length = max(sum(len(terms) for terms in chunk_terms) / len(chunks), 1)
+    document_frequency = {term: sum(1 for terms in chunk_terms if term in terms) for term in query_terms}
+    k1, b = 1.2, 0.75
+    scores = []
+    for terms in chunk_terms:
+        score = 0.0
+        for term in query_terms:
+            frequency = terms.count(term)
+            if frequency:
+                idf = math.log(1 + (len(chunks) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * len(terms) / average_length))
+        scores.append(score)
+    # Equal scores keep the file order, so a query without matches selects the start of the file
+    return tuple(sorted(range(len(chunks)), key=lambda index: (-scores[index], index)))
+
+
+def select_chunks(chunks: List[Chunk], query: str, token_budget: int, content_hash: Optional[str] = None) -> List[Chunk]:
+    """The most relevant chunks fitting in `token_budget`, in file order. A selected method
+    brings the header chunk of its class along, so the excerpt shows where it belongs."""
+    class_chunks = {chunk.name: index for index, chunk in enumerate(chunks) if chunk.kind == 'class'}
+    selected = set()
+    for index in rank_chunks(chunks, query, content_hash):
+        required = [index]
+        if chunks[index].kind == 'method':
+            class_index = class_chunks.get(chunks[index].name.split('.')[0])
+            if class_index is not None and class_index not in selected:
+                required.insert(0, class_index)
+        tokens = sum(chunks[i].tokens for i in required if i not in selected)
+        if tokens <= token_budget:
+            selected.update(required)
+            token_budget -= tokens
+    return [chunks[index] for index in sorted(selected)]
+
+
+def render_chunks(selected: List[Chunk], total_lines: int, include_line_numbers: bool = False) -> str:
+    """Text of the selected chunks with `... lines N-M omitted ...` markers for the gaps."""
+    parts = []
+    next_line = 1
+    for chunk in selected:
+        if chunk.start_line > next_line:
+            parts.append(f"... lines {next_line}-{chunk.start_line - 1} omitted ...")
+        if include_line_numbers:
+            parts.extend(f"{number:4d} | {line}" for number, line in enumerate(chunk.text.split('\n'), chunk.start_line))
+        else:
+            parts.append(chunk.text)
+        next_line = chunk.end_line + 1
+    if next_line <= total_lines:
+        parts.append(f"... lines {next_line}-{total_lines} omitted ...")
+    return '\n'.join(parts)
+
+
+def excerpt_file(file_path: str, content: str, query: str, token_budget: int,
+                 count_tokens: Callable[[str], int] = estimate_tokens, include_line_numbers: bool = False) -> Optional[str]:
+    """Excerpt of the chunks of a file most relevant to `query` within `token_budget`,
+    or None if the whole file fits in the budget."""
+    content_hash = _content_hash(content)
+    chunks = list(_chunk_file(file_path, content_hash, content, count_tokens, MAX_CHUNK_LINES))
+    if sum(chunk.tokens for chunk in chunks) <= token_budget:
+        return None
+    selected = select_chunks(chunks, query, token_budget, content_hash)
+    return render_chunks(selected, content.count('\n') + 1, include_line_numbers)
@@ -0,0 +1,178 @@
+import re
+import hashlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+from .modification_parser import ModificationStreamParser, OPERATION_PATTERN
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PINNED_MESSAGES = 2  # The system prompt and the first user message with the project report
+IMAGE_TOKENS = 1000  # Rough estimate of an image's cost, not counted by the text tokenizer
+SUMMARY_CACHE_SIZE = 512
+MAX_REQUEST_LENGTH = 1000
+MAX_REPLY_LENGTH = 800
+MAX_DESCRIPTION_LENGTH = 120
+FILE_LINE_PATTERN = re.compile(r'^File: (.+?)(?: \((?:modified|created)\))?$', re.MULTILINE)
+
+
+class HistoryManager:
+    """
+    Keeps an edit conversation within a token budget with a sliding window.
+
+    The system prompt and the first user message (project report and first request) are
+    pinned and the last `keep_turns` turns are kept verbatim. When the conversation exceeds
+    the budget, every older message is replaced, in place, by a summary built locally from
+    its content: the request and the files provided for a user message, the start of the
+    reply and the modifications proposed, and whether they were applied, for an assistant
+    message. Messages keep their roles and positions, so compacted turns form a stable
+    prefix for prompt caching. Summaries and token counts are cached by message content.
+    """
+
+    def __init__(self, count_tokens: Callable[[str], int], keep_turns: int = 4):
+        self.count_tokens = count_tokens
+        self.keep_turns = keep_turns
+        self._summaries: 'OrderedDict[str, str]' = OrderedDict()
+        self._token_counts: 'OrderedDict[str, int]' = OrderedDict()
+
+    def message_tokens(self, message: Dict[str, Any]) -> int:
+        text = message_text(message)
+        key = _hash(text)
+        if key not in self._token_counts:
+            self._token_counts[key] = self.count_tokens(text)
+            if len(self._token_counts) > SUMMARY_CACHE_SIZE:
+                self._token_counts.popitem(last=False)
+        else:
+            self._token_counts.move_to_end(key)
+        return self._token_counts[key] + IMAGE_TOKENS * _image_count(message)
+
+    def total_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        return sum(self.message_tokens(message) for message in messages)
+
+    def compact_if_needed(self, context: Dict[str, Any], max_tokens: int) -> int:
+        """Compact `context['messages']` if they exceed `max_tokens`. Returns the number of messages summarized."""
+        messages = context.get('messages', [])
+        if not max_tokens or self.total_tokens(messages) <= max_tokens:
+            return 0
+        compacted = self.compact(context)
+        total_tokens = self.total_tokens(messages)
+        if total_tokens > max_tokens:
+            logger.warning(f"Conversation still uses {total_tokens} tokens after compaction (budget: {max_tokens}); "
+                           f"consider resetting the chat or keeping fewer turns")
+        return compacted
+
+    def compact(self, context: Dict[str, Any]) -> int:
+        """
+        Summarize the messages between the pinned ones and the last `keep_turns` turns (a turn
+        is a reply and the following request). `context['compacted_messages']` is the index up to
+        which messages are already summaries, `context['applied_messages']` the indices of the
+        replies whose modifications were applied. References to file contents sent in summarized
+        messages are dropped from `context['sent_files']`, so those files are sent again.
+        """
+        messages = context.get('messages', [])
+        start = max(context.get('compacted_messages', PINNED_MESSAGES), PINNED_MESSAGES)
+        # Keep the last `keep_turns` turns, and the request being sent if it is already appended
+        end = len(messages) - 2 * self.keep_turns - (1 if messages and messages[-1]['role'] == 'user' else 0)
+        if end <= start:
+            return 0
+        applied = set(context.get('applied_messages', []))
+        for index in range(start, end):
+            message = messages[index]
+            if message['role'] == 'assistant':
+                summary = self._summary(message_text(message), index in applied, summarize_reply)
+            elif message['role'] == 'user':
+                summary = self._summary(message_text(message), None, summarize_request)
+            else:
+                continue
+            messages[index] = {"role": message['role'], "content": summary}
+        sent_files = context.get('sent_files', {})
+        for label in [label for label, sent in sent_files.items()
+                      if start <= sent['message'] < end and not sent.get('in_report')]:
+            del sent_files[label]
+        context['compacted_messages'] = end
+        logger.info(f"Conversation compacted: messages {start}-{end - 1} replaced by summaries")
+        return end - start
+
+    def _summary(self, text: str, applied: Optional[bool], summarize: Callable[..., str]) -> str:
+        key = _hash(f"{summarize.__name__}:{applied}:{text}")
+        if key in self._summaries:
+            self._summaries.move_to_end(key)
+            return self._summaries[key]
+        summary = summarize(text, applied) if applied is not None else summarize(text)
+        self._summaries[key] = summary
+        if len(self._summaries) > SUMMARY_CACHE_SIZE:
+            self._summaries.popitem(last=False)
+        return summary
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get('content', '')
+    if isinstance(content, list):
+        return '\n'.join(part.get('text', '') for part in content if part.get('type') == 'text')
+    return content or ''
+
+
+def summarize_request(text: str) -> str:
+    """The request of a user message and the names of the files provided with it."""
+    update, request = '', text
+    if text.startswith('Project update:') and 'Request:\n\n' in text:
+        update, request = text.split('Request:\n\n', 1)
+    request, _, file_contexts = request.partition('Additional information for context:')
+    summary = "[Earlier request, summarized]\n" + _shorten(request.strip(), MAX_REQUEST_LENGTH)
+    if update:
+        summary += "\nProject update with: " + ', '.join(FILE_LINE_PATTERN.findall(update) or ['deletions/renames only'])
+    files = FILE_LINE_PATTERN.findall(file_contexts)
+    if files:
+        summary += "\nFiles provided: " + ', '.join(files)
+    return summary
+
+
+def summarize_reply(text: str, applied: bool) -> str:
+    """The explanation at the start of a reply and the modifications it proposed."""
+    parser = ModificationStreamParser(lambda modification, content: modification.__setitem__('raw', content))
+    try:
+        parser.parse(text)
+    except Exception as e:
+        logger.debug(f"Could not parse all the modifications of a reply to summarize: {str(e)}")
+    modifications = parser.modifications
+    explanation = []
+    for line in text.split('\n'):
+        if OPERATION_PATTERN.match(line.strip()):
+            break
+        explanation.append(line)
+    summary = "[Earlier reply, summarized]"
+    explanation_text = '\n'.join(explanation).strip()
+    if explanation_text:
+        summary += "\n" + _shorten(explanation_text, MAX_REPLY_LENGTH)
+    if modifications:
+        summary += f"\nModifications proposed ({'applied' if applied else 'not applied'}):"
+        for modification in modifications:
+            if modification['operation'] == 'move':
+                summary += f"\n- move {modification['file_path']} -> {modification['new_path']}"
+                continue
+            summary += f"\n- {modification['operation']} {modification['file_path']}"
+            description = _first_line(modification.get('raw', ''))
+            if modification['operation'] == 'edit' and description:
+                summary += f": {_shorten(description, MAX_DESCRIPTION_LENGTH)}"
+    return summary
+
+
+def _first_line(text: str) -> str:
+    for line in text.split('\n'):
+        line = line.strip()
+        if line and not line.startswith('```'):
+            return line
+    return ''
+
+
+def _shorten(text: str, length: int) -> str:
+    return text if len(text) <= length else text[:length - 3].rstrip() + '...'
+
+
+def _image_count(message: Dict[str, Any]) -> int:
+    content = message.get('content')
+    return sum(1 for part in content if part.get('type') == 'image_url') if isinstance(content, list) else 0
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest()
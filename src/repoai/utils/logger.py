@@ -18,6 +18,7 @@ def setup_logger(config):
 
         # File handler
         log_file = config.get('log_file')
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
         file_handler = RotatingFileHandler(
             log_file,
             maxBytes=config.get('max_log_file_size'),
@@ -1,19 +1,36 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .treenode import FileSystemTree
+from .code_outline import generate_outline
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+REPORT_MODES = ['full', 'outline', 'hybrid']
+OUTLINE_FULL_CONTENT_MAX_LINES = 30  # Files without an outline format are shown in full up to this size
+
+
 class MarkdownGenerator:
     @staticmethod
-    def generate_project_compilation(project_description: str, repo_content: Dict[str, Any], include_line_numbers: bool = False) -> str:
+    def generate_project_compilation(project_description: str, repo_content: Dict[str, Any], include_line_numbers: bool = False,
+                                     mode: str = 'full', full_content_files: Optional[List[str]] = None) -> str:
+        """
+        Args:
+            mode: 'full' renders every file's content, 'outline' the signatures of each source
+                file, and 'hybrid' the outline except for `full_content_files`, shown in full.
+        """
+        if mode not in REPORT_MODES:
+            raise ValueError(f"Invalid report mode: {mode}. Expected one of {REPORT_MODES}")
         markdown = "# Project Compilation\n\n"
         markdown += f"{project_description}\n\n"
         markdown += "## Project Structure\n\n"
         markdown += MarkdownGenerator._generate_tree_structure(repo_content)
         markdown += "\n## Repository Contents\n\n"
-        markdown += MarkdownGenerator._generate_file_contents(repo_content, include_line_numbers)
+        if mode == 'full':
+            markdown += MarkdownGenerator._generate_file_contents(repo_content, include_line_numbers)
+        else:
+            full_content_files = set(full_content_files or []) if mode == 'hybrid' else set()
+            markdown += MarkdownGenerator._generate_file_outlines(repo_content, include_line_numbers, full_content_files)
         return markdown
 
     @staticmethod
@@ -27,14 +44,48 @@ class MarkdownGenerator:
     @staticmethod
     def _generate_file_contents(repo_content: Dict[str, Any], include_line_numbers: bool) -> str:
         markdown = ""
+        excerpts = repo_content.get('excerpts', {})
         for file_path, content in repo_content.get('content', {}).items():
-            markdown += f"### {file_path}\n\n"
-            markdown += "```\n"
+            if file_path in excerpts:
+                markdown += f"### {file_path} (excerpt)\n\n"
+                markdown += f"```\n{excerpts[file_path]}\n```\n\n"
+                continue
             if include_line_numbers:
+                markdown += f"### {file_path}\n\n"
+                markdown += "```\n"
                 lines = content.split('\n')
                 for i, line in enumerate(lines, 1):
                     markdown += f"{i:4d} | {line}\n"
+                markdown += "```\n\n"
             else:
-                markdown += f"{content}\n"
+                markdown += MarkdownGenerator._file_section(file_path, content) + "\n"
+        return markdown
+
+    @staticmethod
+    def _file_section(file_path: str, content: str) -> str:
+        return f"### {file_path}\n\n```\n{content}\n```\n"
+
+    @staticmethod
+    def contains_file(compilation: str, file_path: str, content: str) -> bool:
+        """Whether a compilation shows `content` in full (without line numbers) as the content of `file_path`."""
+        return MarkdownGenerator._file_section(file_path, content) in compilation
+
+    @staticmethod
+    def _generate_file_outlines(repo_content: Dict[str, Any], include_line_numbers: bool, full_content_files: set) -> str:
+        markdown = ""
+        for file_path, content in repo_content.get('content', {}).items():
+            line_count = content.count('\n') + 1
+            outline = None if file_path in full_content_files else generate_outline(file_path, content)
+            if outline is None and (file_path in full_content_files or line_count <= OUTLINE_FULL_CONTENT_MAX_LINES):
+                markdown += MarkdownGenerator._generate_file_contents({'content': {file_path: content}, 'excerpts': repo_content.get('excerpts', {})},
+                                                                      include_line_numbers)
+                continue
+            markdown += f"### {file_path} (outline, {line_count} lines)\n\n"
+            if not outline:
+                markdown += "Content omitted.\n\n"
+                continue
+            markdown += "```\n"
+            for line_number, text in outline:
+                markdown += f"{line_number:4d} | {text}\n" if include_line_numbers else f"{text}\n"
             markdown += "```\n\n"
         return markdown
\ No newline at end of file
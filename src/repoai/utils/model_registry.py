@@ -0,0 +1,172 @@
+import os
+import json
+import threading
+import urllib.request
+from pathlib import Path
+from datetime import date
+from typing import Dict, Any, Optional, Set, Tuple
+import appdirs
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BUNDLED_METADATA_FILE = Path(__file__).parent.parent / 'defaults' / 'model_metadata.json'
+METADATA_FILE_NAME = 'model_metadata.json'
+METADATA_SOURCE_URL = "https://raw.githubusercontent.com/BerriAI/litellm/main/model_prices_and_context_window.json"
+METADATA_FIELDS = ('max_input_tokens', 'max_output_tokens', 'input_cost_per_token', 'output_cost_per_token',
+                   'litellm_provider', 'supports_vision')
+
+
+class ModelRegistry:
+    """
+    Offline model capabilities: context window, max output, vision support, pricing and provider.
+
+    Data comes from the snapshot bundled in `defaults/model_metadata.json`, or from the
+    user data directory once it has been refreshed with `repoai models --refresh`.
+    Lookups are memoized per model name. LiteLLM is only consulted for models missing
+    from the snapshot.
+    """
+    _instance: Optional['ModelRegistry'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, user_dir: Optional[Path] = None):
+        self.user_dir = Path(user_dir) if user_dir else Path(appdirs.user_data_dir("repoai"))
+        self._lock = threading.Lock()
+        self._models: Optional[Dict[str, Dict[str, Any]]] = None
+        self._snapshot: Dict[str, Any] = {}
+        self._providers: Optional[Set[str]] = None
+        self._resolved: Dict[str, Tuple[Optional[str], Optional[Dict[str, Any]]]] = {}  # model -> (key, entry)
+        self._provider_cache: Dict[str, str] = {}
+
+    @classmethod
+    def get_instance(cls) -> 'ModelRegistry':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def user_metadata_path(self) -> Path:
+        return self.user_dir / METADATA_FILE_NAME
+
+    @property
+    def metadata_path(self) -> Path:
+        return self.user_metadata_path if self.user_metadata_path.exists() else BUNDLED_METADATA_FILE
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._models is None:
+            with self._lock:
+                if self._models is None:
+                    with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    self._snapshot = data.pop('_snapshot', {})
+                    self._models = data
+                    logger.debug(f"Loaded metadata of {len(data)} models from {self.metadata_path}")
+        return self._models
+
+    def get_snapshot_info(self) -> Dict[str, Any]:
+        self._load()
+        return dict(self._snapshot, path=str(self.metadata_path), models=len(self._models))
+
+    def get_model_info(self, model: str) -> Optional[Dict[str, Any]]:
+        """Metadata entry of the model, or None if the snapshot does not know it."""
+        return self._resolve(model)[1]
+
+    def _resolve(self, model: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        resolved = self._resolved.get(model)
+        if resolved is None:
+            models = self._load()
+            resolved = (None, None)
+            if model in models:
+                resolved = (model, models[model])
+            elif '/' in model:
+                # 'anthropic/claude-...' is the snapshot's 'claude-...', but 'vertex_ai/claude-...'
+                # is another provider's deployment, with its own limits and prices
+                prefix, name = model.split('/', 1)
+                if name in models and models[name].get('litellm_provider') == prefix:
+                    resolved = (name, models[name])
+            self._resolved[model] = resolved
+        return resolved
+
+    def get_provider(self, model: str) -> str:
+        """Provider routing the model. A prefix ('azure/', 'vertex_ai/'...) takes precedence over the model's vendor."""
+        provider = self._provider_cache.get(model)
+        if provider is None:
+            provider = self._get_provider(model)
+            self._provider_cache[model] = provider
+        return provider
+
+    def _get_provider(self, model: str) -> str:
+        prefix = model.split('/', 1)[0] if '/' in model else None
+        if prefix is None:
+            entry = self.get_model_info(model)
+            if entry and entry.get('litellm_provider'):
+                return entry['litellm_provider']
+        elif prefix in self.known_providers():
+            return prefix
+        from litellm.utils import get_llm_provider
+        _, provider, _, _ = get_llm_provider(model=model)
+        return provider
+
+    def known_providers(self) -> Set[str]:
+        if self._providers is None:
+            self._providers = {entry.get('litellm_provider') for entry in self._load().values()}
+        return self._providers
+
+    def supports_vision(self, model: str) -> bool:
+        entry = self.get_model_info(model)
+        if entry is not None:
+            return bool(entry.get('supports_vision'))
+        try:
+            from litellm import supports_vision
+            return supports_vision(model)
+        except Exception as e:
+            logger.debug(f"Could not determine vision support for {model}: {str(e)}")
+            return False
+
+    def max_output_tokens(self, model: str) -> Optional[int]:
+        entry = self.get_model_info(model)
+        return entry.get('max_output_tokens') if entry else None
+
+    def max_input_tokens(self, model: str) -> Optional[int]:
+        entry = self.get_model_info(model)
+        return entry.get('max_input_tokens') if entry else None
+
+    def cost_per_token(self, model: str, input_tokens: int, output_tokens: int) -> Tuple[float, float]:
+        entry = self.get_model_info(model)
+        if entry is not None and entry.get('input_cost_per_token') is not None:
+            return (input_tokens * entry['input_cost_per_token'],
+                    output_tokens * (entry.get('output_cost_per_token') or 0.0))
+        from litellm import cost_per_token
+        return cost_per_token(model, input_tokens, output_tokens)
+
+    def refresh(self, url: str = METADATA_SOURCE_URL, timeout: float = 30) -> Dict[str, Any]:
+        """Download the upstream model map and store its chat models in the user data directory."""
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            upstream = json.loads(response.read().decode('utf-8'))
+
+        data = {'_snapshot': {'source': url, 'generated': date.today().isoformat()}}
+        for name, entry in sorted(upstream.items()):
+            if not isinstance(entry, dict) or entry.get('mode') != 'chat':
+                continue
+            data[name] = {field: entry.get(field) for field in METADATA_FIELDS}
+            data[name]['supports_vision'] = bool(entry.get('supports_vision'))
+
+        path = self.user_metadata_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('{\n' + ',\n'.join(f"  {json.dumps(k)}: {json.dumps(v)}" for k, v in data.items()) + '\n}\n')
+        os.replace(tmp_path, path)
+        self.invalidate()
+        logger.debug(f"Model metadata refreshed from {url}: {len(data) - 1} models")
+        return self.get_snapshot_info()
+
+    def invalidate(self):
+        with self._lock:
+            self._models = None
+            self._snapshot = {}
+            self._providers = None
+            self._resolved.clear()
+            self._provider_cache.clear()
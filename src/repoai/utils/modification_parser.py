@@ -0,0 +1,114 @@
+import re
+from typing import Any, Callable, Dict, List, Optional
+from .fenced_blocks import FENCE
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OPERATION_PATTERN = re.compile(r'^<::(CREATE|EDIT|DELETE|MOVE)::>\s+(.+)$')
+
+
+class ModificationStreamParser:
+    """
+    Incremental parser for the `<::CREATE|EDIT|DELETE|MOVE::>` modification protocol.
+
+    Text can be fed in arbitrary chunks, e.g. tokens of a streamed response. DELETE and
+    MOVE operations are complete as soon as their header line ends; CREATE and EDIT
+    blocks are complete when the outermost fence of their code block closes (nested
+    fences are tracked as in FencedDocument), or failing that when the next operation
+    header starts or the stream is closed. Text after a closed block, up to the next
+    header, is not part of the modification. `feed` and `close` return the modifications
+    completed by that call, in order.
+    """
+
+    def __init__(self, finalize: Callable[[Dict[str, Any], str], None]):
+        """
+        Args:
+            finalize: Called with a modification and the raw text of its block to fill
+                in `content`/`language` (see ProjectModificationTask._finalize_modification).
+        """
+        self.finalize = finalize
+        self.modifications: List[Dict[str, Any]] = []
+        self._buffer = ''
+        self._current: Optional[Dict[str, Any]] = None
+        self._content_lines: List[str] = []
+        self._open_fences = 0  # Fence nesting depth in the current block
+        self._closed = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        if self._closed:
+            raise ValueError("Cannot feed a closed parser")
+        completed = []
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split('\n')
+        for line in lines:
+            completed.extend(self._process_line(line))
+        return completed
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Flush the last line and block. Returns the modifications completed by closing."""
+        if self._closed:
+            return []
+        completed = self._process_line(self._buffer)
+        self._buffer = ''
+        if self._current is not None:
+            completed.append(self._complete(self._current))
+        self._current = None
+        self._closed = True
+        return completed
+
+    def parse(self, content: str) -> List[Dict[str, Any]]:
+        """Parse a complete response in one call."""
+        self.feed(content)
+        self.close()
+        return self.modifications
+
+    def _process_line(self, line: str) -> List[Dict[str, Any]]:
+        match = OPERATION_PATTERN.match(line.strip())
+        if not match:
+            if self._current is None:
+                return []
+            self._content_lines.append(line)
+            if self._closes_block(line):
+                modification, self._current = self._current, None
+                return [self._complete(modification)]
+            return []
+
+        completed = []
+        if self._current is not None:
+            completed.append(self._complete(self._current))
+        self._content_lines = []
+        self._open_fences = 0
+
+        operation, file_path = match.groups()
+        modification = {'operation': operation.lower(), 'file_path': file_path}
+        if operation == 'MOVE':
+            move_parts = file_path.split(' TO ')
+            if len(move_parts) != 2:
+                raise Exception(f"Invalid MOVE operation format: {line}")
+            modification['file_path'], modification['new_path'] = move_parts
+        self.modifications.append(modification)
+
+        if operation in ['DELETE', 'MOVE']:
+            self._current = None
+            completed.append(self._complete(modification, content=''))
+        else:
+            self._current = modification
+        return completed
+
+    def _closes_block(self, line: str) -> bool:
+        """Track the fences of the current block; True when `line` closes its outermost fence."""
+        stripped = line.strip()
+        if not stripped.startswith(FENCE):
+            return False
+        if self._open_fences and not stripped.lstrip('`').strip():
+            self._open_fences -= 1
+            return self._open_fences == 0
+        self._open_fences += 1
+        return False
+
+    def _complete(self, modification: Dict[str, Any], content: Optional[str] = None) -> Dict[str, Any]:
+        self.finalize(modification, '\n'.join(self._content_lines) if content is None else content)
+        self._content_lines = []
+        logger.debug(f"Modification parsed: {modification['operation']} {modification['file_path']}")
+        return modification
@@ -0,0 +1,235 @@
+import os
+import re
+import json
+import math
+import hashlib
+import heapq
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+from ..utils.common_utils import is_text_content
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from ..core.file_manager import FileManager
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 1
+WORD_PATTERN = re.compile(r'[A-Za-z0-9_]+')
+SUBWORD_PATTERN = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+')
+MAX_INDEXED_FILE_SIZE = 1024 * 1024
+COMMON_TERM_RATIO = 0.1  # Terms in more than this share of the chunks do not add new candidates
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased terms of a text. Identifiers also yield their camelCase and snake_case parts,
+    so `get_file_contexts` and `FileContext` both match a query for "file context"."""
+    terms = []
+    for word in WORD_PATTERN.findall(text):
+        if len(word) < 2 or word.isdigit():
+            continue
+        lowered = word.lower()
+        terms.append(lowered)
+        parts = SUBWORD_PATTERN.findall(word)
+        if len(parts) > 1:
+            terms.extend(part.lower() for part in parts if len(part) > 1 and not part.isdigit())
+    return terms
+
+
+class SearchIndex:
+    """
+    BM25 index over chunks of the project files, kept in `.repoai/search_index.json`.
+
+    Files are split into chunks of `chunk_lines` lines. The inverted index maps every
+    term to the chunks containing it and its frequency there, so a query only visits the
+    postings of its own terms. Updates re-read files whose size or modification time
+    changed and re-tokenize them only if their content hash changed.
+    """
+    INDEX_FILE = 'search_index.json'
+
+    def __init__(self, file_manager: 'FileManager', repoai_dir: str = '.repoai', chunk_lines: int = 50,
+                 k1: float = 1.2, b: float = 0.75):
+        self.file_manager = file_manager
+        self.project_path = Path(file_manager.project_path)
+        self.index_path = self.project_path / repoai_dir / self.INDEX_FILE
+        self.chunk_lines = chunk_lines
+        self.k1 = k1
+        self.b = b
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {chunk id: term frequency}
+        self._chunks: Dict[int, Tuple[str, int, int]] = {}  # chunk id -> (file path, start line, end line)
+        self._lengths: Dict[int, int] = {}  # chunk id -> number of terms
+        self._file_chunks: Dict[str, List[int]] = {}
+        self._next_chunk_id = 0
+        self._total_length = 0
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def exists(self) -> bool:
+        return self._loaded or self.index_path.exists()
+
+    def update(self, files: Optional[List[str]] = None) -> Dict[str, int]:
+        """Bring the index up to date with the project files (or only with `files`)."""
+        with self._lock:
+            self._load()
+            full_scan = files is None
+            if full_scan:
+                repoai_dir = self.index_path.parent.name + '/'
+                files = [f for f in self.file_manager.list_files_not_ignored() if not f.startswith(repoai_dir)]
+            stats = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+            for file_path in files:
+                result = self._update_file(file_path)
+                stats[result] += 1
+            if full_scan:
+                for file_path in set(self.files) - set(files):
+                    self._remove_file(file_path)
+                    stats['removed'] += 1
+            if stats['indexed'] or stats['removed']:
+                self._save()
+            logger.debug(f"Search index updated: {stats}")
+            return stats
+
+    def _update_file(self, file_path: str) -> str:
+        full_path = self.project_path / file_path
+        try:
+            stat = full_path.stat()
+        except OSError:
+            return 'removed' if self._remove_file(file_path) else 'unchanged'
+        signature = [stat.st_mtime_ns, stat.st_size]
+        entry = self.files.get(file_path)
+        if entry and entry['signature'] == signature:
+            return 'unchanged'
+        if stat.st_size > MAX_INDEXED_FILE_SIZE:
+            return 'removed' if self._remove_file(file_path) else 'unchanged'
+        data = full_path.read_bytes()
+        if not is_text_content(data[:1024]):
+            return 'removed' if self._remove_file(file_path) else 'unchanged'
+        file_hash = hashlib.sha1(data).hexdigest()
+        if entry and entry['hash'] == file_hash:
+            entry['signature'] = signature
+            return 'indexed'
+        content = data.decode('utf-8', errors='replace')
+        self._remove_file(file_path)
+        entry = {'hash': file_hash, 'signature': signature, 'chunks': self._chunk_terms(content)}
+        self.files[file_path] = entry
+        self._add_chunks(file_path, entry['chunks'])
+        return 'indexed'
+
+    def _chunk_terms(self, content: str) -> List[List[Any]]:
+        """[start line, end line, {term: frequency}] of every chunk, with 1-based inclusive lines."""
+        lines = content.split('\n')
+        chunks = []
+        for start in range(0, len(lines), self.chunk_lines):
+            chunk = lines[start:start + self.chunk_lines]
+            frequencies: Dict[str, int] = {}
+            for term in tokenize('\n'.join(chunk)):
+                frequencies[term] = frequencies.get(term, 0) + 1
+            if frequencies:
+                chunks.append([start + 1, start + len(chunk), frequencies])
+        return chunks
+
+    def _add_chunks(self, file_path: str, chunks: List[List[Any]]):
+        chunk_ids = []
+        for start, end, frequencies in chunks:
+            chunk_id = self._next_chunk_id
+            self._next_chunk_id += 1
+            length = sum(frequencies.values())
+            self._chunks[chunk_id] = (file_path, start, end)
+            self._lengths[chunk_id] = length
+            self._total_length += length
+            for term, frequency in frequencies.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    self._postings[term] = postings = {}
+                postings[chunk_id] = frequency
+            chunk_ids.append(chunk_id)
+        self._file_chunks[file_path] = chunk_ids
+
+    def _remove_file(self, file_path: str) -> bool:
+        entry = self.files.pop(file_path, None)
+        if entry is None:
+            return False
+        for chunk_id, (_, _, frequencies) in zip(self._file_chunks.pop(file_path, []), entry['chunks']):
+            del self._chunks[chunk_id]
+            self._total_length -= self._lengths.pop(chunk_id)
+            for term in frequencies:
+                postings = self._postings[term]
+                del postings[chunk_id]
+                if not postings:
+                    del self._postings[term]
+        return True
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Best matching chunks as dicts with file_path, start_line, end_line and score."""
+        with self._lock:
+            self._load()
+            if not self._chunks:
+                return []
+            chunk_count = len(self._chunks)
+            average_length = self._total_length / chunk_count
+            # BM25 length normalization k1 * (1 - b + b * length / average length), split into its two terms
+            base_norm = self.k1 * (1 - self.b)
+            length_norm = self.k1 * self.b / average_length
+            lengths = self._lengths
+            scores: Dict[int, float] = {}
+            get_score = scores.get
+            term_postings = sorted((self._postings[term] for term in set(tokenize(query)) if term in self._postings), key=len)
+            for postings in term_postings:
+                idf = math.log(1 + (chunk_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                weight = idf * (self.k1 + 1)
+                if scores and len(postings) > chunk_count * COMMON_TERM_RATIO:
+                    # Common terms only re-rank the chunks matched by the rarer terms of the query
+                    for chunk_id in scores:
+                        frequency = postings.get(chunk_id)
+                        if frequency:
+                            scores[chunk_id] += weight * frequency / (frequency + base_norm + length_norm * lengths[chunk_id])
+                    continue
+                for chunk_id, frequency in postings.items():
+                    scores[chunk_id] = get_score(chunk_id, 0.0) + weight * frequency / (frequency + base_norm + length_norm * lengths[chunk_id])
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [{'file_path': self._chunks[chunk_id][0], 'start_line': self._chunks[chunk_id][1],
+                     'end_line': self._chunks[chunk_id][2], 'score': score} for chunk_id, score in best]
+
+    def search_files(self, query: str, limit: int = 5, exclude: Optional[List[str]] = None) -> List[str]:
+        """Files ranked by the score of their best matching chunk."""
+        exclude = set(exclude or [])
+        files = []
+        for result in self.search(query, limit=max(limit * 10, 50)):
+            if result['file_path'] not in exclude and result['file_path'] not in files:
+                files.append(result['file_path'])
+                if len(files) == limit:
+                    break
+        return files
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._load()
+            return {'files': len(self.files), 'chunks': len(self._chunks), 'terms': len(self._postings)}
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug(f"Ignoring unreadable search index {self.index_path}: {str(e)}")
+            return
+        if data.get('version') != INDEX_VERSION or data.get('chunk_lines') != self.chunk_lines:
+            logger.debug("Search index was built with other settings, rebuilding it")
+            return
+        self.files = data.get('files', {})
+        for file_path, entry in self.files.items():
+            self._add_chunks(file_path, entry['chunks'])
+
+    def _save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f".{self.INDEX_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'chunk_lines': self.chunk_lines, 'files': self.files}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
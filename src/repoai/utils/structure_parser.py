@@ -0,0 +1,91 @@
+import re
+from typing import List, Tuple
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TREE_PREFIX_PATTERN = re.compile(r'^[\s│├└┌┐┘┬┴┼─━┃┣┗|`+\-*•]*')
+FENCE_PATTERN = re.compile(r'^\s*```')
+COMMENT_PATTERN = re.compile(r'\s+(?:#|//|<-|←|--|—|–|\(|:\s)')
+VALID_NAME_PATTERN = re.compile(r'^[\w.@+\-/]+$')
+ROOT_NAMES = {'/', '.', './'}
+ELLIPSIS_NAMES = {'...', '…'}
+
+
+class StructureParser:
+    """Deterministic parser for tree-like, indented and plain-list project structures.
+
+    Every entry is placed under the closest previous entry with a smaller
+    indentation column, so `├──`/`└──` trees, space-indented outlines and
+    flat lists of root-relative paths are all handled by the same pass.
+    """
+
+    @staticmethod
+    def parse(structure: str) -> Tuple[List[str], List[str], float]:
+        """
+        Returns:
+            (files, folders, confidence) where folders end with '/' and
+            confidence is the share of non-empty lines that were understood.
+        """
+        entries = []
+        total_lines = 0
+        parsed_lines = 0
+
+        for line in structure.split('\n'):
+            if not line.strip() or FENCE_PATTERN.match(line):
+                continue
+            total_lines += 1
+            prefix = TREE_PREFIX_PATTERN.match(line).group()
+            name = StructureParser._clean_name(line[len(prefix):])
+            if name is None:
+                continue
+            parsed_lines += 1
+            if name in ELLIPSIS_NAMES:
+                continue
+            entries.append((len(prefix), name))
+
+        if entries and entries[0][1] in ROOT_NAMES:
+            entries = entries[1:]
+
+        files, folders = StructureParser._build_paths(entries)
+        confidence = parsed_lines / total_lines if total_lines else 0.0
+        if not files:
+            confidence = 0.0
+        logger.debug(f"Parsed structure locally: {len(files)} files, {len(folders)} folders, confidence {confidence:.2f}")
+        return files, folders, confidence
+
+    @staticmethod
+    def _clean_name(text: str):
+        text = COMMENT_PATTERN.split(text.strip(), maxsplit=1)[0].strip()
+        if text in ROOT_NAMES or text in ELLIPSIS_NAMES:
+            return text
+        text = text.strip('`*"\'')
+        if not text or not VALID_NAME_PATTERN.match(text):
+            return None
+        return text.lstrip('/') if text != '/' else text
+
+    @staticmethod
+    def _build_paths(entries: List[Tuple[int, str]]) -> Tuple[List[str], List[str]]:
+        files = set()
+        folders = set()
+        stack: List[Tuple[int, str]] = []  # (column, path without trailing '/')
+
+        for index, (column, name) in enumerate(entries):
+            while stack and stack[-1][0] >= column:
+                stack.pop()
+            parent = stack[-1][1] if stack else ''
+            path = f"{parent}/{name.rstrip('/')}" if parent else name.rstrip('/')
+
+            has_children = index + 1 < len(entries) and entries[index + 1][0] > column
+            if name.endswith('/') or has_children:
+                folders.add(f"{path}/")
+                stack.append((column, path))
+            else:
+                files.add(path)
+
+        for file_path in files:
+            parts = file_path.split('/')[:-1]
+            for i in range(1, len(parts) + 1):
+                folders.add('/'.join(parts[:i]) + '/')
+
+        return sorted(files), sorted(folders - {f"{f}/" for f in files})
@@ -0,0 +1,372 @@
+import os
+import re
+import ast
+import json
+import bisect
+import hashlib
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Set, Tuple
+from ..utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from ..core.file_manager import FileManager
+
+logger = get_logger(__name__)
+
+INDEX_VERSION = 2
+FILE_UNCHANGED, FILE_UPDATED, FILE_SYMBOLS_CHANGED = 0, 1, 2
+IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+REQUEST_SYMBOL_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*')
+MAX_INDEXED_FILE_SIZE = 1024 * 1024
+
+LANGUAGES = {
+    '.py': 'python', '.pyi': 'python',
+    '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript', '.cjs': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript',
+    '.go': 'go', '.rs': 'rust', '.rb': 'ruby', '.php': 'php',
+    '.java': 'java', '.kt': 'kotlin', '.scala': 'scala', '.cs': 'csharp', '.swift': 'swift',
+    '.c': 'c', '.h': 'c', '.cc': 'cpp', '.cpp': 'cpp', '.hpp': 'cpp', '.cxx': 'cpp',
+}
+
+# (kind, pattern) pairs; the first group of each pattern is the defined name
+_CLASS_LIKE = ('class', re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:public\s+|private\s+|protected\s+|internal\s+)?(?:abstract\s+|final\s+|sealed\s+|static\s+|data\s+|open\s+)*(?:class|interface|enum|struct|trait|object|record)\s+([A-Za-z_]\w*)', re.M))
+DEFINITION_PATTERNS = {
+    'javascript': [
+        _CLASS_LIKE,
+        ('function', re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)', re.M)),
+        ('variable', re.compile(r'^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)', re.M)),
+    ],
+    'typescript': [
+        _CLASS_LIKE,
+        ('function', re.compile(r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)', re.M)),
+        ('variable', re.compile(r'^\s*(?:export\s+)?(?:const|let|var)\s+([A-Za-z_$][\w$]*)', re.M)),
+        ('type', re.compile(r'^\s*(?:export\s+)?type\s+([A-Za-z_]\w*)\s*=', re.M)),
+    ],
+    'go': [
+        ('function', re.compile(r'^func\s+(?:\([^)]*\)\s*)?([A-Za-z_]\w*)', re.M)),
+        ('type', re.compile(r'^type\s+([A-Za-z_]\w*)', re.M)),
+    ],
+    'rust': [
+        ('function', re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+([A-Za-z_]\w*)', re.M)),
+        ('class', re.compile(r'^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait|type|mod)\s+([A-Za-z_]\w*)', re.M)),
+    ],
+    'ruby': [
+        ('function', re.compile(r'^\s*def\s+(?:self\.)?([A-Za-z_]\w*[?!]?)', re.M)),
+        ('class', re.compile(r'^\s*(?:class|module)\s+([A-Z]\w*)', re.M)),
+    ],
+    'php': [
+        _CLASS_LIKE,
+        ('function', re.compile(r'^\s*(?:(?:public|private|protected|static|abstract|final)\s+)*function\s+&?([A-Za-z_]\w*)', re.M)),
+    ],
+    'java': [_CLASS_LIKE],
+    'kotlin': [_CLASS_LIKE, ('function', re.compile(r'^\s*(?:\w+\s+)*fun\s+(?:<[^>]*>\s*)?(?:\w+\.)?([A-Za-z_]\w*)', re.M))],
+    'scala': [_CLASS_LIKE, ('function', re.compile(r'^\s*(?:\w+\s+)*def\s+([A-Za-z_]\w*)', re.M))],
+    'csharp': [_CLASS_LIKE],
+    'swift': [_CLASS_LIKE, ('function', re.compile(r'^\s*(?:\w+\s+)*func\s+([A-Za-z_]\w*)', re.M))],
+    'c': [
+        ('class', re.compile(r'^\s*(?:typedef\s+)?(?:struct|enum|union)\s+([A-Za-z_]\w*)', re.M)),
+        ('macro', re.compile(r'^\s*#\s*define\s+([A-Za-z_]\w*)', re.M)),
+    ],
+}
+DEFINITION_PATTERNS['cpp'] = DEFINITION_PATTERNS['c'] + [_CLASS_LIKE]
+# Methods of class-based languages: an identifier followed by a parameter list and a body
+_METHOD_PATTERN = ('function', re.compile(r'^\s*(?:[\w<>\[\],.?*&:]+\s+)+([A-Za-z_]\w*)\s*\([^;{}]*\)\s*(?:throws\s+[\w., ]+)?\{', re.M))
+for _language in ('java', 'csharp', 'c', 'cpp'):
+    DEFINITION_PATTERNS[_language].append(_METHOD_PATTERN)
+# Class members of JS/TS: indented `name(...) {` with optional modifiers and return type
+_JS_METHOD_PATTERN = ('function', re.compile(r'^[ \t]+(?:(?:public|private|protected|static|async|readonly|override|get|set)\s+)*(?!(?:if|for|while|switch|catch|return|function)\b)([A-Za-z_$][\w$]*)\s*(?:<[^>]*>)?\([^;{}]*\)\s*(?::\s*[^{;=]+)?\{', re.M))
+for _language in ('javascript', 'typescript'):
+    DEFINITION_PATTERNS[_language].append(_JS_METHOD_PATTERN)
+
+IMPORT_PATTERNS = {
+    'javascript': re.compile(r'''(?:^\s*import\s+(?:[^'"]*?\s+from\s+)?|require\s*\(\s*|import\s*\(\s*)['"]([^'"]+)['"]''', re.M),
+    'go': re.compile(r'^\s*(?:import\s+)?(?:[A-Za-z_]\w*\s+)?"([^"]+)"', re.M),
+    'rust': re.compile(r'^\s*(?:pub\s+)?(?:use|extern\s+crate|mod)\s+([\w:]+)', re.M),
+    'ruby': re.compile(r'''^\s*require(?:_relative)?\s*\(?\s*['"]([^'"]+)['"]''', re.M),
+    'php': re.compile(r'''^\s*(?:use\s+([\w\\]+)|(?:require|include)(?:_once)?\s*\(?\s*['"]([^'"]+)['"])''', re.M),
+    'java': re.compile(r'^\s*import\s+(?:static\s+)?([\w.]+)', re.M),
+    'kotlin': re.compile(r'^\s*import\s+([\w.]+)', re.M),
+    'scala': re.compile(r'^\s*import\s+([\w.]+)', re.M),
+    'csharp': re.compile(r'^\s*using\s+(?:static\s+)?([\w.]+)\s*;', re.M),
+    'swift': re.compile(r'^\s*import\s+(\w+)', re.M),
+    'c': re.compile(r'^\s*#\s*include\s*[<"]([^>"]+)[>"]', re.M),
+}
+IMPORT_PATTERNS['typescript'] = IMPORT_PATTERNS['javascript']
+IMPORT_PATTERNS['cpp'] = IMPORT_PATTERNS['c']
+
+COMMON_WORDS = {
+    'if', 'else', 'for', 'while', 'return', 'def', 'class', 'import', 'from', 'as', 'in', 'is', 'not', 'and', 'or',
+    'None', 'True', 'False', 'self', 'cls', 'this', 'new', 'function', 'const', 'let', 'var', 'public', 'private',
+    'protected', 'static', 'void', 'int', 'str', 'string', 'bool', 'true', 'false', 'null', 'nil', 'fn', 'func',
+    'package', 'struct', 'type', 'use', 'the', 'a', 'an', 'to', 'of', 'with', 'that', 'it', 'on', 'be', 'by',
+    'at', 'add', 'file', 'files', 'make', 'should', 'can', 'all', 'into', 'when', 'so', 'we', 'i',
+}
+
+
+class SymbolIndex:
+    """
+    Per-project index of the symbols each file defines, references and imports.
+
+    Python files are parsed with `ast`; other languages go through the regular
+    expressions above. The index is kept in `.repoai/symbol_index.json` and `update`
+    only re-reads files whose size or modification time changed, and re-parses them
+    only if their content hash changed.
+    """
+    INDEX_FILE = 'symbol_index.json'
+
+    def __init__(self, file_manager: 'FileManager', repoai_dir: str = '.repoai'):
+        self.file_manager = file_manager
+        self.project_path = Path(file_manager.project_path)
+        self.index_path = self.project_path / repoai_dir / self.INDEX_FILE
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._definitions: Dict[str, Set[str]] = {}
+        self._references: Dict[str, Set[str]] = {}
+        self._loaded = False
+        self.revision = 0  # Incremented on every change, so derived structures know when to rebuild
+        self._lock = threading.RLock()
+
+    def update(self, files: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Bring the index up to date with the project files (or only with `files`). The revision
+        changes only when the files indexed, their symbols or their imports change; edits that
+        only move definitions update the lookups and the stored index.
+        """
+        with self._lock:
+            self._load()
+            full_scan = files is None
+            if full_scan:
+                files = self.file_manager.list_files_not_ignored()
+            files = [f for f in files if Path(f).suffix.lower() in LANGUAGES]
+            stats = {'indexed': 0, 'unchanged': 0, 'removed': 0}
+            symbols_changed = False
+            entries_changed = False
+            for file_path in files:
+                status = self._update_file(file_path)
+                if status == FILE_UNCHANGED:
+                    stats['unchanged'] += 1
+                    continue
+                stats['indexed'] += 1
+                entries_changed = True
+                symbols_changed = symbols_changed or status == FILE_SYMBOLS_CHANGED
+            if full_scan:
+                for file_path in set(self.files) - set(files):
+                    del self.files[file_path]
+                    stats['removed'] += 1
+            if stats['removed']:
+                symbols_changed = True
+            if symbols_changed:
+                self.revision += 1
+            if symbols_changed or entries_changed:
+                self._build_lookups()
+                self._save()
+            logger.debug(f"Symbol index updated: {stats}")
+            return stats
+
+    def remove_files(self, files: List[str]):
+        with self._lock:
+            self._load()
+            removed = [f for f in files if self.files.pop(f, None) is not None]
+            if removed:
+                self.revision += 1
+                self._build_lookups()
+                self._save()
+
+    def _update_file(self, file_path: str) -> int:
+        """Re-index a file if its content changed. Returns FILE_UNCHANGED, FILE_UPDATED (stored entry
+        changed, e.g. definitions moved) or FILE_SYMBOLS_CHANGED (symbols or imports differ)."""
+        full_path = self.project_path / file_path
+        try:
+            stat = full_path.stat()
+        except OSError:
+            return FILE_SYMBOLS_CHANGED if self.files.pop(file_path, None) is not None else FILE_UNCHANGED
+        signature = [stat.st_mtime_ns, stat.st_size]
+        entry = self.files.get(file_path)
+        if entry and entry['signature'] == signature:
+            return FILE_UNCHANGED
+        if stat.st_size > MAX_INDEXED_FILE_SIZE:
+            return FILE_SYMBOLS_CHANGED if self.files.pop(file_path, None) is not None else FILE_UNCHANGED
+        data = full_path.read_bytes()
+        file_hash = hashlib.sha1(data).hexdigest()
+        if entry and entry['hash'] == file_hash:
+            entry['signature'] = signature
+            return FILE_UPDATED
+        try:
+            content = data.decode('utf-8')
+        except UnicodeDecodeError:
+            return FILE_SYMBOLS_CHANGED if self.files.pop(file_path, None) is not None else FILE_UNCHANGED
+        new_entry = self.extract_symbols(file_path, content)
+        new_entry.update(hash=file_hash, signature=signature)
+        self.files[file_path] = new_entry
+        if entry and self._symbol_key(entry) == self._symbol_key(new_entry):
+            return FILE_UPDATED
+        return FILE_SYMBOLS_CHANGED
+
+    @staticmethod
+    def _symbol_key(entry: Dict[str, Any]) -> Tuple:
+        """What derived structures depend on: symbol names and kinds, references and imports, not line numbers."""
+        return (sorted((d['qualified_name'], d['kind']) for d in entry['definitions']),
+                sorted(entry['references']), sorted(entry['imports']))
+
+    @staticmethod
+    def extract_symbols(file_path: str, content: str) -> Dict[str, Any]:
+        language = LANGUAGES.get(Path(file_path).suffix.lower())
+        if language is None:
+            raise ValueError(f"Unsupported file type for symbol indexing: {file_path}")
+        if language == 'python':
+            try:
+                return SymbolIndex._extract_python(content)
+            except (SyntaxError, ValueError):
+                logger.debug(f"Could not parse {file_path} with ast, using the generic tokenizer")
+        return SymbolIndex._extract_generic(language, content)
+
+    @staticmethod
+    def _extract_python(content: str) -> Dict[str, Any]:
+        tree = ast.parse(content)
+        definitions = []
+        references = set()
+        imports = []
+
+        def visit(node, scope: str):
+            for child in ast.iter_child_nodes(node):
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    kind = 'class' if isinstance(child, ast.ClassDef) else ('method' if scope else 'function')
+                    qualified_name = f"{scope}.{child.name}" if scope else child.name
+                    definitions.append({'name': child.name, 'qualified_name': qualified_name, 'kind': kind,
+                                        'line': child.lineno, 'end_line': getattr(child, 'end_lineno', child.lineno)})
+                    if isinstance(child, ast.ClassDef):
+                        references.update(base.id for base in child.bases if isinstance(base, ast.Name))
+                    visit(child, qualified_name)
+                    continue
+                if isinstance(child, (ast.Assign, ast.AnnAssign)) and not scope:
+                    targets = child.targets if isinstance(child, ast.Assign) else [child.target]
+                    for target in targets:
+                        if isinstance(target, ast.Name):
+                            definitions.append({'name': target.id, 'qualified_name': target.id, 'kind': 'variable',
+                                                'line': child.lineno, 'end_line': getattr(child, 'end_lineno', child.lineno)})
+                elif isinstance(child, ast.Import):
+                    for alias in child.names:
+                        imports.append(alias.name)
+                        references.add(alias.name.split('.')[0])
+                elif isinstance(child, ast.ImportFrom):
+                    module = '.' * child.level + (child.module or '')
+                    imports.append(module)
+                    # `from package import name` may import a submodule; resolvers skip the names that are not
+                    separator = '.' if child.module else ''
+                    imports.extend(f"{module}{separator}{alias.name}" for alias in child.names if alias.name != '*')
+                    references.update(alias.name for alias in child.names if alias.name != '*')
+                elif isinstance(child, ast.Name):
+                    references.add(child.id)
+                elif isinstance(child, ast.Attribute):
+                    references.add(child.attr)
+                visit(child, scope)
+
+        visit(tree, '')
+        defined = {d['name'] for d in definitions}
+        return {'language': 'python', 'definitions': definitions,
+                'references': sorted(references - defined), 'imports': imports}
+
+    @staticmethod
+    def _extract_generic(language: str, content: str) -> Dict[str, Any]:
+        definitions = []
+        line_starts = None
+        for kind, pattern in DEFINITION_PATTERNS.get(language, []):
+            for match in pattern.finditer(content):
+                if line_starts is None:
+                    line_starts = [0] + [m.end() for m in re.finditer('\n', content)]
+                line = _line_of(line_starts, match.start(1))
+                definitions.append({'name': match.group(1), 'qualified_name': match.group(1), 'kind': kind,
+                                    'line': line, 'end_line': line})
+        definitions.sort(key=lambda d: d['line'])
+        imports = []
+        if language in IMPORT_PATTERNS:
+            imports = [next(group for group in match.groups() if group) for match in IMPORT_PATTERNS[language].finditer(content)]
+        defined = {d['name'] for d in definitions}
+        references = {token for token in IDENTIFIER_PATTERN.findall(content)
+                      if len(token) > 2 and token not in COMMON_WORDS}
+        return {'language': language, 'definitions': definitions,
+                'references': sorted(references - defined), 'imports': imports}
+
+    def find_definitions(self, symbol: str) -> List[str]:
+        with self._lock:
+            self._load()
+            return sorted(self._definitions.get(symbol, ()))
+
+    def find_references(self, symbol: str) -> List[str]:
+        with self._lock:
+            self._load()
+            return sorted(self._references.get(symbol, ()))
+
+    def get_file_symbols(self, file_path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._load()
+            return self.files.get(file_path)
+
+    def mentioned_symbols(self, text: str) -> List[str]:
+        """Indexed symbols mentioned in free text, e.g. a modification request."""
+        with self._lock:
+            self._load()
+            symbols = []
+            for token in REQUEST_SYMBOL_PATTERN.findall(text):
+                for part in [token] + token.split('.'):
+                    if part not in symbols and part in self._definitions and part not in COMMON_WORDS:
+                        symbols.append(part)
+            return symbols
+
+    def files_for_request(self, text: str, max_files: int = 5, exclude: Optional[List[str]] = None) -> List[str]:
+        """
+        Files relevant to a request: those defining the symbols it mentions first, then
+        those referencing them, ranked by the number of mentioned symbols they cover.
+        """
+        symbols = self.mentioned_symbols(text)
+        exclude = set(exclude or [])
+        scores: Dict[str, Tuple[int, int]] = {}
+        with self._lock:
+            for symbol in symbols:
+                for file_path in self._definitions.get(symbol, ()):
+                    defined, referenced = scores.get(file_path, (0, 0))
+                    scores[file_path] = (defined + 1, referenced)
+                for file_path in self._references.get(symbol, ()):
+                    defined, referenced = scores.get(file_path, (0, 0))
+                    scores[file_path] = (defined, referenced + 1)
+        ranked = sorted((f for f in scores if f not in exclude), key=lambda f: (-scores[f][0], -scores[f][1], f))
+        return ranked[:max_files]
+
+    def _build_lookups(self):
+        self._definitions = {}
+        self._references = {}
+        for file_path, entry in self.files.items():
+            for definition in entry['definitions']:
+                self._definitions.setdefault(definition['name'], set()).add(file_path)
+                if definition['qualified_name'] != definition['name']:
+                    self._definitions.setdefault(definition['qualified_name'], set()).add(file_path)
+            for name in entry['references']:
+                self._references.setdefault(name, set()).add(file_path)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug(f"Ignoring unreadable symbol index {self.index_path}: {str(e)}")
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.files = data.get('files', {})
+            self.revision += 1
+            self._build_lookups()
+
+    def _save(self):
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f".{self.INDEX_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'files': self.files}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.index_path)
+
+
+def _line_of(line_starts: List[int], offset: int) -> int:
+    return bisect.bisect_right(line_starts, offset)
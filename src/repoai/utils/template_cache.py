@@ -0,0 +1,42 @@
+import hashlib
+from typing import Dict, Tuple, Optional
+from jinja2 import Environment, Template
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TemplateCache:
+    """
+    Compiled Jinja templates keyed by (namespace, name, source hash).
+
+    A template is compiled once per distinct source, so editing a prompt simply
+    produces a new key. invalidate() drops stale entries for a name.
+    """
+    def __init__(self, jinja_env: Environment):
+        self.jinja_env = jinja_env
+        self._templates: Dict[Tuple[str, Optional[str], str], Template] = {}
+
+    @staticmethod
+    def source_hash(source: str) -> str:
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def get(self, namespace: str, name: Optional[str], source: str) -> Template:
+        key = (namespace, name, self.source_hash(source))
+        template = self._templates.get(key)
+        if template is None:
+            template = self.jinja_env.from_string(source)
+            self._templates[key] = template
+            logger.debug(f"Compiled template {namespace}:{name}")
+        return template
+
+    def render(self, namespace: str, name: Optional[str], source: str, **kwargs) -> str:
+        return self.get(namespace, name, source).render(**kwargs)
+
+    def validate(self, namespace: str, name: Optional[str], source: str):
+        """Compile the source, raising jinja2.TemplateSyntaxError if it is invalid."""
+        self.get(namespace, name, source)
+
+    def invalidate(self, namespace: str, name: Optional[str] = None):
+        for key in [key for key in self._templates if key[0] == namespace and (name is None or key[1] == name)]:
+            del self._templates[key]
@@ -1,12 +1,17 @@
 import yaml
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Dict, List, Any
 from pathlib import Path
-from litellm import token_counter, cost_per_token
 from ..core.config_manager import ConfigManager
+from ..utils.model_registry import ModelRegistry
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+TEXT_TOKEN_CACHE_SIZE = 1024
+
 
 class TokenCounter:
     def __init__(self, project_path: Path, config: ConfigManager):
@@ -15,6 +20,8 @@ class TokenCounter:
         self.global_usage = self._load_global_usage()
         self.project_usage = self._load_project_usage()
         self.interaction_usage = self._initialize_interaction_usage()
+        self._lock = threading.Lock()
+        self._text_tokens: 'OrderedDict[tuple, int]' = OrderedDict()  # (model, text hash) -> tokens
 
     def _load_global_usage(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
         global_usage_file = Path(self.config.get('global_token_usage_file'))
@@ -44,38 +51,55 @@ class TokenCounter:
             yaml.dump(self.project_usage, f, default_flow_style=False)
 
     def count_tokens(self, model: str, messages: List[Dict[str, str]]) -> int:
+        from litellm import token_counter
         return token_counter(model=model, messages=messages)
 
+    def count_text_tokens(self, model: str, text: str) -> int:
+        """Tokens of a text, memoized by model and content, e.g. for context budgets checked on every turn."""
+        key = (model, hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest())
+        with self._lock:
+            if key in self._text_tokens:
+                self._text_tokens.move_to_end(key)
+                return self._text_tokens[key]
+        from litellm import token_counter
+        tokens = token_counter(model=model, text=text)
+        with self._lock:
+            self._text_tokens[key] = tokens
+            if len(self._text_tokens) > TEXT_TOKEN_CACHE_SIZE:
+                self._text_tokens.popitem(last=False)
+        return tokens
+
     def update_token_usage(self, model: str, provider: str, input_tokens: int, output_tokens: int):
-        total_tokens = input_tokens + output_tokens
-
-        for usage in [self.global_usage, self.project_usage, self.interaction_usage]:
-            if provider not in usage:
-                usage[provider] = {}
-            if model not in usage[provider]:
-                usage[provider][model] = {
-                    'input_tokens': 0,
-                    'output_tokens': 0,
-                    'total_tokens': 0,
-                    'total_cost': 0.0
-                }
-            usage[provider][model]['input_tokens'] += input_tokens
-            usage[provider][model]['output_tokens'] += output_tokens
-            usage[provider][model]['total_tokens'] += total_tokens
-
-        try:
-            prompt_cost, completion_cost = cost_per_token(model, input_tokens, output_tokens)
-        except Exception as e:
-            logger.debug(f"Error in cost calculation: {str(e)}", exc_info=True)
-            prompt_cost = 0.0
-            completion_cost = 0.0
-        total_cost = prompt_cost + completion_cost
+        with self._lock:
+            total_tokens = input_tokens + output_tokens
+
+            for usage in [self.global_usage, self.project_usage, self.interaction_usage]:
+                if provider not in usage:
+                    usage[provider] = {}
+                if model not in usage[provider]:
+                    usage[provider][model] = {
+                        'input_tokens': 0,
+                        'output_tokens': 0,
+                        'total_tokens': 0,
+                        'total_cost': 0.0
+                    }
+                usage[provider][model]['input_tokens'] += input_tokens
+                usage[provider][model]['output_tokens'] += output_tokens
+                usage[provider][model]['total_tokens'] += total_tokens
+
+            try:
+                prompt_cost, completion_cost = ModelRegistry.get_instance().cost_per_token(model, input_tokens, output_tokens)
+            except Exception as e:
+                logger.debug(f"Error in cost calculation: {str(e)}", exc_info=True)
+                prompt_cost = 0.0
+                completion_cost = 0.0
+            total_cost = prompt_cost + completion_cost
         
-        for usage in [self.global_usage, self.project_usage, self.interaction_usage]:
-            usage[provider][model]['total_cost'] += total_cost
+            for usage in [self.global_usage, self.project_usage, self.interaction_usage]:
+                usage[provider][model]['total_cost'] += total_cost
 
-        self._save_global_usage()
-        self._save_project_usage()
+            self._save_global_usage()
+            self._save_project_usage()
 
     def get_global_token_usage(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
         return self.global_usage
@@ -0,0 +1,70 @@
+import pytest
+from repoai.services.llm_service import LLMService
+from repoai.utils.fenced_blocks import FencedDocument
+
+
+class FakeResponse:
+    def __init__(self, content, finish_reason='stop'):
+        self.content = content
+        self.finish_reason = finish_reason
+
+
+class FakeConfig:
+    def get(self, key, default=None):
+        return default
+
+    def get_llm_prompt(self, task_id, prompt_type, **kwargs):
+        return f"Continue after: {kwargs['last_line']}"
+
+
+@pytest.fixture
+def llm_service():
+    service = LLMService.__new__(LLMService)
+    service.config = FakeConfig()
+    return service
+
+
+def stitch(llm_service, *responses):
+    responses = iter(responses)
+    llm_service.get_completion = lambda messages, **kwargs: next(responses)
+    return llm_service.get_completion_with_continuation([{"role": "user", "content": "Generate"}], task_id='file_content_generation_task')
+
+
+def test_repeated_lines_are_trimmed(llm_service):
+    first = FakeResponse("```python\ndef a():\n    return 1\n\ndef b():\n    x = compute_value(1)\n    y = compute_value(2)\n    z = comp", 'length')
+    second = FakeResponse("```python\n    x = compute_value(1)\n    y = compute_value(2)\n    z = compute_value(3)\n    return x + y + z\n```")
+    assert stitch(llm_service, first, second) == (
+        "```python\ndef a():\n    return 1\n\ndef b():\n    x = compute_value(1)\n    y = compute_value(2)\n"
+        "    z = compute_value(3)\n    return x + y + z\n```")
+
+
+def test_long_single_line_repetition_is_trimmed(llm_service):
+    line = "The configuration is loaded from the user data directory at startup."
+    first = FakeResponse(f"Intro\n{line}\nPartial sen", 'length')
+    second = FakeResponse(f"{line}\nEnd of the text.")
+    assert stitch(llm_service, first, second) == f"Intro\n{line}\nEnd of the text."
+
+
+def test_continuation_without_overlap_is_appended(llm_service):
+    first = FakeResponse("```python\nx = 1\n", 'length')
+    second = FakeResponse("```python\ny = 2\n```")
+    assert stitch(llm_service, first, second) == "```python\nx = 1\ny = 2\n```"
+
+
+@pytest.mark.parametrize("repeated", ["  }", "end", ")", "</div>", "    return;"])
+def test_structural_line_repetition_is_kept(repeated):
+    document = FencedDocument(f"```\nblock {{\n  inner {{\n    body\n{repeated}")
+    document.extend(f"{repeated}\nafter\n```", trim_overlap=True)
+    assert document.text == f"```\nblock {{\n  inner {{\n    body\n{repeated}\n{repeated}\nafter\n```"
+
+
+def test_short_single_line_repetition_is_kept():
+    document = FencedDocument("```\nx += 1")
+    document.extend("x += 1\n```", trim_overlap=True)
+    assert document.text == "```\nx += 1\nx += 1\n```"
+
+
+def test_overlap_is_not_trimmed_by_default():
+    document = FencedDocument("a = compute_value(1)\nb = compute_value(2)")
+    document.extend("a = compute_value(1)\nb = compute_value(2)")
+    assert document.lines.count("a = compute_value(1)") == 2
@@ -0,0 +1,75 @@
+import time
+import pytest
+from repoai.utils.common_utils import extract_code_blocks, extract_outer_code_block, incomplete_code, join_generated_code
+from repoai.utils.fenced_blocks import parse_fenced_blocks
+
+
+def test_tagged_fence_nests_inside_a_block():
+    content = "intro\n```python\nx = 1\n```markdown\ninner\n```\ny = 2\n```\noutro"
+    assert extract_code_blocks(content) == [['python', "x = 1\n```markdown\ninner\n```\ny = 2\n"]]
+
+
+def test_consecutive_blocks_keep_their_languages():
+    content = "```python\nx = 1\n```\ntext\n```\nplain\n```\n```yaml\nkey: value\n```"
+    assert extract_code_blocks(content) == [['python', "x = 1\n"], ['', "plain\n"], ['yaml', "key: value\n"]]
+
+
+def test_indented_fences_are_recognized():
+    content = "1. Step\n   ```bash\n   ls\n   ```\n"
+    assert extract_code_blocks(content) == [['bash', "   ls\n"]]
+
+
+def test_unterminated_block_yields_no_blocks():
+    assert extract_code_blocks("```python\nx = 1\n") == []
+    assert extract_code_blocks("```python\nx = 1\n```\n```python\ny = 2") == []
+
+
+@pytest.mark.parametrize("content, expected", [
+    ("```python\nx = 1\n", True),
+    ("```python\nx = 1\n```", False),
+    ("```markdown\n```python\nx = 1\n```\n", True),
+    ("```markdown\n```python\nx = 1\n```\n```", False),
+    ("no code at all", False),
+])
+def test_incomplete_code(content, expected):
+    assert incomplete_code(content) == expected
+
+
+def test_outer_block_keeps_nested_fences():
+    content = "Here is the file:\n```markdown\n# Title\n```python\nx = 1\n```\n```\nDone."
+    assert extract_outer_code_block(content) == ('markdown', "# Title\n```python\nx = 1\n```")
+
+
+def test_outer_block_of_unterminated_content():
+    assert extract_outer_code_block("```python\nx = 1\n") == (None, None)
+    assert extract_outer_code_block("plain text") == (None, None)
+
+
+def test_join_generated_code_skips_reopening_fence():
+    first = "```python\ndef a():\n    return 1\n"
+    second = "```python\ndef b():\n    return 2\n```"
+    joined = join_generated_code([first, second], placeholder="<::JOIN::>")
+    assert extract_outer_code_block(joined) == ('python', "def a():\n    return 1\n\n<::JOIN::>\ndef b():\n    return 2")
+
+
+def response_of_size(size):
+    block = "```python\n" + "x = compute_value(1)\n" * 40 + "```markdown\nnested\n```\n" + "y = 2\n" * 40 + "```\ntext between blocks\n"
+    return block * (size // len(block) + 1)
+
+
+def parse_time(content, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        document = parse_fenced_blocks(content)
+        extract_code_blocks(content)
+        best = min(best, time.perf_counter() - start)
+    assert not document.unterminated
+    return best
+
+
+def test_parsing_scales_linearly():
+    small, large = response_of_size(1_000_000), response_of_size(4_000_000)
+    ratio = parse_time(large) / parse_time(small)
+    # Linear parsing is about 4x slower on 4x the input, quadratic about 16x
+    assert ratio < 8, f"Parsing 4x the input took {ratio:.1f}x as long"
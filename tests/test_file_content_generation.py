@@ -0,0 +1,82 @@
+import pytest
+from repoai.components.tasks.file_content_generation_task import FileContentGenerationTask
+
+
+class FakeConfig:
+    def __init__(self, **values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+    def get_llm_prompt(self, task_id, prompt_type, **kwargs):
+        return f"Generate {kwargs.get('file_path')}" if prompt_type == 'user' else "System"
+
+
+class FakeLLMService:
+    def __init__(self, failing_files=(), **config):
+        self.config = FakeConfig(**config)
+        self.failing_files = set(failing_files)
+        self.requested = []
+
+    def get_completion_with_continuation(self, messages, task_id, **kwargs):
+        file_path = messages[-1]['content'].split(' ', 1)[1]
+        self.requested.append(file_path)
+        if file_path in self.failing_files:
+            raise Exception("Service unavailable")
+        return f"```python\n# {file_path}\n```"
+
+
+class FakeProgressService:
+    def __init__(self):
+        self.saved = []
+
+    def save_progress(self, step, context):
+        self.saved.append({path: dict(state) for path, state in context['generation_state'].items()})
+
+
+def run_task(llm_service, file_paths, context=None):
+    progress_service = FakeProgressService()
+    context = dict(context or {}, report="Project", file_paths=file_paths)
+    task = FileContentGenerationTask(llm_service, progress_service)
+    try:
+        task.execute(context)
+    except Exception as e:
+        context['error'] = str(e)
+    return context, progress_service
+
+
+def test_progress_is_saved_once_per_file():
+    files = ['a.py', 'b.py', 'c.py']
+    context, progress_service = run_task(FakeLLMService(), files)
+    assert len(progress_service.saved) == len(files)
+    assert [state['status'] for state in context['generation_state'].values()] == ['done'] * 3
+    assert context['generated_files']['b.py'] == ['python', "# b.py"]
+
+
+def test_generation_stops_after_consecutive_failures():
+    files = ['a.py', 'b.py', 'c.py', 'd.py', 'e.py']
+    llm_service = FakeLLMService(failing_files={'b.py', 'c.py', 'd.py', 'e.py'}, max_consecutive_generation_failures=2)
+    context, progress_service = run_task(llm_service, files)
+    assert llm_service.requested == ['a.py', 'b.py', 'c.py']
+    assert {path: state['status'] for path, state in context['generation_state'].items()} == {
+        'a.py': 'done', 'b.py': 'failed', 'c.py': 'failed', 'd.py': 'pending', 'e.py': 'pending'}
+    assert len(progress_service.saved) == 3
+    assert "2 file(s) were not attempted" in context['error']
+
+
+def test_resume_retries_failed_and_pending_files():
+    files = ['a.py', 'b.py', 'c.py']
+    context, _ = run_task(FakeLLMService(failing_files={'b.py', 'c.py'}, max_consecutive_generation_failures=1), files)
+    llm_service = FakeLLMService()
+    context, _ = run_task(llm_service, files, context={key: context[key] for key in ('generated_files', 'generation_history', 'generation_state')})
+    assert llm_service.requested == ['b.py', 'c.py']
+    assert 'error' not in context
+
+
+@pytest.mark.parametrize("limit", [0, None])
+def test_failure_limit_can_be_disabled(limit):
+    files = ['a.py', 'b.py', 'c.py', 'd.py']
+    llm_service = FakeLLMService(failing_files=set(files), max_consecutive_generation_failures=limit)
+    run_task(llm_service, files)
+    assert llm_service.requested == files
@@ -0,0 +1,34 @@
+import pytest
+from repoai.services.git_service import GitService
+
+
+@pytest.fixture
+def git_service(tmp_path, monkeypatch):
+    for variable in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME'):
+        monkeypatch.setenv(variable, 'repoai')
+    for variable in ('GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+        monkeypatch.setenv(variable, 'repoai@example.com')
+    (tmp_path / 'main.py').write_text("print('hello')\n")
+    service = GitService(tmp_path)
+    service.commit_all("Initial commit")
+    return service
+
+
+def test_changed_files_are_read_fresh(git_service, tmp_path):
+    (tmp_path / 'main.py').write_text("print('changed')\n")
+    assert git_service.stage_operation('main.py', 'edit_file')
+    # Written outside of the service, after the staging snapshot was taken
+    (tmp_path / 'new.py').write_text("x = 1\n")
+    assert git_service.get_untracked_and_changed_files() == ['main.py', 'new.py']
+
+
+def test_blob_cache_is_bounded(git_service, tmp_path, monkeypatch):
+    monkeypatch.setattr('repoai.services.git_service.BLOB_CACHE_MAX_BYTES', 100)
+    files = {f'file_{index}.txt': f"{index}" * 40 + "\n" for index in range(5)}
+    for file_path, content in files.items():
+        (tmp_path / file_path).write_text(content)
+    git_service.commit_all("Add files")
+    assert git_service.get_previous_versions(list(files)) == files
+    assert git_service._blob_cache_bytes <= 100
+    assert list(git_service._blob_cache) == [git_service.repo.head.commit.tree[path].hexsha for path in ['file_3.txt', 'file_4.txt']]
+    assert git_service.get_previous_versions(['file_0.txt']) == {'file_0.txt': files['file_0.txt']}
@@ -0,0 +1,42 @@
+import pytest
+from repoai.utils.model_registry import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    # An empty user directory, so the bundled snapshot is used
+    return ModelRegistry(user_dir=tmp_path)
+
+
+@pytest.mark.parametrize("model, provider, snapshot_key", [
+    ("gpt-4o", "openai", "gpt-4o"),
+    ("openai/gpt-4o", "openai", "gpt-4o"),
+    ("azure/gpt-4o", "azure", None),
+    ("openrouter/gpt-4o", "openrouter", None),
+    ("bedrock/gpt-4o", "bedrock", None),
+    ("claude-3-5-sonnet-20240620", "anthropic", "claude-3-5-sonnet-20240620"),
+    ("anthropic/claude-3-5-sonnet-20240620", "anthropic", "claude-3-5-sonnet-20240620"),
+    ("vertex_ai/claude-3-5-sonnet-20240620", "vertex_ai", None),
+    ("openrouter/anthropic/claude-3.5-sonnet", "openrouter", None),
+    ("gemini/gemini-2.5-pro", "gemini", "gemini/gemini-2.5-pro"),
+    ("deepseek/deepseek-chat", "deepseek", "deepseek/deepseek-chat"),
+    ("groq/llama3-8b-8192", "groq", None),
+])
+def test_provider_resolution(registry, model, provider, snapshot_key):
+    assert registry.get_provider(model) == provider
+    assert registry._resolve(model)[0] == snapshot_key
+
+
+@pytest.mark.parametrize("model", [
+    "azure/gpt-4o",
+    "openrouter/gpt-4o",
+    "bedrock/gpt-4o",
+    "vertex_ai/claude-3-5-sonnet-20240620",
+    "anthropic/claude-3-5-sonnet-20240620",
+    "gemini/gemini-2.5-pro",
+    "openai/gpt-4o",
+    "gpt-4o",
+])
+def test_provider_matches_litellm(registry, model):
+    get_llm_provider = pytest.importorskip("litellm.utils").get_llm_provider
+    assert registry.get_provider(model) == get_llm_provider(model=model)[1]
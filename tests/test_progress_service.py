@@ -0,0 +1,139 @@
+import shutil
+from datetime import datetime, timedelta
+import pytest
+from repoai.core.file_manager import FileManager
+from repoai.services.progress_service import ProgressService
+
+
+class FakeConfig:
+    REPOAI_DIR = ".repoai"
+
+    def __init__(self, **values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+def make_service(project_path, **config):
+    service = ProgressService(project_path, FakeConfig(**config), FileManager(project_path, ignore_file=".repoai/.repoaiignore"))
+    service.collect_garbage_in_background = service.collect_garbage
+    return service
+
+
+@pytest.fixture
+def project_path(tmp_path):
+    path = tmp_path / 'project'
+    path.mkdir()
+    return path
+
+
+def contexts():
+    context = {'files': {}, 'history': [], 'step': 0}
+    for index in range(7):
+        context = {
+            'files': dict(context['files'], **{f'file_{index}.py': f"content {index}"}),
+            'history': context['history'] + [index],
+            'step': index,
+        }
+        if index == 4:
+            del context['files']['file_1.py']
+        yield context
+
+
+def test_journal_is_replayed_after_restart(project_path):
+    service = make_service(project_path, progress_compaction_interval=100)
+    for context in contexts():
+        service.save_progress('generation', context)
+    assert not service.snapshot_path.exists()
+    progress = make_service(project_path).load_progress()
+    assert progress['context'] == context
+    assert progress['last_step'] == 'generation'
+
+
+def test_journal_is_replayed_on_top_of_the_snapshot(project_path):
+    service = make_service(project_path, progress_compaction_interval=3)
+    for context in contexts():
+        service.save_progress('generation', context)
+    assert make_service(project_path).load_progress()['context'] == context
+    assert len(service._read_journal()) == 1
+    assert service._load_snapshot()['journal_seq'] == 6
+
+
+def test_journal_left_by_interrupted_compaction_is_not_replayed_twice(project_path):
+    service = make_service(project_path, progress_compaction_interval=100)
+    saved = list(contexts())
+    for context in saved[:3]:
+        service.save_progress('generation', context)
+    journal_copy = project_path / 'journal.copy'
+    shutil.copy(service.journal_path, journal_copy)
+    service.compact('generation', saved[2])
+    # The process died after replacing the snapshot but before deleting the journal
+    shutil.copy(journal_copy, service.journal_path)
+
+    resumed = make_service(project_path, progress_compaction_interval=100)
+    assert resumed.load_progress()['context'] == saved[2]
+    for context in saved[3:]:
+        resumed.save_progress('generation', context)
+    assert make_service(project_path).load_progress()['context'] == saved[-1]
+
+
+def test_writes_from_another_instance_are_picked_up(project_path):
+    first = make_service(project_path, progress_compaction_interval=100)
+    second = make_service(project_path, progress_compaction_interval=100)
+    saved = list(contexts())
+    for index, context in enumerate(saved):
+        (first if index % 2 else second).save_progress('generation', context)
+    assert make_service(project_path).load_progress()['context'] == saved[-1]
+
+
+def test_clear_progress(project_path):
+    service = make_service(project_path)
+    service.save_progress('generation', {'step': 1})
+    service.clear_progress()
+    assert service.load_progress() == {}
+
+
+def write_checkpoints(service, steps, now):
+    directory = service.project_path / service.base_path
+    directory.mkdir(parents=True, exist_ok=True)
+    for days_ago, step in steps:
+        formated_time = (now - timedelta(days=days_ago)).strftime("%Y%m%d_%H%M%S")
+        service._write_checkpoint(f"{formated_time}_{step}_{service.base_file_name}.gz", {'last_step': step})
+
+
+def remaining_steps(service):
+    return [checkpoint['step'] for checkpoint in service.list_checkpoints()]
+
+
+@pytest.mark.parametrize("retention, expected", [
+    ({'keep_last': 2, 'max_age_days': 0, 'step_boundaries_only': False}, ['edit', 'review']),
+    ({'keep_last': 0, 'max_age_days': 10, 'step_boundaries_only': False}, ['generation', 'edit', 'edit', 'review']),
+    ({'keep_last': 0, 'max_age_days': 0, 'step_boundaries_only': True}, ['structure', 'generation', 'edit', 'review']),
+    ({'keep_last': 2, 'max_age_days': 0, 'step_boundaries_only': True}, ['edit', 'review']),
+])
+def test_checkpoint_retention(project_path, retention, expected):
+    service = make_service(project_path)
+    now = datetime.now()
+    write_checkpoints(service, [(40, 'structure'), (30, 'structure'), (20, 'generation'), (5, 'generation'),
+                                (4, 'edit'), (3, 'edit'), (1, 'review')], now)
+    result = service.collect_garbage(**retention)
+    assert remaining_steps(service) == expected
+    assert result == {'kept': len(expected), 'removed': 7 - len(expected), 'compressed': 0}
+
+
+def test_kept_checkpoints_are_compressed(project_path):
+    service = make_service(project_path)
+    checkpoint = project_path / service.base_path / f"20240101_000000_generation_{service.base_file_name}"
+    checkpoint.parent.mkdir(parents=True)
+    checkpoint.write_text("last_step: generation\n")
+    assert service.collect_garbage(keep_last=5, max_age_days=0) == {'kept': 1, 'removed': 0, 'compressed': 1}
+    [kept] = service.list_checkpoints()
+    assert kept['compressed'] and ProgressService.load_checkpoint(kept['path']) == {'last_step': 'generation'}
+
+
+def test_compaction_applies_retention(project_path):
+    service = make_service(project_path, progress_compaction_interval=1, checkpoint_keep_last=2, checkpoint_max_age_days=0)
+    write_checkpoints(service, [(3, 'structure'), (2, 'generation')], datetime.now())
+    service.save_progress('edit', {'step': 1})
+    assert remaining_steps(service) == ['generation', 'edit']
@@ -0,0 +1,72 @@
+import pytest
+from repoai.core.project_manager import ProjectManager
+
+
+def coalesce(operations, existing=()):
+    project_manager = ProjectManager.__new__(ProjectManager)
+    project_manager.file_exists = lambda file_path: file_path in existing
+    return project_manager._coalesce_operations(operations)
+
+
+def op(operation, file_path, content=None):
+    return {'operation': operation, 'file_path': file_path, 'content': content} if content is not None \
+        else {'operation': operation, 'file_path': file_path}
+
+
+def test_create_then_edit_is_a_single_create():
+    assert coalesce([op('create_file', 'a.py', "1"), op('edit_file', 'a.py', "2")]) == [op('create_file', 'a.py', "2")]
+
+
+def test_create_edit_delete_of_a_new_file_is_dropped():
+    operations = [op('create_file', 'a.py', "1"), op('edit_file', 'a.py', "2"), op('delete_file', 'a.py')]
+    assert coalesce(operations) == []
+
+
+def test_edit_then_delete_of_an_existing_file_is_a_delete():
+    operations = [op('edit_file', 'a.py', "2"), op('delete_file', 'a.py')]
+    assert coalesce(operations, existing={'a.py'}) == [op('delete_file', 'a.py')]
+
+
+def test_delete_then_create_of_an_existing_file_is_an_edit():
+    operations = [op('delete_file', 'a.py'), op('create_file', 'a.py', "new")]
+    assert coalesce(operations, existing={'a.py'}) == [op('edit_file', 'a.py', "new")]
+
+
+def test_operations_keep_the_position_of_the_first_one_per_path():
+    operations = [op('edit_file', 'a.py', "1"), op('create_file', 'b.py', "1"), op('edit_file', 'a.py', "2")]
+    assert coalesce(operations, existing={'a.py'}) == [op('edit_file', 'a.py', "2"), op('create_file', 'b.py', "1")]
+
+
+def test_move_ends_the_merge_window():
+    operations = [
+        op('edit_file', 'a.py', "1"),
+        op('move_file', 'a.py', "b.py"),
+        op('edit_file', 'b.py', "2"),
+        op('create_file', 'a.py', "3"),
+    ]
+    assert coalesce(operations, existing={'a.py'}) == operations
+
+
+def test_writes_before_a_move_to_the_same_path_are_not_merged_across_it():
+    operations = [op('create_file', 'b.py', "1"), op('move_file', 'a.py', "b.py"), op('edit_file', 'b.py', "2")]
+    assert coalesce(operations, existing={'a.py'}) == operations
+
+
+def test_delete_directory_drops_earlier_writes_inside_it():
+    operations = [
+        op('create_file', 'pkg/a.py', "1"),
+        op('edit_file', 'pkg/b.py', "2"),
+        op('edit_file', 'pkg_other/c.py', "3"),
+        op('delete_directory', 'pkg'),
+        op('create_file', 'pkg/a.py', "4"),
+    ]
+    assert coalesce(operations, existing={'pkg/b.py', 'pkg_other/c.py'}) == [
+        op('edit_file', 'pkg_other/c.py', "3"),
+        op('delete_directory', 'pkg'),
+        op('create_file', 'pkg/a.py', "4"),
+    ]
+
+
+def test_invalid_operation_is_rejected():
+    with pytest.raises(ValueError):
+        coalesce([op('rename_file', 'a.py', "b.py")])
@@ -0,0 +1,64 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+HEAVY_MODULES = ('litellm', 'git', 'rich', 'PIL', 'docker', 'chardet')
+IMPORT_TIME_BUDGET = 0.5  # Seconds, for importing repoai.main (cumulative, as reported by -X importtime)
+
+RUN_CLI = """
+import json, sys
+heavy_modules = json.loads(sys.argv[2])
+sys.argv = ['repoai'] + json.loads(sys.argv[1])
+from repoai.main import main
+main()
+print(json.dumps([name for name in heavy_modules if name in sys.modules]))
+"""
+
+
+def run_cli(args, tmp_path):
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR), XDG_DATA_HOME=str(tmp_path / 'data'),
+               GIT_AUTHOR_NAME='repoai', GIT_AUTHOR_EMAIL='repoai@example.com',
+               GIT_COMMITTER_NAME='repoai', GIT_COMMITTER_EMAIL='repoai@example.com')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', RUN_CLI, json.dumps(args), json.dumps(HEAVY_MODULES)],
+                            cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return loaded, result.stderr
+
+
+def import_time(stderr, module):
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S+)$', line)
+        if match and match.group(2).strip() == module:
+            return int(match.group(1)) / 1e6
+    raise AssertionError(f"No import time reported for {module}")
+
+
+@pytest.fixture(scope='module')
+def cli_runs(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('startup')
+    project_path = tmp_path / 'project'
+    return {
+        'init': run_cli(['init', '-p', str(project_path)], tmp_path),
+        'report': run_cli(['report', '-p', str(project_path), '--output', str(tmp_path / 'reports')], tmp_path),
+    }
+
+
+@pytest.mark.parametrize('action, expected', [
+    ('init', ['git']),  # Creating a project makes the initial commit
+    ('report', []),
+])
+def test_no_heavy_modules_imported(cli_runs, action, expected):
+    loaded, _ = cli_runs[action]
+    assert loaded == expected
+
+
+@pytest.mark.parametrize('action', ['init', 'report'])
+def test_import_time_budget(cli_runs, action):
+    _, stderr = cli_runs[action]
+    assert import_time(stderr, 'repoai.main') < IMPORT_TIME_BUDGET
@@ -0,0 +1,80 @@
+import pytest
+from repoai.components.tasks.structure_to_paths_task import StructureToPathsTask
+from repoai.utils.structure_parser import StructureParser
+
+TREE = """```
+my_app/
+├── src/
+│   ├── main.py  # entry point
+│   └── utils/
+│       └── helpers.py
+├── README.md
+└── ...
+```"""
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeConfig:
+    def get(self, key, default=None):
+        return default
+
+    def get_llm_prompt(self, task_id, prompt_type, **kwargs):
+        return kwargs.get('tree_structure', "System")
+
+
+class FakeLLMService:
+    def __init__(self, reply):
+        self.config = FakeConfig()
+        self.reply = reply
+        self.calls = 0
+
+    def get_completion(self, messages, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.reply)
+
+
+@pytest.mark.parametrize("structure, files, folders", [
+    (TREE, ['my_app/README.md', 'my_app/src/main.py', 'my_app/src/utils/helpers.py'],
+     ['my_app/', 'my_app/src/', 'my_app/src/utils/']),
+    ("project/\n  app/\n    __init__.py\n  setup.py", ['project/app/__init__.py', 'project/setup.py'], ['project/', 'project/app/']),
+    ("src/main.py\nsrc/lib/util.py\ndocs/index.md", ['docs/index.md', 'src/lib/util.py', 'src/main.py'], ['docs/', 'src/', 'src/lib/']),
+    ("./\n- `app.py`\n- tests/\n  - test_app.py", ['app.py', 'tests/test_app.py'], ['tests/']),
+])
+def test_structures_are_parsed_with_full_confidence(structure, files, folders):
+    assert StructureParser.parse(structure) == (files, folders, 1.0)
+
+
+@pytest.mark.parametrize("structure, confidence", [
+    ("A Flask application with\nsome routes and a models file\napp.py", 1 / 3),
+    ("Just a description, no files here.", 0.0),
+    ("", 0.0),
+])
+def test_prose_lowers_confidence(structure, confidence):
+    assert StructureParser.parse(structure)[2] == pytest.approx(confidence)
+
+
+def test_confident_parse_does_not_call_the_llm():
+    llm_service = FakeLLMService("unused.py")
+    context = {'structure': TREE}
+    StructureToPathsTask(llm_service).execute(context)
+    assert llm_service.calls == 0
+    assert context['file_paths'] == ['my_app/README.md', 'my_app/src/main.py', 'my_app/src/utils/helpers.py']
+    assert context['folder_paths'] == ['my_app/', 'my_app/src/', 'my_app/src/utils/']
+
+
+def test_low_confidence_falls_back_to_the_llm():
+    llm_service = FakeLLMService("app/\napp/models.py\napp/routes.py")
+    context = {'structure': "A Flask application with\nsome routes and a models file\napp.py"}
+    StructureToPathsTask(llm_service).execute(context)
+    assert llm_service.calls == 1
+    assert context['file_paths'] == ['app/models.py', 'app/routes.py']
+    assert context['folder_paths'] == ['app/']
+
+
+def test_missing_structure_is_rejected():
+    with pytest.raises(ValueError):
+        StructureToPathsTask(FakeLLMService("")).execute({})